@@ -28,6 +28,10 @@ parser.add_option("--compiler", action="store", type="string", dest="compiler",
 parser.add_option("--no-apps", action="store", type="string", dest="no-apps", default="0", help="disables building desktop apps that use qt")
 parser.add_option("--themesparams", action="store", type="string", dest="themesparams", default="", help="provides settings for generating presentation themes thumbnails")
 parser.add_option("--git-protocol", action="store", type="string", dest="git-protocol", default="auto", help="can be used only if update is set to true - 'https', 'ssh'")
+parser.add_option("--git-depth", action="store", type="string", dest="git-depth", default="", help="clones repos (and their submodules) with the given history depth (shallow clone), can be used only if update is true")
+parser.add_option("--git-filter", action="store", type="string", dest="git-filter", default="", help="clones repos (and their submodules) as partial clones with the given filter, e.g. 'blob:none'. Can be used only if update is true")
+parser.add_option("--git-reference", action="store", type="string", dest="git-reference", default="", help="directory with local mirrors of repos (<dir>/<repo>.git or <dir>/<repo>) which are used as reference (alternates) for new clones, can be used only if update is true")
+parser.add_option("--git-jobs", action="store", type="string", dest="git-jobs", default="8", help="defines how many repos are updated/cloned at the same time, can be used only if update is true (linux/mac only). The output of each repo is printed when it is finished")
 parser.add_option("--branding", action="store", type="string", dest="branding", default="", help="provides branding path")
 parser.add_option("--branding-name", action="store", type="string", dest="branding-name", default="", help="provides branding name")
 parser.add_option("--branding-url", action="store", type="string", dest="branding-url", default="", help="provides branding url")
@@ -42,6 +46,22 @@ parser.add_option("--vs-version", action="store", type="string", dest="vs-versio
 parser.add_option("--vs-path", action="store", type="string", dest="vs-path", default="", help="path to vcvarsall")
 parser.add_option("--siteUrl", action="store", type="string", dest="siteUrl", default="127.0.0.1", help="site url")
 parser.add_option("--multiprocess", action="store", type="string", dest="multiprocess", default="1", help="provides ability to specify single process for make")
+parser.add_option("--qmake-incremental", action="store", type="string", dest="qmake-incremental", default="1", help="reuses the generated Makefile (and object files) of a project if its qmake inputs (.pro/.pri files, config, qmake_addon, sysroot, compiler) are not changed. Disabled by --clean 1")
+parser.add_option("--artifact-cache-dir", action="store", type="string", dest="artifact-cache-dir", default="", help="defines a directory for the cache of prebuilt third-party modules (boost, icu, openssl, v8, heif). Archives are keyed by module scripts/patches, platforms, compiler, sysroot and clang usage")
+parser.add_option("--artifact-cache-size", action="store", type="string", dest="artifact-cache-size", default="20480", help="defines the max size of the artifact cache in MB. Least recently used archives are deleted")
+parser.add_option("--build-trace", action="store", type="string", dest="build-trace", default="", help="defines a path to the build trace (chrome trace event json) with time, cpu time, peak rss and exit code of every stage, module, qmake project and command. A critical path summary is printed at the end of the build")
+parser.add_option("--compiler-cache", action="store", type="string", dest="compiler-cache", default="", help="defines a compiler cache launcher ('ccache', 'sccache' or a path to it) for qmake projects (QMAKE_CC/QMAKE_CXX), cmake builds (CMAKE_*_COMPILER_LAUNCHER) and boost (b2 toolset). Hit/miss statistics are printed per stage")
+parser.add_option("--jobs", action="store", type="string", dest="jobs", default="", help="defines the global job budget for make (-j). By default it is equal to the number of cpu cores")
+parser.add_option("--max-parallel-projects", action="store", type="string", dest="max-parallel-projects", default="1", help="defines how many independent qmake projects from sln.json are built at the same time (linux/mac only). The job budget is split between them. 'auto' - depends on the job budget")
+parser.add_option("--deploy-link-mode", action="store", type="string", dest="deploy-link-mode", default="reflink", help="defines how deploy copies unchanged build outputs: 'copy', 'reflink' (copy-on-write clone if the file system supports it, otherwise copy) or 'hardlink' (files on the same file system are linked, deployed files must not be edited in place)")
+parser.add_option("--deploy-jobs", action="store", type="string", dest="deploy-jobs", default="", help="defines how many files are copied at the same time by deploy. By default it is twice the number of cpu cores (max 32)")
+parser.add_option("--download-cache-dir", action="store", type="string", dest="download-cache-dir", default="", help="defines a directory for the downloads content store (keyed by url and pinned sha256). Pinned files are never downloaded again, other files are revalidated with ETag/Last-Modified")
+parser.add_option("--download-mirror", action="store", type="string", dest="download-mirror", default="", help="defines an http(s) url of a mirror with the content store layout (for example the download cache dir served by an http server). It is tried before the original urls")
+parser.add_option("--download-manifest", action="store", type="string", dest="download-manifest", default="", help="defines a json file with pinned sha256 of downloads ({\"url\" : \"sha256\"}). By default downloads.json in build_tools is used if exists. Downloads with another hash are rejected")
+parser.add_option("--download-pin", action="store", type="string", dest="download-pin", default="0", help="records sha256 of not pinned downloads into the download manifest")
+parser.add_option("--download-connections", action="store", type="string", dest="download-connections", default="4", help="defines how many range requests are used to download big files. Interrupted downloads are resumed")
+parser.add_option("--download-offline", action="store", type="string", dest="download-offline", default="0", help="skips remote freshness checks (cef): local archives and builds are trusted")
+parser.add_option("--download-check-ttl", action="store", type="string", dest="download-check-ttl", default="3600", help="defines how long (in seconds) results of remote freshness checks are cached")
 parser.add_option("--sysroot", action="store", type="string", dest="sysroot", default="0", help="provides ability to use sysroot (ubuntu 16.04) to build c++ code. If value is \"1\", then the sysroot from tools/linux/sysroot will be used, and if it is not there, it will download it and unpack it. You can also set value as the path to the your own sysroot (rarely used). Only for linux")
 parser.add_option("--qemu-win-arm64-dir", action="store", type="string", dest="qemu-win-arm64-dir", default="", help="dir to qemu virtual machine for win_arm64 cross build. It should contains start.bat. More info in tools/win/qemu.")
 
@@ -17,6 +17,8 @@ import build_server
 import deploy
 import make_common
 import develop
+import telemetry
+import compiler_cache
 import argparse
 
 parser = argparse.ArgumentParser(description="options")
@@ -29,6 +31,7 @@ if (args.build_only_branding):
 # parse configuration
 config.parse()
 base.check_python()
+telemetry.init(config.option("build-trace"))
 
 base_dir = base.get_script_dir(__file__)
 
@@ -66,22 +69,22 @@ base.check_build_version(base_dir)
 # update
 if ("1" == config.option("update")):
   repositories = base.get_repositories()
-  base.update_repositories(repositories)
+  telemetry.call("stage", "update", base.update_repositories, repositories)
 
 base.configure_common_apps()
 
 # developing...
-develop.make()
+telemetry.call("stage", "develop", develop.make)
 
 # check only js builds
 if ("1" == base.get_env("OO_ONLY_BUILD_JS")):
-  build_js.make()
+  telemetry.call("stage", "build_js", build_js.make)
   exit(0)
 
 #base.check_tools()
 
 # core 3rdParty
-make_common.make()
+telemetry.call("stage", "make_common", compiler_cache.call, "make_common", make_common.make)
 
 # build updmodule for desktop (only for windows version)
 if config.check_option("module", "desktop"):
@@ -95,13 +98,13 @@ if config.check_option("module", "desktop"):
     base.set_env("DESKTOP_URL_INSTALL_DEV_CHANNEL", "https://download.onlyoffice.com/install/desktop/editors/windows/onlyoffice/onlineinstallerdev/<file>")
 
 # build
-build_sln.make()
+telemetry.call("stage", "build_sln", compiler_cache.call, "build_sln", build_sln.make)
 
 # js
-build_js.make()
+telemetry.call("stage", "build_js", build_js.make)
 
 #server
-build_server.make()
+telemetry.call("stage", "build_server", build_server.make)
 
 # deploy
-deploy.make()
+telemetry.call("stage", "deploy", deploy.make)
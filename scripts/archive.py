@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+import os
+import glob
+import shutil
+import zipfile
+import tarfile
+import subprocess
+
+try:
+  import zstandard
+except ImportError:
+  zstandard = None
+
+try:
+  import py7zr
+except ImportError:
+  py7zr = None
+
+# in-process archives -----------------------------------
+# zip and tar (gz/bz2/xz/zst) are read and written as streams by python,
+# 7z needs py7zr. extract()/create() return False if the format is not supported,
+# callers use the 7z tool in this case
+
+signatures = [
+  [b"PK\x03\x04", "zip"],
+  [b"PK\x05\x06", "zip"],
+  [b"7z\xbc\xaf\x27\x1c", "7z"],
+  [b"\xfd7zXZ\x00", "xz"],
+  [b"\x1f\x8b", "gz"],
+  [b"BZh", "bz2"],
+  [b"\x28\xb5\x2f\xfd", "zst"]
+]
+
+def get_format(path):
+  with open(path, "rb") as file:
+    header = file.read(512)
+  for signature, name in signatures:
+    if header.startswith(signature):
+      return name
+  if (len(header) >= 262) and (b"ustar" == header[257:262]):
+    return "tar"
+  return ""
+
+def _tar_extract_all(tar, dst):
+  if hasattr(tarfile, "data_filter"):
+    tar.extractall(dst, filter="tar")
+  else:
+    tar.extractall(dst)
+  return
+
+def _zip_extract(src, dst):
+  with zipfile.ZipFile(src) as zip:
+    for info in zip.infolist():
+      path = zip.extract(info, dst)
+      # zipfile does not restore unix permissions
+      mode = (info.external_attr >> 16) & 0o777
+      if (0 != mode) and not info.is_dir():
+        os.chmod(path, mode)
+  return
+
+def extract(src, dst):
+  format = get_format(src)
+  if not os.path.isdir(dst):
+    os.makedirs(dst)
+  if ("zip" == format):
+    _zip_extract(src, dst)
+    return True
+  if format in ["gz", "bz2", "xz", "tar"]:
+    try:
+      with tarfile.open(src, "r|*") as tar:
+        _tar_extract_all(tar, dst)
+    except tarfile.ReadError:
+      # compressed single file (not a tar)
+      return False
+    return True
+  if ("zst" == format) and (zstandard is not None):
+    with open(src, "rb") as file:
+      with zstandard.ZstdDecompressor().stream_reader(file) as reader:
+        with tarfile.open(fileobj=reader, mode="r|") as tar:
+          _tar_extract_all(tar, dst)
+    return True
+  if ("7z" == format) and (py7zr is not None):
+    with py7zr.SevenZipFile(src, "r") as archive:
+      archive.extractall(dst)
+    return True
+  return False
+
+# src: file, folder (added with its name) or glob pattern, like "7z a"
+def _get_items(src):
+  items = glob.glob(src) if glob.has_magic(src) else [src]
+  return [[item, os.path.basename(os.path.normpath(item))] for item in items if os.path.exists(item)]
+
+def _get_format_by_name(path):
+  name = path.lower()
+  for ext, format in [[".zip", "zip"], [".7z", "7z"], [".tar.xz", "xz"], [".txz", "xz"], [".tar.gz", "gz"], [".tgz", "gz"], [".tar.zst", "zst"], [".tar", "tar"]]:
+    if name.endswith(ext):
+      return format
+  return ""
+
+def _zip_create(items, dst):
+  with zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zip:
+    for path, name in items:
+      if os.path.isfile(path):
+        zip.write(path, name)
+        continue
+      for root, dirs, files in os.walk(path):
+        relative = os.path.relpath(root, path)
+        arc_root = name if ("." == relative) else (name + "/" + relative.replace("\\", "/"))
+        if (0 == len(dirs)) and (0 == len(files)):
+          zip.write(root, arc_root + "/")
+        for file in sorted(files):
+          zip.write(os.path.join(root, file), arc_root + "/" + file)
+  return
+
+def _tar_add(tar, items):
+  for path, name in items:
+    tar.add(path, arcname=name)
+  return
+
+# multithreaded compressor tool: tar stream -> stdin, archive <- stdout
+def _tar_create_with_tool(items, dst, tool_args):
+  with open(dst, "wb") as output:
+    process = subprocess.Popen(tool_args, stdin=subprocess.PIPE, stdout=output)
+    try:
+      with tarfile.open(fileobj=process.stdin, mode="w|") as tar:
+        _tar_add(tar, items)
+    finally:
+      process.stdin.close()
+    if (0 != process.wait()):
+      raise IOError(tool_args[0] + " failed: " + str(process.returncode))
+  return
+
+def create(src, dst):
+  format = _get_format_by_name(dst)
+  items = _get_items(src)
+  if ("" == format) or (0 == len(items)):
+    return False
+  if ("7z" == format) and (py7zr is None):
+    return False
+  if ("zst" == format) and (zstandard is None) and (shutil.which("zstd") is None):
+    return False
+
+  tmp = dst + ".tmp"
+  if ("zip" == format):
+    _zip_create(items, tmp)
+  elif ("7z" == format):
+    with py7zr.SevenZipFile(tmp, "w") as archive:
+      for path, name in items:
+        archive.writeall(path, name)
+  elif ("xz" == format) and (shutil.which("xz") is not None):
+    _tar_create_with_tool(items, tmp, ["xz", "-T0", "-c"])
+  elif ("zst" == format) and (zstandard is not None):
+    with open(tmp, "wb") as output:
+      with zstandard.ZstdCompressor(threads=-1).stream_writer(output) as writer:
+        with tarfile.open(fileobj=writer, mode="w|") as tar:
+          _tar_add(tar, items)
+  elif ("zst" == format):
+    _tar_create_with_tool(items, tmp, ["zstd", "-T0", "-q", "-c"])
+  else:
+    mode = {"xz" : "w:xz", "gz" : "w:gz", "tar" : "w"}[format]
+    with tarfile.open(tmp, mode) as tar:
+      _tar_add(tar, items)
+  os.replace(tmp, dst)
+  return True
@@ -13,6 +13,16 @@ import codecs
 import re
 import stat
 import json
+import time
+import scheduler
+import telemetry
+import elf
+import downloader
+import archive
+import zipfile
+import tarfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 
 __file__script__path__ = os.path.dirname( os.path.realpath(__file__))
 icu_ver = "74"
@@ -383,32 +393,37 @@ def writeFile(path, data):
 
 # system cmd methods ------------------------------------
 def cmd(prog, args=[], is_no_errors=False):
+  record = telemetry.push(telemetry.begin("cmd", " ".join([prog] + args)))
   ret = 0
   if ("windows" == host_platform()):
     sub_args = args[:]
     sub_args.insert(0, get_path(prog))
-    ret = subprocess.call(sub_args, stderr=subprocess.STDOUT, shell=True)
+    ret = telemetry.wait(subprocess.Popen(sub_args, stderr=subprocess.STDOUT, shell=True), record)
   else:
     command = prog
     for arg in args:
       command += (" \"" + arg.replace('\"', '\\\"') + "\"")
-    ret = subprocess.call(command, stderr=subprocess.STDOUT, shell=True)
+    ret = telemetry.wait(subprocess.Popen(command, stderr=subprocess.STDOUT, shell=True), record)
+  telemetry.end(record, ret)
   if ret != 0 and True != is_no_errors:
     sys.exit("Error (" + prog + "): " + str(ret))
   return ret
 
 def cmd2(prog, args=[], is_no_errors=False):
+  record = telemetry.push(telemetry.begin("cmd", " ".join([prog] + args)))
   ret = 0
   command = prog if ("windows" != host_platform()) else get_path(prog)
   for arg in args:
     command += (" " + arg)
   print(command)
-  ret = subprocess.call(command, stderr=subprocess.STDOUT, shell=True)
+  ret = telemetry.wait(subprocess.Popen(command, stderr=subprocess.STDOUT, shell=True), record)
+  telemetry.end(record, ret)
   if ret != 0 and True != is_no_errors:
     sys.exit("Error (" + prog + "): " + str(ret))
   return ret
 
 def cmd_exe(prog, args, is_no_errors=False):
+  record = telemetry.push(telemetry.begin("cmd", " ".join([prog] + args)))
   prog_dir = os.path.dirname(prog)
   env_dir = os.environ
   if ("linux" == host_platform()):
@@ -423,13 +438,14 @@ def cmd_exe(prog, args, is_no_errors=False):
     sub_args = args[:]
     sub_args.insert(0, get_path(prog + ".exe"))
     process = subprocess.Popen(sub_args, stderr=subprocess.STDOUT, shell=True, env=env_dir)
-    ret = process.wait()
+    ret = telemetry.wait(process, record)
   else:
     command = prog
     for arg in args:
       command += (" \"" + arg.replace('\"', '\\\"') + "\"")
     process = subprocess.Popen(command, stderr=subprocess.STDOUT, shell=True, env=env_dir)
-    ret = process.wait()
+    ret = telemetry.wait(process, record)
+  telemetry.end(record, ret)
   if ret != 0 and True != is_no_errors:
     sys.exit("Error (" + prog + "): " + str(ret))
   return ret
@@ -574,6 +590,70 @@ def get_ssh_base_url():
     return "git@github.com:ONLYOFFICE/"
   return cur_origin[:ind+12]
 
+def get_dir_size(path):
+  size = 0
+  for root, dirnames, filenames in os.walk(get_path(path)):
+    for filename in filenames:
+      file_path = os.path.join(root, filename)
+      if not os.path.islink(file_path):
+        size += os.path.getsize(file_path)
+  return size
+
+def git_get_depth():
+  depth = config.option("git-depth")
+  if ("" == depth) or ("0" == depth):
+    return ""
+  return depth
+
+def git_get_reference_dir(repo):
+  mirror_dir = config.option("git-reference")
+  if ("" == mirror_dir):
+    return ""
+  for name in [repo + ".git", repo]:
+    if is_dir(mirror_dir + "/" + name):
+      return os.path.abspath(mirror_dir + "/" + name)
+  return ""
+
+def git_get_clone_params(repo):
+  params = []
+  if ("" != git_get_depth()):
+    # all branches are needed for the checkout of config.option("branch")
+    params += ["--depth", git_get_depth(), "--no-single-branch"]
+  if ("" != config.option("git-filter")):
+    params.append("--filter=" + config.option("git-filter"))
+  reference_dir = git_get_reference_dir(os.path.basename(repo))
+  if ("" != reference_dir):
+    params += ["--reference-if-able", reference_dir]
+  return params
+
+def git_get_submodule_params():
+  params = []
+  if ("" != git_get_depth()):
+    params += ["--depth", git_get_depth()]
+  if ("" != config.option("git-filter")):
+    params.append("--filter=" + config.option("git-filter"))
+  return params
+
+def git_clone(repo, url, folder, is_no_errors=False):
+  ret = cmd("git", ["clone"] + git_get_clone_params(repo) + [url, folder], is_no_errors)
+  if (0 == ret) and ("" != git_get_reference_dir(os.path.basename(repo))):
+    # submodules borrow objects from the mirror of the superproject (<mirror>/modules/<name>)
+    cmd_in_dir(folder, "git", ["config", "submodule.alternateLocation", "superproject"], True)
+    cmd_in_dir(folder, "git", ["config", "submodule.alternateErrorStrategy", "info"], True)
+  return ret
+
+def git_fetch_tag_shallow(branch):
+  if ("" == git_get_depth()) or (0 != branch.find("tags/")):
+    return
+  tag = branch[5:]
+  cmd("git", ["fetch", "--depth", git_get_depth(), "origin", "refs/tags/" + tag + ":refs/tags/" + tag], True)
+  return
+
+def git_print_clone_info(repo, folder, start_time):
+  size = get_dir_size(folder) / (1024.0 * 1024.0)
+  print("[git] cloned: " + repo + " (time: " + ("%.1f" % (time.time() - start_time)) + "s, size: " + ("%.1f" % size) + " MB)")
+  return
+
 def git_update(repo, is_no_errors=False, is_current_dir=False, git_owner=""):
   print("[git] update: " + repo)
   owner = git_owner if git_owner else "ONLYOFFICE"
@@ -584,8 +664,9 @@ def git_update(repo, is_no_errors=False, is_current_dir=False, git_owner=""):
   if is_current_dir:
     folder = repo
   is_not_exit = False
+  start_time = time.time()
   if not is_dir(folder):
-    retClone = cmd("git", ["clone", url, folder], is_no_errors)
+    retClone = git_clone(repo, url, folder, is_no_errors)
     if retClone != 0:
       return
     is_not_exit = True
@@ -593,16 +674,19 @@ def git_update(repo, is_no_errors=False, is_current_dir=False, git_owner=""):
   os.chdir(folder)
   cmd("git", ["fetch"], False if ("1" != config.option("update-light")) else True)
   if is_not_exit or ("1" != config.option("update-light")):
+    git_fetch_tag_shallow(config.option("branch"))
     retCheckout = cmd("git", ["checkout", "-f", config.option("branch")], True)
     if (retCheckout != 0):
       print("branch does not exist...")
       print("switching to master...")
       cmd("git", ["checkout", "-f", "master"])
-    cmd("git", ["submodule", "update", "--init", "--recursive"], True)
+    cmd("git", ["submodule", "update", "--init", "--recursive"] + git_get_submodule_params(), True)
   if (0 != config.option("branch").find("tags/")):
     cmd("git", ["pull"], False if ("1" != config.option("update-light")) else True)
-    cmd("git", ["submodule", "update", "--recursive", "--remote"], True)
+    cmd("git", ["submodule", "update", "--recursive", "--remote"] + git_get_submodule_params(), True)
   os.chdir(old_cur)
+  if is_not_exit:
+    git_print_clone_info(repo, folder, start_time)
   return
 
 def get_repositories():
@@ -656,11 +740,13 @@ def create_pull_request(branches_to, repo, is_no_errors=False, is_current_dir=Fa
   if is_current_dir:
     folder = repo
   is_not_exit = False
+  start_time = time.time()
   if not is_dir(folder):
-    retClone = cmd("git", ["clone", url, folder], is_no_errors)
+    retClone = git_clone(repo, url, folder, is_no_errors)
     if retClone != 0:
       return
     is_not_exit = True
+    git_print_clone_info(repo, folder, start_time)
   old_cur = os.getcwd()
   os.chdir(folder)
   branch_from = config.option("branch")
@@ -680,22 +766,51 @@ def create_pull_request(branches_to, repo, is_no_errors=False, is_current_dir=Fa
   os.chdir(old_cur)
   return
 
+def update_repository(repo, value):
+  current_dir = value[1]
+  if current_dir == False:
+    git_update(repo, value[0], False)
+  else:
+    if is_dir(current_dir + "/.git"):
+      delete_dir_with_access_error(current_dir)
+      delete_dir(current_dir)
+    if not is_dir(current_dir):
+      create_dir(current_dir)
+    cur_dir = os.getcwd()
+    os.chdir(current_dir)
+    git_update(repo, value[0], True)
+    os.chdir(cur_dir)
+  return
+
+def get_git_jobs():
+  value = config.option("git-jobs")
+  if ("" == value):
+    return 1
+  return max(1, int(value))
+
+def update_repository_job(repo, value):
+  # output is captured, so git must not wait for credentials input
+  set_env("GIT_TERMINAL_PROMPT", "0")
+  update_repository(repo, value)
+  return
+
 def update_repositories(repositories):
+  max_parallel = min(get_git_jobs(), len(repositories))
+  if (max_parallel <= 1) or not scheduler.is_supported():
+    for repo in repositories:
+      update_repository(repo, repositories[repo])
+    return
+
+  tasks = []
   for repo in repositories:
-    value = repositories[repo]
-    current_dir = value[1]
-    if current_dir == False:
-      git_update(repo, value[0], False)
-    else:
-      if is_dir(current_dir + "/.git"):
-        delete_dir_with_access_error(current_dir)
-        delete_dir(current_dir)
-      if not is_dir(current_dir):
-        create_dir(current_dir)
-      cur_dir = os.getcwd()
-      os.chdir(current_dir)
-      git_update(repo, value[0], True)
-      os.chdir(cur_dir)
+    tasks.append({"name" : repo, "func" : update_repository_job, "args" : [repo, repositories[repo]], "depends" : []})
+  results = scheduler.run(tasks, max_parallel, True, True)
+  scheduler.print_summary(results, "repository")
+
+  failed = [repo for repo in results if (0 != results[repo]["code"])]
+  if (0 != len(failed)):
+    sys.exit("Error (git): " + ", ".join(failed))
+  return
 
 def git_dir():
   if ("windows" == host_platform()):
@@ -1190,19 +1305,36 @@ def web_apps_addons_param():
 
 # common apps
 def download(url, dst):
-  return cmd_exe("curl", ["-L", "-o", dst, url])
+  return downloader.download(url, dst)
 
 def extract(src, dst, is_no_errors=False):
+  if extract_in_process(src, dst, is_no_errors):
+    return 0
   app = "7za" if ("mac" == host_platform()) else "7z"
   return cmd_exe(app, ["x", "-y", src, "-o" + dst], is_no_errors)
 
+def extract_in_process(src, dst, is_no_errors=False):
+  if not is_file(src):
+    return False
+  try:
+    return archive.extract(get_path(src), get_path(dst))
+  except (IOError, OSError, EOFError, zipfile.BadZipfile, tarfile.TarError) as e:
+    if not is_no_errors:
+      sys.exit("Error (extract): " + src + " (" + str(e) + ")")
+    print("extract warning: " + src + " (" + str(e) + ")")
+    return True
+
 def extract_unicode(src, dst, is_no_errors=False):
+  if extract_in_process(src, dst, is_no_errors):
+    return
   if "windows" == host_platform():
     run_as_bat_win_isolate([u"chcp 65001", u"call 7z.exe x -y \"" + src + u"\" \"-o" + dst + u"\"", u"exit"])
     return
   return extract(src, dst, is_no_errors)
 
 def archive_folder(src, dst):
+  if archive.create(src, dst):
+    return 0
   app = "7za" if ("mac" == host_platform()) else "7z"
   return cmd_exe(app, ["a", dst, src])
 
@@ -1673,15 +1805,14 @@ def replaceFileLicence(path, license):
   replaceInFile(path, old_licence, license)
   return
 
-def copy_v8_files(core_dir, deploy_dir, platform, is_xp=False):
+def get_v8_files(core_dir, platform, is_xp=False):
   if (-1 != config.option("config").find("use_javascript_core")):
-    return
+    return ""
   directory_v8 = core_dir + "/Common/3dParty"
 
   if is_xp:
     directory_v8 += "/v8/v8_xp"
-    copy_files(directory_v8 + platform + "/release/icudt*.dll", deploy_dir + "/")
-    return
+    return directory_v8 + platform + "/release/icudt*.dll"
 
   if config.check_option("config", "v8_version_60"):
     directory_v8 += "/v8/v8/out.gn/"
@@ -1689,9 +1820,13 @@ def copy_v8_files(core_dir, deploy_dir, platform, is_xp=False):
     directory_v8 += "/v8_89/v8/out.gn/"
 
   if (0 == platform.find("win")):
-    copy_files(directory_v8 + platform + "/release/icudt*.dat", deploy_dir + "/")
-  else:
-    copy_files(directory_v8 + platform + "/icudt*.dat", deploy_dir + "/")
+    return directory_v8 + platform + "/release/icudt*.dat"
+  return directory_v8 + platform + "/icudt*.dat"
+
+def copy_v8_files(core_dir, deploy_dir, platform, is_xp=False):
+  v8_files = get_v8_files(core_dir, platform, is_xp)
+  if ("" != v8_files):
+    copy_files(v8_files, deploy_dir + "/")
   return
 
 def clone_marketplace_plugin(out_dir, is_name_as_guid=False, is_replace_paths=False, is_delete_git_dir=True, git_owner=""):
@@ -1783,27 +1918,22 @@ def convert_ios_framework_to_xcframework_folder(folder, libs):
     convert_ios_framework_to_xcframework(folder, lib)
   return
 
-def change_elf_rpath(path, origin):
+# returns [is_rpath, old_path, new_path] or None if the file is not a dynamic elf or is up to date
+def get_elf_rpath_change(path, origin):
   # excludes ---
   if (-1 != path.find("libicudata.so." + icu_ver)):
-    return
+    return None
   # ------------
-  tools_dir = get_script_dir() + "/../tools/linux/elf/"
-  result_obj = run_command(tools_dir + "readelf -d '" + path + "' | grep R*PATH")
-  result = result_obj["stdout"]
-  result_error = result_obj["stderr"]
-  if (result_error != ""):
-    return
-  if (-1 != result.find("Error:")) or (-1 != result.find(" ELF ")):
-    return
-  is_rpath = True
-  if (-1 != result.find("Library runpath: [")):
-    is_rpath = False
-  old_path = run_command(tools_dir + "patchelf --print-rpath '" + path + "'")['stdout']
+  info = elf.read_rpath(path)
+  if (info is None) or not info["is_dynamic"]:
+    return None
+  is_rpath = (info["runpath"] is None)
+  old_path = info["rpath"] if is_rpath else info["runpath"]
+  if old_path is None:
+    old_path = ""
   if (-1 != old_path.find(origin)):
-    return
+    return None
   new_path = old_path
-  new_path = new_path.replace("$ORIGIN", "\$ORIGIN")
   if ("" != new_path):
     new_path += ":"
   new_path += origin
@@ -1811,19 +1941,66 @@ def change_elf_rpath(path, origin):
     new_path += (":" + origin + "/converter")
   if (-1 != old_path.find("$ORIGIN/system")):
     new_path += (":" + origin + "/system")
-  if is_rpath:
-    cmd(tools_dir + "patchelf", ["--force-rpath", "--set-rpath", new_path, path], True)
-  else:
-    cmd(tools_dir + "patchelf", ["--set-rpath", new_path, path], True)
-  #print("[" + os.path.basename(path) + "] old: " + old_path + "; new: " + new_path)
+  return [is_rpath, old_path, new_path]
+
+def get_elf_rpath_command(path, change):
+  command = [get_script_dir() + "/../tools/linux/elf/patchelf"]
+  if change[0]:
+    command.append("--force-rpath")
+  return command + ["--set-rpath", change[2], path]
+
+def change_elf_rpath(path, origin):
+  change = get_elf_rpath_change(path, origin)
+  if change is None:
+    return
+  command = get_elf_rpath_command(path, change)
+  cmd(command[0], [arg.replace("$", "\\$") for arg in command[1:]], True)
   return
 
-def correct_elf_rpath_directory(directory, origin, is_recursion = True):
-  for file in glob.glob(directory + "/*"):
+def get_elf_files(directory, is_recursion=True, visited=None):
+  if visited is None:
+    visited = set()
+  files = []
+  for file in sorted(glob.glob(directory + "/*")):
     if is_file(file):
-      change_elf_rpath(file, origin)
+      # symlinks to the same library are patched once
+      real_path = os.path.realpath(file)
+      if not real_path in visited:
+        visited.add(real_path)
+        files.append(file)
     elif is_dir(file) and is_recursion:
-      correct_elf_rpath_directory(file, origin)
+      files += get_elf_files(file, is_recursion, visited)
+  return files
+
+def correct_elf_rpath_directory(directory, origin, is_recursion = True):
+  start_time = time.time()
+  files = get_elf_files(directory, is_recursion)
+  changes = []
+  elf_count = 0
+  for file in files:
+    if not elf.is_elf(file):
+      continue
+    elf_count += 1
+    change = get_elf_rpath_change(file, origin)
+    if change is not None:
+      changes.append([file, change])
+
+  def patch(item):
+    try:
+      return subprocess.call(get_elf_rpath_command(item[0], item[1]), stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    except OSError:
+      return 127
+
+  errors = []
+  if (0 != len(changes)):
+    with ThreadPoolExecutor(max_workers=min(len(changes), multiprocessing.cpu_count())) as executor:
+      for item, ret in zip(changes, executor.map(patch, changes)):
+        status = "ok" if (0 == ret) else ("error " + str(ret))
+        if (0 != ret):
+          errors.append(item[0])
+        print("[rpath] " + os.path.relpath(item[0], directory) + ": '" + item[1][1] + "' -> '" + item[1][2] + "' (" + status + ")")
+  print("[rpath] " + directory + ": files " + str(len(files)) + ", elf " + str(elf_count) + ", patched " + str(len(changes) - len(errors)) +
+        ", errors " + str(len(errors)) + ", up to date " + str(elf_count - len(changes)) + " (" + ("%.1f" % (time.time() - start_time)) + "s)")
   return
 
 def is_need_build_js():
@@ -7,6 +7,51 @@ import sys
 sys.path.append(os.path.dirname(__file__) + "/..")
 import sln
 import qmake
+import scheduler
+
+def make_project(platform, pro):
+  qmake_main_addon = ""
+  if (0 == platform.find("android")) and (-1 != pro.find("X2tConverter.pro")):
+    if config.check_option("config", "debug") and not config.check_option("config", "disable_x2t_debug_strip"):
+      print("[WARNING:] temporary enable strip for x2t library in debug")
+      qmake_main_addon += "build_strip_debug"
+
+  qmake.make(platform, pro, qmake_main_addon)
+  if config.check_option("platform", "ios") and config.check_option("config", "bundle_xcframeworks"):
+    qmake.make(platform, pro, "xcframework_platform_ios_simulator")
+  return
+
+def make_project_job(platform, pro, jobs):
+  # runs in the scheduler child process: the share of the global job budget is local to it
+  config.set_option("jobs", str(jobs))
+  make_project(platform, pro)
+  return
+
+def get_max_parallel_projects():
+  value = config.option("max-parallel-projects")
+  if ("" == value):
+    return 1
+  if ("auto" == value):
+    return max(1, qmake.get_jobs_count() // 4)
+  return max(1, int(value))
+
+def make_projects(platform, projects):
+  max_parallel = min(get_max_parallel_projects(), len(projects))
+  if (max_parallel <= 1) or not scheduler.is_supported():
+    for pro in projects:
+      make_project(platform, pro)
+    return
+
+  # split the global job budget between projects building at the same time
+  jobs = max(1, qmake.get_jobs_count() // max_parallel)
+  dependencies = sln.get_projects_dependencies(projects)
+  tasks = []
+  for pro in projects:
+    tasks.append({"name" : pro, "func" : make_project_job, "args" : [platform, pro, jobs], "depends" : dependencies[pro]})
+
+  print("[scheduler] projects: " + str(len(projects)) + ", parallel: " + str(max_parallel) + ", jobs per project: " + str(jobs))
+  scheduler.run(tasks, max_parallel)
+  return
 
 # make solution
 def make(solution=""):
@@ -23,16 +68,7 @@ def make(solution=""):
       solution = "./sln.json"
     projects = sln.get_projects(solution, platform)
 
-    for pro in projects:
-      qmake_main_addon = ""
-      if (0 == platform.find("android")) and (-1 != pro.find("X2tConverter.pro")):
-        if config.check_option("config", "debug") and not config.check_option("config", "disable_x2t_debug_strip"):
-          print("[WARNING:] temporary enable strip for x2t library in debug")
-          qmake_main_addon += "build_strip_debug"
-
-      qmake.make(platform, pro, qmake_main_addon)
-      if config.check_option("platform", "ios") and config.check_option("config", "bundle_xcframeworks"):
-        qmake.make(platform, pro, "xcframework_platform_ios_simulator")
+    make_projects(platform, projects)
 
   if config.check_option("module", "builder") and base.is_windows() and "onlyoffice" == config.branding():
     # check branding libs
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+import config
+import base
+import os
+import json
+
+# compiler cache (ccache/sccache) -----------------------
+# --compiler-cache: "ccache", "sccache" or a path to one of them
+
+def get_launcher():
+  return config.option("compiler-cache")
+
+def is_enabled():
+  return ("" != get_launcher())
+
+def is_sccache():
+  return (-1 != os.path.basename(get_launcher()).find("sccache"))
+
+# qmake: wraps compilers after the spec and project files are processed,
+# so custom QMAKE_CC/QMAKE_CXX (sysroot, clang specs, cross toolchains) are kept
+def qmake_params():
+  if not is_enabled():
+    return []
+  launcher = get_launcher()
+  return ["-after", "QMAKE_CC=" + launcher + " $$QMAKE_CC", "QMAKE_CXX=" + launcher + " $$QMAKE_CXX"]
+
+# cmake: only makefile/ninja generators support launchers
+def cmake_params():
+  if not is_enabled():
+    return []
+  launcher = get_launcher()
+  return ["-DCMAKE_C_COMPILER_LAUNCHER=" + launcher, "-DCMAKE_CXX_COMPILER_LAUNCHER=" + launcher]
+
+# boost: b2 user config with the launcher before the compiler
+# (own toolset version, because project-config.jam from bootstrap already initializes the toolset)
+def boost_params(toolset, compiler):
+  if not is_enabled():
+    return []
+  config_path = os.path.abspath("./compiler-cache-config.jam")
+  base.writeFile(config_path, "using " + toolset + " : cache : \"" + get_launcher() + "\" " + compiler + " ;\n")
+  return ["--user-config=" + config_path, "toolset=" + toolset + "-cache"]
+
+# statistics
+def get_stats():
+  if not is_enabled():
+    return None
+  result = {"hits" : 0, "misses" : 0}
+  if is_sccache():
+    output = base.run_command("\"" + get_launcher() + "\" --show-stats --stats-format=json")["stdout"]
+    try:
+      stats = json.loads(output)["stats"]
+      result["hits"] = sum(stats.get("cache_hits", {}).get("counts", {}).values())
+      result["misses"] = sum(stats.get("cache_misses", {}).get("counts", {}).values())
+    except (ValueError, KeyError, TypeError, AttributeError):
+      return None
+    return result
+
+  output = base.run_command("\"" + get_launcher() + "\" --print-stats")["stdout"]
+  if ("" == output):
+    return None
+  for line in output.split("\n"):
+    items = line.split()
+    if (2 != len(items)) or not items[1].isdigit():
+      continue
+    if items[0] in ["direct_cache_hit", "preprocessed_cache_hit"]:
+      result["hits"] += int(items[1])
+    elif ("cache_miss" == items[0]):
+      result["misses"] += int(items[1])
+  return result
+
+def print_stats(stage, stats_before):
+  stats = get_stats()
+  if (stats is None) or (stats_before is None):
+    return
+  hits = stats["hits"] - stats_before["hits"]
+  misses = stats["misses"] - stats_before["misses"]
+  rate = (100.0 * hits / (hits + misses)) if (0 != (hits + misses)) else 0.0
+  print("[compiler cache] " + stage + ": hits " + str(hits) + ", misses " + str(misses) + " (" + ("%.1f" % rate) + "%)")
+  return
+
+def call(stage, func, *args):
+  stats_before = get_stats()
+  ret = func(*args)
+  print_stats(stage, stats_before)
+  return ret
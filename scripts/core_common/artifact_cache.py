@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+import sys
+sys.path.append('..')
+import config
+import base
+import os
+import glob
+import json
+import hashlib
+import tarfile
+import time
+
+# prebuilt third-party modules are stored as tarballs in
+# <artifact-cache-dir>/<module>/<key>.tar.gz
+# key = hash of the module scripts/patches + platforms, compiler, sysroot, clang usage
+
+# module : [folder in core/Common/3dParty, outputs (globs, relative to folder), scripts & patches (relative to modules folder)]
+modules = {
+  "boost" : ["boost", ["boost.data", "build"], ["boost.py", "boost_qt.py"]],
+  "icu" : ["icu", ["module.version", "build", "android/build", "win_*", "linux_*", "mac_*"], ["icu.py", "icu_mac.py", "android/icu_android.py"]],
+  "openssl" : ["openssl", ["openssl.data", "build"], ["openssl.py", "openssl_mobile.py", "android/openssl_android.py"]],
+  "v8" : ["v8", ["v8.data", "v8/include", "v8/out.gn"], ["v8.py", "v8_89.py", "v8_89.patch"]],
+  "heif" : ["heif", ["module.version", "x265_git/build", "libde265/build", "libheif/build", "x265_git/source/x265.h", "libde265/libde265/de265.h"], ["heif.py"]]
+}
+
+stamp_name = ".artifact_cache"
+
+def is_enabled():
+  return ("" != config.option("artifact-cache-dir"))
+
+def get_cache_dir():
+  return os.path.abspath(config.option("artifact-cache-dir"))
+
+def get_max_size():
+  value = config.option("artifact-cache-size")
+  if ("" == value):
+    value = "20480"
+  return int(value) * 1024 * 1024
+
+def get_module_dir(name):
+  return os.path.abspath(base.get_script_dir() + "/../../core/Common/3dParty/" + modules[name][0])
+
+def get_key(name):
+  inputs = {
+    "name" : name,
+    "platform" : config.option("platform"),
+    "config" : config.option("config"),
+    "sysroot" : config.option("sysroot"),
+    "use-clang" : config.option("use-clang"),
+    "vs-version" : config.option("vs-version"),
+    "host" : base.host_platform() + "_" + base.get_platform(),
+    "files" : {}
+  }
+  compilers = {}
+  for platform in config.option("platform").split():
+    if platform in config.platforms:
+      compilers[platform] = config.check_compiler(platform)
+  inputs["compiler"] = compilers
+  if ("linux" == base.host_platform()):
+    inputs["gcc"] = base.get_gcc_version()
+
+  modules_dir = base.get_script_dir() + "/core_common/modules/"
+  for file in modules[name][2]:
+    if base.is_file(modules_dir + file):
+      with open(modules_dir + file, "rb") as content:
+        inputs["files"][file] = hashlib.sha256(content.read()).hexdigest()
+
+  content = json.dumps(inputs, sort_keys=True)
+  return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def get_archive(name, key):
+  return get_cache_dir() + "/" + name + "/" + key + ".tar.gz"
+
+def get_outputs(name):
+  module_dir = get_module_dir(name)
+  result = []
+  for pattern in modules[name][1]:
+    for path in sorted(glob.glob(module_dir + "/" + pattern)):
+      result.append(os.path.relpath(path, module_dir).replace("\\", "/"))
+  return result
+
+def read_stamp(name):
+  return base.readFile(get_module_dir(name) + "/" + stamp_name).strip()
+
+def write_stamp(name, key):
+  base.writeFile(get_module_dir(name) + "/" + stamp_name, key)
+  return
+
+def restore(name, key):
+  archive = get_archive(name, key)
+  if not base.is_file(archive):
+    return False
+  start_time = time.time()
+  module_dir = get_module_dir(name)
+  base.create_dir(module_dir)
+  # remove stale outputs
+  for path in get_outputs(name):
+    if base.is_dir(module_dir + "/" + path):
+      base.delete_dir(module_dir + "/" + path)
+    elif base.is_file(module_dir + "/" + path):
+      base.delete_file(module_dir + "/" + path)
+  try:
+    with tarfile.open(archive, "r:gz") as tar:
+      if hasattr(tarfile, "data_filter"):
+        tar.extractall(module_dir, filter="tar")
+      else:
+        tar.extractall(module_dir)
+  except (tarfile.TarError, IOError, OSError) as e:
+    print("[artifact cache] broken archive: " + archive + " (" + str(e) + ")")
+    base.delete_file(archive)
+    return False
+  # last access time is used for eviction
+  os.utime(archive, None)
+  write_stamp(name, key)
+  print("[artifact cache] restored: " + name + " (" + ("%.1f" % (time.time() - start_time)) + "s)")
+  return True
+
+def store(name, key):
+  outputs = get_outputs(name)
+  if (0 == len(outputs)):
+    return
+  archive = get_archive(name, key)
+  base.create_dir(os.path.dirname(archive))
+  archive_tmp = archive + "." + str(os.getpid()) + ".tmp"
+  module_dir = get_module_dir(name)
+  with tarfile.open(archive_tmp, "w:gz", compresslevel=1) as tar:
+    for path in outputs:
+      tar.add(module_dir + "/" + path, arcname=path)
+  os.replace(archive_tmp, archive)
+  write_stamp(name, key)
+  print("[artifact cache] stored: " + name + " (" + ("%.1f" % (os.path.getsize(archive) / (1024.0 * 1024.0))) + " MB)")
+  evict()
+  return
+
+def evict():
+  cache_dir = get_cache_dir()
+  archives = []
+  total_size = 0
+  for archive in glob.glob(cache_dir + "/*/*.tar.gz"):
+    stat = os.stat(archive)
+    archives.append([stat.st_mtime, stat.st_size, archive])
+    total_size += stat.st_size
+  archives.sort()
+  max_size = get_max_size()
+  for item in archives:
+    if (total_size <= max_size):
+      break
+    print("[artifact cache] evict: " + item[2])
+    base.delete_file(item[2])
+    total_size -= item[1]
+  return
+
+# runs make_func of the module through the cache
+def make(name, make_func, *args):
+  if not is_enabled() or not name in modules:
+    make_func(*args)
+    return
+
+  key = get_key(name)
+  if (read_stamp(name) != key) and restore(name, key):
+    return
+
+  make_func(*args)
+  if not base.is_file(get_archive(name, key)):
+    store(name, key)
+  elif (read_stamp(name) != key):
+    write_stamp(name, key)
+  return
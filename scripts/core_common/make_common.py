@@ -7,6 +7,8 @@ sys.path.append('..')
 import config
 import base
 import glob
+import artifact_cache
+import telemetry
 
 import boost
 import cef
@@ -34,33 +36,36 @@ def check_android_ndk_macos_arm(dir):
   return
 
 
+def make_module(name, func, *args):
+  return telemetry.call("module", name, func, *args)
+
 def make():
   if (config.check_option("platform", "android")) and (base.host_platform() == "mac") and (base.is_os_arm()):
     for toolchain in glob.glob(base.get_env("ANDROID_NDK_ROOT") + "/toolchains/*"):
       if base.is_dir(toolchain):
         check_android_ndk_macos_arm(toolchain + "/prebuilt")
 
-  boost.make()
-  cef.make()
-  icu.make()
-  openssl.make()
-  v8.make()
-  html2.make()
-  iwork.make(False)
-  md.make()
-  hunspell.make(False)
-  harfbuzz.make()
-  glew.make()
-  hyphen.make()
-  googletest.make()
-  oo_brotli.make()
-  heif.make()
+  make_module("boost", artifact_cache.make, "boost", boost.make)
+  make_module("cef", cef.make)
+  make_module("icu", artifact_cache.make, "icu", icu.make)
+  make_module("openssl", artifact_cache.make, "openssl", openssl.make)
+  make_module("v8", artifact_cache.make, "v8", v8.make)
+  make_module("html2", html2.make)
+  make_module("iwork", iwork.make, False)
+  make_module("md", md.make)
+  make_module("hunspell", hunspell.make, False)
+  make_module("harfbuzz", harfbuzz.make)
+  make_module("glew", glew.make)
+  make_module("hyphen", hyphen.make)
+  make_module("googletest", googletest.make)
+  make_module("oo_brotli", oo_brotli.make)
+  make_module("heif", artifact_cache.make, "heif", heif.make)
 
   if config.check_option("build-libvlc", "1"):
-    libvlc.make()
+    make_module("libvlc", libvlc.make)
 
   if config.check_option("module", "mobile"):
     if (config.check_option("platform", "android")):
-      curl.make()
-    websocket_all.make()
+      make_module("curl", curl.make)
+    make_module("websocket_all", websocket_all.make)
   return
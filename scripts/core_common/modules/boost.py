@@ -7,6 +7,7 @@ import base
 import os
 import glob
 import boost_qt
+import compiler_cache
 
 def move_debug_libs_windows(dir):
   base.create_dir(dir + "/debug")
@@ -105,6 +106,9 @@ def make():
       if "1" == config.option("use-clang"):
         addon_config = ["--with-toolset=clang"]
         addon_compile = ["cxxflags=-stdlib=libc++", "linkflags=-stdlib=libc++", "define=_LIBCPP_ENABLE_CXX17_REMOVED_UNARY_BINARY_FUNCTION"]
+        addon_compile += compiler_cache.boost_params("clang", "clang++")
+      else:
+        addon_compile += compiler_cache.boost_params("gcc", "g++")
       base.cmd("./bootstrap.sh", ["--with-libraries=filesystem,system,date_time,regex"] + addon_config)
       base.cmd("./b2", ["headers"])
       base.cmd("./b2", ["--clean"])
@@ -4,6 +4,7 @@ import sys
 sys.path.append('../..')
 import config
 import base
+import downloader
 import os
 import glob
 
@@ -23,6 +24,8 @@ def make():
   base.check_module_version("2", clear_module)
   platforms = ["win_64", "win_32", "win_64_xp", "win_32_xp", "linux_64", "linux_32", "mac_64", "mac_arm64", "win_arm64"]
 
+  # urls & archives
+  items = []
   for platform in platforms:
     if not config.check_option("platform", platform):
       continue
@@ -42,7 +45,12 @@ def make():
     else:
       url += "5414/"
 
-    url_platform = (url + platform + "/cef_binary.7z")
+    items.append([platform, url + platform + "/cef_binary.7z", archive_name])
+
+  # all freshness checks at once (cached, skipped in offline mode)
+  versions = downloader.get_remote_versions([item[1] for item in items], base_dir + "/versions.json")
+
+  for platform, url_platform, archive_name in items:
     archive_name_data = archive_name + ".data"
 
     if not base.is_dir(platform):
@@ -50,7 +58,8 @@ def make():
 
     os.chdir(platform)
     
-    data_url = base.get_file_last_modified_url(url_platform)
+    remote_version = versions[url_platform]
+    data_url = remote_version["version"] if (remote_version is not None) else None
     old_data_url = base.readFile(archive_name_data)
 
     build_dir_name = "build"
@@ -59,11 +68,15 @@ def make():
     if ("mac_64" == platform) and (config.check_option("config", "use_v8")):
       build_dir_name = "build_103"
 
-    if (data_url != old_data_url):
+    # unknown remote version (offline or not available): local files are trusted
+    if not downloader.is_version_actual(remote_version, old_data_url):
       if base.is_file(archive_name):
         base.delete_file(archive_name)
       if base.is_dir(build_dir_name):
         base.delete_dir(build_dir_name)
+    elif (data_url is not None) and (data_url != old_data_url):
+      # legacy Last-Modified value
+      base.writeFile(archive_name_data, data_url)
 
     if base.is_dir(build_dir_name):
       os.chdir(base_dir)
@@ -76,8 +89,8 @@ def make():
     # extract
     base.extract(archive_name, "./")
 
-    base.delete_file(archive_name_data)
-    base.writeFile(archive_name_data, data_url)
+    if (data_url is not None) or not base.is_file(archive_name_data):
+      base.writeFile(archive_name_data, data_url if (data_url is not None) else "")
 
     base.create_dir("./" + build_dir_name)
 
@@ -86,8 +99,9 @@ def make():
       base.cmd("mv", ["Chromium Embedded Framework.framework", build_dir_name + "/Chromium Embedded Framework.framework"])
       base.delete_dir("./Chromium Embedded Framework.framework")
     else:
-      base.copy_files("cef_binary/Release/*", build_dir_name + "/")
-      base.copy_files("cef_binary/Resources/*", build_dir_name + "/")
+      # same file system: files are renamed, not copied
+      base.move_files("cef_binary/Release/*", build_dir_name + "/")
+      base.move_files("cef_binary/Resources/*", build_dir_name + "/")
       if (0 == platform.find("linux")):
         base.cmd("chmod", ["a+xr", build_dir_name + "/locales"])
       base.delete_dir("./cef_binary")
@@ -3,6 +3,9 @@ sys.path.append('../..')
 import base
 import os
 import config
+import multiprocessing
+import scheduler
+import compiler_cache
 
 # NOTE:
 #  - requires CMake >= 3.21, < 4.0.0
@@ -129,6 +132,10 @@ def build_with_cmake(platform, cmake_args, build_type):
   # env setup for custom sysroot
   env_str = setup_custom_sysroot_env() if config.option("sysroot") != "" else ""
 
+  # compiler cache (launchers are not supported by Visual Studio/Xcode generators)
+  if "Unix Makefiles" in cmake_args_ext:
+    cmake_args_ext += compiler_cache.cmake_params()
+
   # run cmake
   base.cmd(env_str + "cmake", cmake_args + cmake_args_ext)
 
@@ -139,65 +146,75 @@ def build_with_cmake(platform, cmake_args, build_type):
     base.cmd("cmake", ["--build", ".", "--config", build_type])
   return
 
-# general make function that calls `build_func` callback for configured platform(s) with specified cmake arguments
-def make_common(build_func, cmake_args):
+# returns configured platform(s) in build order
+def get_platforms():
+  platforms = []
   # WINDOWS
   if "windows" == base.host_platform():
     # win_64
     if config.check_option("platform", "win_64") or config.check_option("platform", "win_64_xp"):
-      build_func("win_64", cmake_args)
+      platforms.append("win_64")
     # win_32
     if config.check_option("platform", "win_32") or config.check_option("platform", "win_32_xp"):
-      build_func("win_32", cmake_args)
+      platforms.append("win_32")
     # win_arm64
     if config.check_option("platform", "win_arm64"):
-      build_func("win_arm64", cmake_args)
+      platforms.append("win_arm64")
 
   # LINUX
   elif "linux" == base.host_platform():
     # linux_64
     if config.check_option("platform", "linux_64"):
-      build_func("linux_64", cmake_args)
+      platforms.append("linux_64")
     # linux_arm64
     if config.check_option("platform", "linux_arm64"):
-      build_func("linux_arm64", cmake_args)
+      platforms.append("linux_arm64")
 
   # MAC
   elif "mac" == base.host_platform():
     # mac_64
     if config.check_option("platform", "mac_64"):
-      build_func("mac_64", cmake_args)
+      platforms.append("mac_64")
     # mac_arm64
     if config.check_option("platform", "mac_arm64"):
-      build_func("mac_arm64", cmake_args)
+      platforms.append("mac_arm64")
 
     # IOS
     if -1 != config.option("platform").find("ios"):
       # ios (arm64)
-      build_func("ios", cmake_args)
+      platforms.append("ios")
       # ios simulator (x86_64 and arm64 FAT lib)
-      build_func("ios_simulator", cmake_args)
+      platforms.append("ios_simulator")
 
   # ANDROID
   if -1 != config.option("platform").find("android"):
     # android_arm64_v8a
     if config.check_option("platform", "android_arm64_v8a"):
-      build_func("android_arm64_v8a", cmake_args)
+      platforms.append("android_arm64_v8a")
     # android_armv7
     if config.check_option("platform", "android_armv7"):
-      build_func("android_armv7", cmake_args)
+      platforms.append("android_armv7")
     # android_x86
     if config.check_option("platform", "android_x86"):
-      build_func("android_x86", cmake_args)
+      platforms.append("android_x86")
     # android_x86_64
     if config.check_option("platform", "android_x86_64"):
-      build_func("android_x86_64", cmake_args)
+      platforms.append("android_x86_64")
+
+  return platforms
 
+# general make function that calls `build_func` callback for the given platform(s) with specified cmake arguments
+def make_common(build_func, cmake_args, platforms=None):
+  if platforms is None:
+    platforms = get_platforms()
+  for platform in platforms:
+    # every platform gets its own copy of arguments (build_with_cmake extends them)
+    build_func(platform, list(cmake_args))
   return
 
-def make_x265(base_dir, build_type):
-  # fetch lib repo
-  if not base.is_dir("x265_git"):
+def fetch_x265(base_dir):
+  if not base.is_dir(base_dir + "/x265_git"):
+    os.chdir(base_dir)
     fetch_repo("https://bitbucket.org/multicoreware/x265_git.git", f"Release_{X265_VERSION}")
     # fix x265 version detection so it reads version from x265Version.txt instead of parsing it from .git
     base.replaceInFile(
@@ -205,6 +222,11 @@ def make_x265(base_dir, build_type):
       "elseif(EXISTS ${CMAKE_CURRENT_SOURCE_DIR}/../x265Version.txt)",
       "endif()\n    if(EXISTS ${CMAKE_CURRENT_SOURCE_DIR}/../x265Version.txt)"
     )
+  return
+
+def make_x265(base_dir, build_type, platforms=None):
+  # fetch lib repo
+  fetch_x265(base_dir)
 
   # prepare cmake args
   cmake_dir = base_dir + "/x265_git/source"
@@ -247,13 +269,18 @@ def make_x265(base_dir, build_type):
     os.chdir(base_dir)
     return
 
-  make_common(build_x265, cmake_args)
+  make_common(build_x265, cmake_args, platforms)
   return
 
-def make_de265(base_dir, build_type):
-  # fetch lib repo
-  if not base.is_dir("libde265"):
+def fetch_de265(base_dir):
+  if not base.is_dir(base_dir + "/libde265"):
+    os.chdir(base_dir)
     fetch_repo("https://github.com/strukturag/libde265.git", f"v{DE265_VERSION}")
+  return
+
+def make_de265(base_dir, build_type, platforms=None):
+  # fetch lib repo
+  fetch_de265(base_dir)
 
   # prepare cmake args
   cmake_dir = base_dir + "/libde265"
@@ -291,12 +318,12 @@ def make_de265(base_dir, build_type):
     os.chdir(base_dir)
     return
 
-  make_common(build_de265, cmake_args)
+  make_common(build_de265, cmake_args, platforms)
   return
 
-def make_heif(base_dir, build_type):
-  # fetch lib repo
-  if not base.is_dir("libheif"):
+def fetch_heif(base_dir):
+  if not base.is_dir(base_dir + "/libheif"):
+    os.chdir(base_dir)
     fetch_repo("https://github.com/strukturag/libheif.git", f"v{HEIF_VERSION}")
     # do not build heifio module
     base.replaceInFile(
@@ -309,6 +336,11 @@ def make_heif(base_dir, build_type):
       "if (DOXYGEN_FOUND)",
       "if (FALSE)"
     )
+  return
+
+def make_heif(base_dir, build_type, platforms=None):
+  # fetch lib repo
+  fetch_heif(base_dir)
 
   # prepare cmake args
   cmake_dir = base_dir + "/libheif"
@@ -372,7 +404,7 @@ def make_heif(base_dir, build_type):
     os.chdir(base_dir)
     return
 
-  make_common(build_heif, cmake_args)
+  make_common(build_heif, cmake_args, platforms)
   return
 
 def clear_module():
@@ -402,13 +434,35 @@ def make():
     if not base.is_file(IOS_CMAKE_TOOLCHAIN_FILE):
       fetch_repo("https://github.com/leetal/ios-cmake.git", IOS_CMAKE_VERSION)
 
-  # build encoder library
-  make_x265(base_dir, build_type)
-  # build decoder library
-  make_de265(base_dir, build_type)
+  # fetch sources before the build, so platform builds do not race for them
+  fetch_x265(base_dir)
+  fetch_de265(base_dir)
+  fetch_heif(base_dir)
+  os.chdir(base_dir)
+
+  platforms = get_platforms()
+  # every cmake build runs "make -j4"
+  max_parallel = min(3 * len(platforms), max(1, multiprocessing.cpu_count() // 4))
+  if (max_parallel <= 1) or not scheduler.is_supported():
+    # build encoder library
+    make_x265(base_dir, build_type, platforms)
+    # build decoder library
+    make_de265(base_dir, build_type, platforms)
+
+    # build libheif
+    make_heif(base_dir, build_type, platforms)
+
+    os.chdir(old_dir)
+    return
 
-  # build libheif
-  make_heif(base_dir, build_type)
+  # libheif for a platform depends on x265 and de265 for the same platform.
+  # every task is a separate process with its own build dir and cwd
+  tasks = []
+  for platform in platforms:
+    tasks.append({"name" : "x265_" + platform, "func" : make_x265, "args" : [base_dir, build_type, [platform]], "depends" : []})
+    tasks.append({"name" : "de265_" + platform, "func" : make_de265, "args" : [base_dir, build_type, [platform]], "depends" : []})
+    tasks.append({"name" : "heif_" + platform, "func" : make_heif, "args" : [base_dir, build_type, [platform]], "depends" : ["x265_" + platform, "de265_" + platform]})
+  scheduler.run(tasks, max_parallel)
 
   os.chdir(old_dir)
   return
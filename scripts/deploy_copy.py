@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+
+import config
+import base
+import os
+import sys
+import glob
+import stat
+import time
+import shutil
+import hashlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+  import fcntl
+except ImportError:
+  fcntl = None
+
+# deploy copy engine ------------------------------------
+# deploy scripts collect (src, dst) file entries into a manifest, then run() copies
+# them in a thread pool. a file is skipped if the destination has the same size and
+# mtime (or the same content hash). --deploy-link-mode:
+#   "copy"     - always copy
+#   "reflink"  - copy-on-write clone when the file system supports it (default)
+#   "hardlink" - hard links for files on the same file system (deploy output must
+#                not be modified in place afterwards, otherwise the build output changes too)
+
+FICLONE = 0x40049409
+
+def create():
+  # files: dst -> src, dirs: destination folders mirrored by add_dir (extra files are removed),
+  # keep: destination paths created outside of the manifest
+  return {"files" : {}, "dirs" : [], "keep" : []}
+
+def _norm(path):
+  return os.path.normpath(os.path.abspath(path))
+
+def add_file(manifest, src, dst):
+  if not base.is_file(src):
+    print("copy warning [file not exist]: " + src)
+    return
+  if base.is_dir(dst):
+    dst = dst + "/" + os.path.basename(src)
+  manifest["files"][_norm(dst)] = _norm(src)
+  return
+
+def add_files(manifest, src, dst):
+  for file in glob.glob(src):
+    file_name = os.path.basename(file)
+    if base.is_file(file):
+      add_file(manifest, file, dst + "/" + file_name)
+    elif base.is_dir(file):
+      add_files(manifest, file + "/*", dst + "/" + file_name)
+  return
+
+def add_dir(manifest, src, dst):
+  if not base.is_dir(src):
+    print("copy warning [folder not exist]: " + src)
+    return
+  src = _norm(src)
+  dst = _norm(dst)
+  for root, dirs, files in os.walk(src, followlinks=True):
+    relative = os.path.relpath(root, src)
+    dst_root = dst if ("." == relative) else os.path.join(dst, relative)
+    for file in files:
+      manifest["files"][os.path.join(dst_root, file)] = os.path.join(root, file)
+  manifest["dirs"].append(dst)
+  return
+
+def add_exe(manifest, src, dst, name):
+  exe_ext = ""
+  if ("windows" == base.host_platform()):
+    exe_ext = ".exe"
+  add_file(manifest, src + "/" + name + exe_ext, dst + "/" + name + exe_ext)
+  return
+
+def add_lib(manifest, src, dst, name):
+  if (config.check_option("config", "bundle_dylibs")) and base.is_dir(src + "/" + name + ".framework"):
+    # frameworks contain symlinks (and may be converted to xcframeworks)
+    base.copy_lib(src, dst, name)
+    for item in [".framework", ".xcframework"]:
+      manifest["keep"].append(_norm(dst + "/" + name + item))
+    return
+
+  lib_ext = ".so"
+  if ("windows" == base.host_platform()):
+    lib_ext = ".dll"
+  elif ("mac" == base.host_platform()):
+    lib_ext = ".dylib"
+  file_src = src + "/"
+  if not ("windows" == base.host_platform()):
+    file_src += "lib"
+  file_src += name
+  if not base.is_file(file_src + lib_ext):
+    if base.is_file(file_src + ".a"):
+      lib_ext = ".a"
+    elif base.is_file(file_src + ".lib"):
+      lib_ext = ".lib"
+    elif base.is_file(file_src + ".so"):
+      lib_ext = ".so"
+
+  lib_dst = dst + "/"
+  if not ("windows" == base.host_platform()):
+    lib_dst += "lib"
+  add_file(manifest, file_src + lib_ext, lib_dst + name + lib_ext)
+  return
+
+def keep(manifest, path):
+  manifest["keep"].append(_norm(path))
+  return
+
+# copy ---------------------------------------------------
+def get_link_mode():
+  mode = config.option("deploy-link-mode")
+  if not mode in ["copy", "reflink", "hardlink"]:
+    mode = "reflink"
+  return mode
+
+def get_jobs():
+  if ("" != config.option("deploy-jobs")):
+    return max(1, int(config.option("deploy-jobs")))
+  return min(32, 2 * multiprocessing.cpu_count())
+
+def get_file_hash(path):
+  hash = hashlib.sha256()
+  with open(path, "rb") as file:
+    for chunk in iter(lambda: file.read(1024 * 1024), b""):
+      hash.update(chunk)
+  return hash.hexdigest()
+
+def _is_same(src, dst, src_stat):
+  try:
+    dst_stat = os.stat(dst)
+  except OSError:
+    return False
+  if not stat.S_ISREG(dst_stat.st_mode) or (src_stat.st_size != dst_stat.st_size):
+    return False
+  if (int(src_stat.st_mtime) == int(dst_stat.st_mtime)):
+    return True
+  if (get_file_hash(src) == get_file_hash(dst)):
+    # same content: keep the file, just sync the times
+    os.utime(dst, (src_stat.st_atime, src_stat.st_mtime))
+    return True
+  return False
+
+def _clone(src, dst):
+  if (fcntl is None) or not sys.platform.startswith("linux"):
+    return False
+  try:
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+      fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+  except (IOError, OSError):
+    if os.path.isfile(dst):
+      os.remove(dst)
+    return False
+  shutil.copystat(src, dst)
+  return True
+
+def _copy_file(src, dst, mode):
+  src_stat = os.stat(src)
+  if _is_same(src, dst, src_stat):
+    return "skipped"
+  dst_dir = os.path.dirname(dst)
+  if not os.path.isdir(dst_dir):
+    os.makedirs(dst_dir, exist_ok=True)
+  # never write through an existing file (it may be a hard link to the build output)
+  tmp = dst + ".deploy.tmp"
+  result = "copied"
+  if ("hardlink" == mode) and (os.stat(dst_dir).st_dev == src_stat.st_dev):
+    try:
+      os.link(src, tmp)
+      result = "linked"
+    except OSError:
+      pass
+  if ("copied" == result) and ("copy" != mode) and _clone(src, tmp):
+    result = "cloned"
+  if ("copied" == result):
+    shutil.copy2(src, tmp)
+  os.replace(tmp, dst)
+  return result
+
+def _is_kept(path, kept):
+  for item in kept:
+    if (path == item) or path.startswith(item + os.sep):
+      return True
+  return False
+
+def _prune(manifest, prune_dir):
+  roots = list(manifest["dirs"])
+  if ("" != prune_dir):
+    roots.append(_norm(prune_dir))
+  removed = 0
+  for root in roots:
+    if not os.path.isdir(root):
+      continue
+    for path, dirs, files in os.walk(root, topdown=False):
+      if _is_kept(path, manifest["keep"]):
+        continue
+      for file in files:
+        file_path = os.path.join(path, file)
+        if not file_path in manifest["files"] and not _is_kept(file_path, manifest["keep"]):
+          os.remove(file_path)
+          removed += 1
+      for dir in dirs:
+        dir_path = os.path.join(path, dir)
+        if os.path.islink(dir_path):
+          if not _is_kept(dir_path, manifest["keep"]):
+            os.remove(dir_path)
+        elif (0 == len(os.listdir(dir_path))) and not _is_kept(dir_path, manifest["keep"]):
+          os.rmdir(dir_path)
+  return removed
+
+# prune_dir: files in this folder that are not in the manifest (or kept) are removed
+def run(manifest, prune_dir=""):
+  start_time = time.time()
+  mode = get_link_mode()
+  removed = _prune(manifest, prune_dir)
+  stats = {"copied" : 0, "cloned" : 0, "linked" : 0, "skipped" : 0}
+  size = 0
+  items = sorted(manifest["files"].items())
+  with ThreadPoolExecutor(max_workers=get_jobs()) as executor:
+    futures = [[dst, executor.submit(_copy_file, src, dst, mode)] for dst, src in items]
+    errors = []
+    for dst, future in futures:
+      try:
+        result = future.result()
+      except (IOError, OSError) as e:
+        errors.append(dst + " (" + str(e) + ")")
+        continue
+      stats[result] += 1
+      if ("skipped" != result):
+        size += os.path.getsize(dst)
+  print("[deploy] files: " + str(len(items)) + ", copied: " + str(stats["copied"]) + ", cloned: " + str(stats["cloned"]) +
+        ", linked: " + str(stats["linked"]) + ", skipped: " + str(stats["skipped"]) + ", removed: " + str(removed) +
+        ", " + ("%.1f" % (size / (1024.0 * 1024.0))) + " MB, " + ("%.1f" % (time.time() - start_time)) + "s")
+  if (0 != len(errors)):
+    for error in errors:
+      print("copy error: " + error)
+    sys.exit("Error (deploy): " + str(len(errors)) + " file(s) not copied")
+  return
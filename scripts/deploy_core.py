@@ -2,6 +2,7 @@
 
 import config
 import base
+import deploy_copy
 import os
 
 def make():
@@ -19,53 +20,58 @@ def make():
       continue
 
     archive_dir = base_dir + ("/" + native_platform + "/" + branding + "/core")
-    if (base.is_dir(archive_dir)):
-      base.delete_dir(archive_dir)
     base.create_dir(archive_dir)
 
     platform = native_platform
     platform_postfix = platform + base.qt_dst_postfix()
 
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "kernel")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "kernel_network")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "graphics")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "doctrenderer")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "DjVuFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "XpsFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "OFDFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "PdfFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "HtmlFile2")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "UnicodeConverter")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "Fb2File")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "EpubFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "IWorkFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "HWPFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "DocxRenderer")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, archive_dir, "hunspell")
-    base.copy_file(git_dir + "/sdkjs/pdf/src/engine/cmap.bin", archive_dir + "/cmap.bin")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "x2t")
+    # the folder is synchronized with the manifest (unchanged files are not copied again)
+    manifest = deploy_copy.create()
+    deploy_copy.keep(manifest, archive_dir + "/dictionaries")
 
-    base.copy_dir(base_dir + "/js/" + branding + "/builder/sdkjs", archive_dir + "/sdkjs")
-    base.create_dir(archive_dir + "/sdkjs/vendor")
-    base.copy_dir(base_dir + "/js/" + branding + "/builder/web-apps/vendor/jquery", archive_dir + "/sdkjs/vendor/jquery")
-    base.copy_dir(base_dir + "/js/" + branding + "/builder/web-apps/vendor/xregexp", archive_dir + "/sdkjs/vendor/xregexp")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "kernel")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "kernel_network")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "graphics")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "doctrenderer")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "DjVuFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "XpsFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "OFDFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "PdfFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "HtmlFile2")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "UnicodeConverter")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "Fb2File")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "EpubFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "IWorkFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "HWPFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "DocxRenderer")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, archive_dir, "hunspell")
+    deploy_copy.add_file(manifest, git_dir + "/sdkjs/pdf/src/engine/cmap.bin", archive_dir + "/cmap.bin")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "x2t")
+
+    deploy_copy.add_dir(manifest, base_dir + "/js/" + branding + "/builder/sdkjs", archive_dir + "/sdkjs")
+    deploy_copy.add_dir(manifest, base_dir + "/js/" + branding + "/builder/web-apps/vendor/jquery", archive_dir + "/sdkjs/vendor/jquery")
+    deploy_copy.add_dir(manifest, base_dir + "/js/" + branding + "/builder/web-apps/vendor/xregexp", archive_dir + "/sdkjs/vendor/xregexp")
 
     if ("windows" == base.host_platform()):
-      base.copy_files(core_dir + "/Common/3dParty/icu/" + platform + "/build/*.dll", archive_dir + "/")
+      deploy_copy.add_files(manifest, core_dir + "/Common/3dParty/icu/" + platform + "/build/*.dll", archive_dir)
     else:
       if not (0 == platform.find("mac") and config.check_option("config", "bundle_dylibs")):
-        base.copy_files(core_dir + "/Common/3dParty/icu/" + platform + "/build/*", archive_dir + "/")
-    base.copy_v8_files(core_dir, archive_dir, platform)
+        deploy_copy.add_files(manifest, core_dir + "/Common/3dParty/icu/" + platform + "/build/*", archive_dir)
+    v8_files = base.get_v8_files(core_dir, platform)
+    if ("" != v8_files):
+      deploy_copy.add_files(manifest, v8_files, archive_dir)
+
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "allfontsgen")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "allthemesgen")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "pluginsmanager")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "standardtester")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "x2ttester")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "ooxml_crypt")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "vboxtester")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "metafiletester")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, archive_dir, "dictionariestester")
 
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "allfontsgen")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "allthemesgen")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "pluginsmanager")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "standardtester")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "x2ttester")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "ooxml_crypt")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "vboxtester")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "metafiletester")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, archive_dir, "dictionariestester")
+    deploy_copy.run(manifest, archive_dir)
 
     # correct mac frameworks
     if (0 == platform.find("mac")):
@@ -2,6 +2,7 @@
 
 import config
 import base
+import deploy_copy
 import os
 import platform
 import glob
@@ -58,25 +59,26 @@ def make():
 
     # x2t
     base.create_dir(root_dir + "/converter")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "kernel")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "kernel_network")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "UnicodeConverter")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "graphics")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "PdfFile")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "DjVuFile")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "XpsFile")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "OFDFile")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "HtmlFile2")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "Fb2File")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "EpubFile")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "IWorkFile")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "HWPFile")
-    base.copy_lib(build_libraries_path, root_dir + "/converter", "DocxRenderer")
+    manifest = deploy_copy.create()
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "kernel")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "kernel_network")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "UnicodeConverter")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "graphics")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "PdfFile")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "DjVuFile")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "XpsFile")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "OFDFile")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "HtmlFile2")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "Fb2File")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "EpubFile")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "IWorkFile")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "HWPFile")
+    deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "DocxRenderer")
 
     if ("ios" == platform):
-      base.copy_lib(build_libraries_path, root_dir + "/converter", "x2t")
+      deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "x2t")
     else:
-      base.copy_exe(core_build_dir + "/bin/" + platform_postfix, root_dir + "/converter", "x2t")
+      deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, root_dir + "/converter", "x2t")
 
     #if (native_platform == "linux_64"):
     #  base.generate_check_linux_system(git_dir + "/build_tools", root_dir + "/converter")
@@ -86,25 +88,29 @@ def make():
 
     # doctrenderer
     if isWindowsXP:
-      base.copy_lib(build_libraries_path + "/xp", root_dir + "/converter", "doctrenderer")
+      deploy_copy.add_lib(manifest, build_libraries_path + "/xp", root_dir + "/converter", "doctrenderer")
     else:
-      base.copy_lib(build_libraries_path, root_dir + "/converter", "doctrenderer")
-    base.copy_v8_files(core_dir, root_dir + "/converter", platform, isWindowsXP)
+      deploy_copy.add_lib(manifest, build_libraries_path, root_dir + "/converter", "doctrenderer")
+    v8_files = base.get_v8_files(core_dir, platform, isWindowsXP)
+    if ("" != v8_files):
+      deploy_copy.add_files(manifest, v8_files, root_dir + "/converter")
+
+    deploy_copy.add_dir(manifest, git_dir + "/document-templates/new", root_dir + "/converter/empty")
+    deploy_copy.add_dir(manifest, git_dir + "/desktop-apps/common/templates", root_dir + "/converter/templates")
+
+    deploy_copy.add_dir(manifest, git_dir  + "/core-fonts/opensans",   root_dir + "/fonts")
+    deploy_copy.add_dir(manifest, git_dir  + "/core-fonts/asana",      root_dir + "/fonts/asana")
+    deploy_copy.add_dir(manifest, git_dir  + "/core-fonts/caladea",    root_dir + "/fonts/caladea")
+    deploy_copy.add_dir(manifest, git_dir  + "/core-fonts/crosextra",  root_dir + "/fonts/crosextra")
+    deploy_copy.add_dir(manifest, git_dir  + "/core-fonts/openoffice", root_dir + "/fonts/openoffice")
+    deploy_copy.add_file(manifest, git_dir + "/core-fonts/ASC.ttf",    root_dir + "/fonts/ASC.ttf")
+    deploy_copy.run(manifest)
 
     base.generate_doctrenderer_config(root_dir + "/converter/DoctRenderer.config", "../editors/", "desktop", "", "../dictionaries")
-    base.copy_dir(git_dir + "/document-templates/new", root_dir + "/converter/empty")
-    base.copy_dir(git_dir + "/desktop-apps/common/templates", root_dir + "/converter/templates")
 
     # dictionaries
     base.copy_dictionaries(git_dir + "/dictionaries", root_dir + "/dictionaries")
 
-    base.copy_dir(git_dir  + "/core-fonts/opensans",   root_dir + "/fonts")
-    base.copy_dir(git_dir  + "/core-fonts/asana",      root_dir + "/fonts/asana")
-    base.copy_dir(git_dir  + "/core-fonts/caladea",    root_dir + "/fonts/caladea")
-    base.copy_dir(git_dir  + "/core-fonts/crosextra",  root_dir + "/fonts/crosextra")
-    base.copy_dir(git_dir  + "/core-fonts/openoffice", root_dir + "/fonts/openoffice")
-    base.copy_file(git_dir + "/core-fonts/ASC.ttf",    root_dir + "/fonts/ASC.ttf")
-
     # cef
     build_dir_name = "build"
     if (0 == platform.find("linux")) and (config.check_option("config", "cef_version_107")):
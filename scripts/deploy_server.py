@@ -2,6 +2,7 @@
 
 import config
 import base
+import deploy_copy
 
 import re
 import shutil
@@ -78,23 +79,34 @@ def make():
     converter_dir = root_dir + "/server/FileConverter/bin"
     base.create_dir(converter_dir)
 
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "kernel")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "kernel_network")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "UnicodeConverter")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "graphics")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "PdfFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "DjVuFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "XpsFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "OFDFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "HtmlFile2")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "doctrenderer")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "Fb2File")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "EpubFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "IWorkFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "HWPFile")
-    base.copy_lib(core_build_dir + "/lib/" + platform_postfix, converter_dir, "DocxRenderer")
-    base.copy_file(git_dir + "/sdkjs/pdf/src/engine/cmap.bin", converter_dir + "/cmap.bin")
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, converter_dir, "x2t")
+    manifest = deploy_copy.create()
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "kernel")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "kernel_network")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "UnicodeConverter")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "graphics")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "PdfFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "DjVuFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "XpsFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "OFDFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "HtmlFile2")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "doctrenderer")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "Fb2File")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "EpubFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "IWorkFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "HWPFile")
+    deploy_copy.add_lib(manifest, core_build_dir + "/lib/" + platform_postfix, converter_dir, "DocxRenderer")
+    deploy_copy.add_file(manifest, git_dir + "/sdkjs/pdf/src/engine/cmap.bin", converter_dir + "/cmap.bin")
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, converter_dir, "x2t")
+
+    # builder
+    deploy_copy.add_exe(manifest, core_build_dir + "/bin/" + platform_postfix, converter_dir, "docbuilder")
+    deploy_copy.add_dir(manifest, git_dir + "/document-templates/new/en-US", converter_dir + "/empty")
+
+    # js
+    js_dir = root_dir
+    deploy_copy.add_dir(manifest, base_dir + "/js/" + branding + "/builder/sdkjs", js_dir + "/sdkjs")
+    deploy_copy.add_dir(manifest, base_dir + "/js/" + branding + "/builder/web-apps", js_dir + "/web-apps")
+    deploy_copy.run(manifest)
 
     #if (native_platform == "linux_64"):
     #  base.generate_check_linux_system(git_dir + "/build_tools", converter_dir)
@@ -106,18 +118,11 @@ def make():
 
     base.copy_v8_files(core_dir, converter_dir, platform)
 
-    # builder
-    base.copy_exe(core_build_dir + "/bin/" + platform_postfix, converter_dir, "docbuilder")
-    base.copy_dir(git_dir + "/document-templates/new/en-US", converter_dir + "/empty")
-
     # correct mac frameworks
     if (0 == platform.find("mac")):
       base.for_each_framework(converter_dir, "mac", callbacks=[base.generate_plist], max_depth=1)
 
     # js
-    js_dir = root_dir
-    base.copy_dir(base_dir + "/js/" + branding + "/builder/sdkjs", js_dir + "/sdkjs")
-    base.copy_dir(base_dir + "/js/" + branding + "/builder/web-apps", js_dir + "/web-apps")
     for file in glob.glob(js_dir + "/web-apps/apps/*/*/*.js.map") \
               + glob.glob(js_dir + "/web-apps/apps/*/mobile/dist/js/*.js.map"):
       base.delete_file(file)
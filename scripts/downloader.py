@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+
+import config
+import base
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+  from urllib.request import Request, urlopen
+  from urllib.error import HTTPError, URLError
+except ImportError:
+  from urllib2 import Request, urlopen, HTTPError, URLError
+
+# download manager --------------------------------------
+# options (configure.py or OO_* environment variables for tools that do not parse the config):
+#   download-cache-dir   - content store: <dir>/<key[0:2]>/<key>/<file name> + meta.json,
+#                          key = sha256(url + "\n" + pinned sha256) (or sha256(url) for not pinned urls)
+#   download-mirror      - http(s) url of a content store copy (for example the cache dir served
+#                          by any http server), it is tried before the original url
+#   download-manifest    - json { "url" : "sha256", ... } with pinned hashes
+#                          (default: build_tools/downloads.json if exists)
+#   download-pin         - "1": record hashes of not pinned downloads into the manifest
+#   download-connections - number of range requests for big files (default 4)
+# not pinned urls in the store are revalidated with ETag/Last-Modified
+
+CHUNK_SIZE = 1024 * 1024
+PARALLEL_MIN_SIZE = 32 * 1024 * 1024
+RETRIES = 5
+TIMEOUT = 60
+
+manifest = None
+manifest_lock = threading.Lock()
+
+def get_option(name):
+  if hasattr(config, "options"):
+    return config.option(name)
+  return os.environ.get("OO_" + name.upper().replace("-", "_"), "")
+
+def get_connections():
+  value = get_option("download-connections")
+  return min(64, max(1, int(value))) if ("" != value) else 4
+
+def get_manifest_path():
+  if ("" != get_option("download-manifest")):
+    return os.path.abspath(get_option("download-manifest"))
+  return os.path.abspath(os.path.dirname(os.path.abspath(__file__)) + "/../downloads.json")
+
+def get_manifest():
+  global manifest
+  if manifest is None:
+    manifest = {}
+    path = get_manifest_path()
+    if os.path.isfile(path):
+      with open(path, "r") as file:
+        manifest = json.load(file)
+  return manifest
+
+def get_pinned_hash(url):
+  return get_manifest().get(url, "").lower()
+
+def pin_hash(url, hash):
+  with manifest_lock:
+    get_manifest()[url] = hash
+    with open(get_manifest_path(), "w") as file:
+      json.dump(manifest, file, sort_keys=True, indent=2)
+  print("[download] pinned: " + url + " " + hash)
+  return
+
+def get_file_hash(path):
+  hash = hashlib.sha256()
+  with open(path, "rb") as file:
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+      hash.update(chunk)
+  return hash.hexdigest()
+
+def get_file_name(url):
+  name = url.split("?")[0].rstrip("/").split("/")[-1]
+  return name if ("" != name) else "download"
+
+# content store
+def get_key(url, hash):
+  return hashlib.sha256((url + "\n" + hash).encode("utf-8")).hexdigest()
+
+def get_store_path(key, url):
+  return os.path.abspath(get_option("download-cache-dir")) + "/" + key[0:2] + "/" + key + "/" + get_file_name(url)
+
+def get_store_meta(path):
+  meta_file = os.path.dirname(path) + "/meta.json"
+  if not os.path.isfile(meta_file) or not os.path.isfile(path):
+    return None
+  try:
+    with open(meta_file, "r") as file:
+      meta = json.load(file)
+  except ValueError:
+    return None
+  if (meta.get("size", -1) != os.path.getsize(path)):
+    return None
+  return meta
+
+def put_store(path, src, meta):
+  base.create_dir(os.path.dirname(path))
+  tmp = path + "." + str(os.getpid()) + ".tmp"
+  shutil.copyfile(src, tmp)
+  os.replace(tmp, path)
+  with open(os.path.dirname(path) + "/meta.json", "w") as file:
+    json.dump(meta, file, sort_keys=True, indent=2)
+  return
+
+def copy_result(src, dst):
+  dst_dir = os.path.dirname(os.path.abspath(dst))
+  if not os.path.isdir(dst_dir):
+    os.makedirs(dst_dir)
+  if os.path.isfile(dst):
+    os.remove(dst)
+  shutil.copyfile(src, dst)
+  return
+
+# http
+def open_url(url, headers={}, method="GET"):
+  request = Request(url, headers=dict(headers, **{"User-Agent" : "build_tools"}))
+  request.get_method = lambda: method
+  return urlopen(request, timeout=TIMEOUT)
+
+def get_remote_info(url, headers={}):
+  try:
+    response = open_url(url, headers, "HEAD")
+  except HTTPError as e:
+    if (304 == e.code):
+      return {"not_modified" : True}
+    if (e.code in [405, 501]):
+      # HEAD is not allowed: plain download
+      return {"url" : url, "size" : -1, "ranges" : False, "etag" : "", "last_modified" : "", "not_modified" : False}
+    raise
+  info = {
+    "url" : response.geturl(),
+    "size" : int(response.headers.get("Content-Length", "-1")),
+    "ranges" : ("bytes" == response.headers.get("Accept-Ranges", "").lower()),
+    "etag" : response.headers.get("ETag", ""),
+    "last_modified" : response.headers.get("Last-Modified", ""),
+    "not_modified" : False
+  }
+  response.close()
+  return info
+
+def retry(func, *args):
+  for attempt in range(RETRIES):
+    try:
+      return func(*args)
+    except (HTTPError) as e:
+      if (e.code in [400, 401, 403, 404, 410]) or (attempt == RETRIES - 1):
+        raise
+      error = e
+    except (URLError, IOError, OSError) as e:
+      if (attempt == RETRIES - 1):
+        raise
+      error = e
+    print("[download] retry " + str(attempt + 1) + ": " + str(error))
+    time.sleep(2 ** attempt)
+  return None
+
+# downloads [start, end] (end = -1: till the end) into part_file, continues existing part_file
+def fetch_range(url, part_file, start, end):
+  offset = os.path.getsize(part_file) if os.path.isfile(part_file) else 0
+  if (-1 != end) and (start + offset > end):
+    return
+  headers = {}
+  if (0 != start + offset) or (-1 != end):
+    headers["Range"] = "bytes=" + str(start + offset) + "-" + ("" if (-1 == end) else str(end))
+  response = open_url(url, headers)
+  mode = "ab"
+  if ("Range" in headers) and (206 != response.getcode()):
+    # no range support: start again
+    if (0 != start) or (-1 != end):
+      response.close()
+      raise IOError("range requests are not supported: " + url)
+    mode = "wb"
+  with open(part_file, mode) as file:
+    for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+      file.write(chunk)
+  response.close()
+  if (-1 != end) and (os.path.getsize(part_file) != end - start + 1):
+    raise IOError("incomplete range: " + part_file)
+  return
+
+def fetch(url, dst):
+  part_file = dst + ".download"
+  state_file = part_file + ".json"
+  info = retry(get_remote_info, url)
+
+  # parts of another remote version can not be resumed
+  state = {"url" : url, "size" : info["size"], "etag" : info["etag"], "last_modified" : info["last_modified"]}
+  old_state = None
+  if os.path.isfile(state_file):
+    try:
+      with open(state_file, "r") as file:
+        old_state = json.load(file)
+    except ValueError:
+      pass
+  parts = [part_file] + [part_file + "." + str(index) for index in range(64)]
+  if (old_state != state):
+    for path in parts:
+      if os.path.isfile(path):
+        os.remove(path)
+  with open(state_file, "w") as file:
+    json.dump(state, file)
+
+  connections = get_connections()
+  if info["ranges"] and (info["size"] >= PARALLEL_MIN_SIZE) and (connections > 1):
+    part_size = (info["size"] + connections - 1) // connections
+    ranges = []
+    for index in range(connections):
+      start = index * part_size
+      end = min(info["size"], start + part_size) - 1
+      ranges.append([info["url"], part_file + "." + str(index), start, end])
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+      futures = [executor.submit(retry, fetch_range, *item) for item in ranges]
+      for future in futures:
+        future.result()
+    with open(part_file, "wb") as file:
+      for item in ranges:
+        with open(item[1], "rb") as part:
+          shutil.copyfileobj(part, file, CHUNK_SIZE)
+    for item in ranges:
+      os.remove(item[1])
+  elif not os.path.isfile(part_file) or (os.path.getsize(part_file) != info["size"]):
+    retry(fetch_range, info["url"], part_file, 0, -1)
+
+  if (-1 != info["size"]) and (os.path.getsize(part_file) != info["size"]):
+    os.remove(part_file)
+    raise IOError("size mismatch: " + url)
+  os.remove(state_file)
+  return [part_file, info]
+
+def fetch_with_curl(url, dst):
+  part_file = dst + ".download"
+  base.cmd_exe("curl", ["-L", "--retry", str(RETRIES), "-C", "-", "-o", part_file, url])
+  return [part_file, {"etag" : "", "last_modified" : ""}]
+
+def get_source(url, dst):
+  try:
+    return fetch(url, dst)
+  except (URLError, IOError, OSError, ValueError) as e:
+    print("[download] " + url + ": " + str(e) + ", using curl")
+    return fetch_with_curl(url, dst)
+
+def download(url, dst):
+  start_time = time.time()
+  dst = os.path.abspath(dst)
+  base.create_dir(os.path.dirname(dst))
+  pinned = get_pinned_hash(url)
+  is_store = ("" != get_option("download-cache-dir"))
+  store_path = get_store_path(get_key(url, pinned), url) if is_store else ""
+  source = "origin"
+  part_file = ""
+  meta = {}
+
+  if is_store and (get_store_meta(store_path) is not None):
+    meta = get_store_meta(store_path)
+    if ("" != pinned):
+      source = "store"
+    else:
+      # not pinned: revalidate
+      headers = {}
+      if ("" != meta.get("etag", "")):
+        headers["If-None-Match"] = meta["etag"]
+      if ("" != meta.get("last_modified", "")):
+        headers["If-Modified-Since"] = meta["last_modified"]
+      try:
+        info = get_remote_info(url, headers) if (0 != len(headers)) else {"not_modified" : False}
+        if info["not_modified"] or ((meta.get("etag", "") == info.get("etag", "")) and ("" != meta.get("etag", ""))):
+          source = "store"
+      except (URLError, IOError, OSError) as e:
+        print("[download] " + url + ": " + str(e) + ", using the stored copy")
+        source = "store"
+
+  if ("store" != source) and ("" != get_option("download-mirror")):
+    key = get_key(url, pinned)
+    mirror_url = get_option("download-mirror").rstrip("/") + "/" + key[0:2] + "/" + key + "/" + get_file_name(url)
+    try:
+      part_file, info = fetch(mirror_url, dst)
+      source = "mirror"
+    except (URLError, IOError, OSError, ValueError) as e:
+      print("[download] mirror: " + str(e))
+      for path in [dst + ".download", dst + ".download.json"]:
+        if os.path.isfile(path):
+          os.remove(path)
+
+  if ("store" == source):
+    copy_result(store_path, dst)
+  else:
+    if ("" == part_file):
+      part_file, info = get_source(url, dst)
+    hash = get_file_hash(part_file)
+    if ("" != pinned) and (hash != pinned):
+      os.remove(part_file)
+      sys.exit("Error (download): sha256 mismatch for " + url + ": " + hash + " (expected: " + pinned + ")")
+    if ("" == pinned) and ("1" == get_option("download-pin")):
+      pin_hash(url, hash)
+    if is_store:
+      meta = {"url" : url, "sha256" : hash, "size" : os.path.getsize(part_file),
+              "etag" : info.get("etag", ""), "last_modified" : info.get("last_modified", "")}
+      put_store(store_path, part_file, meta)
+      if ("1" == get_option("download-pin")) and ("" == pinned):
+        # keep the store keyed by the pinned hash too
+        put_store(get_store_path(get_key(url, hash), url), part_file, meta)
+    if os.path.isfile(dst):
+      os.remove(dst)
+    os.replace(part_file, dst)
+
+  print("[download] " + url + " (" + source + ", " + ("%.1f" % (os.path.getsize(dst) / (1024.0 * 1024.0))) + " MB, " + ("%.1f" % (time.time() - start_time)) + "s)")
+  return 0
+
+# freshness checks --------------------------------------
+# remote versions ({"version" : ETag or Last-Modified, "last_modified" : Last-Modified})
+# of several urls are requested concurrently and cached in cache_file for
+# download-check-ttl seconds (default 3600).
+# with download-offline = "1" no requests are made: the version is None (unknown),
+# callers must trust local files in this case
+def get_check_ttl():
+  value = get_option("download-check-ttl")
+  return int(value) if ("" != value) else 3600
+
+def is_offline():
+  return ("1" == get_option("download-offline"))
+
+def get_remote_version(url):
+  try:
+    info = get_remote_info(url)
+  except (URLError, IOError, OSError, ValueError) as e:
+    print("[download] version check failed: " + url + " (" + str(e) + ")")
+    return None
+  version = info["etag"] if ("" != info["etag"]) else info["last_modified"]
+  return {"version" : version, "last_modified" : info["last_modified"]} if ("" != version) else None
+
+# older scripts saved base.get_file_last_modified_url (" " + Last-Modified) next to
+# the local files, such a value is actual too (the caller rewrites it with the version)
+def is_version_actual(remote, data):
+  if (remote is None) or (remote["version"] == data):
+    return True
+  return ("" != remote["last_modified"]) and ((" " + remote["last_modified"]) == data)
+
+def get_remote_versions(urls, cache_file):
+  result = {}
+  if is_offline():
+    for url in urls:
+      result[url] = None
+    return result
+
+  cache = {}
+  if os.path.isfile(cache_file):
+    try:
+      with open(cache_file, "r") as file:
+        cache = json.load(file)
+    except ValueError:
+      cache = {}
+
+  now = time.time()
+  requests = []
+  for url in urls:
+    item = cache.get(url)
+    if item and (now - item["time"] < get_check_ttl()):
+      result[url] = {"version" : item["version"], "last_modified" : item.get("last_modified", "")}
+    elif not url in requests:
+      requests.append(url)
+
+  if (0 != len(requests)):
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+      for url, version in zip(requests, executor.map(get_remote_version, requests)):
+        result[url] = version
+        if version is not None:
+          cache[url] = {"version" : version["version"], "last_modified" : version["last_modified"], "time" : now}
+    with open(cache_file, "w") as file:
+      json.dump(cache, file, sort_keys=True, indent=2)
+  return result
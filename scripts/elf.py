@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+import struct
+
+# minimal elf reader ------------------------------------
+# reads DT_RPATH/DT_RUNPATH from the dynamic segment without external tools
+
+PT_LOAD = 1
+PT_DYNAMIC = 2
+DT_NULL = 0
+DT_STRTAB = 5
+DT_RPATH = 15
+DT_RUNPATH = 29
+
+def is_elf(path):
+  try:
+    with open(path, "rb") as file:
+      return (b"\x7fELF" == file.read(4))
+  except (IOError, OSError):
+    return False
+
+def _read_string(file, offset):
+  file.seek(offset)
+  result = b""
+  while True:
+    chunk = file.read(256)
+    if not chunk:
+      break
+    pos = chunk.find(b"\x00")
+    if (-1 != pos):
+      result += chunk[:pos]
+      break
+    result += chunk
+  return result.decode("utf-8", "replace")
+
+def _vaddr_to_offset(segments, vaddr):
+  for p_offset, p_vaddr, p_filesz in segments:
+    if (p_vaddr <= vaddr) and (vaddr < p_vaddr + p_filesz):
+      return p_offset + (vaddr - p_vaddr)
+  return -1
+
+# returns None for non-elf (or broken) files, otherwise
+# { "is_dynamic" : bool, "rpath" : str/None, "runpath" : str/None }
+def read_rpath(path):
+  try:
+    with open(path, "rb") as file:
+      ident = file.read(16)
+      if (16 != len(ident)) or (b"\x7fELF" != ident[0:4]):
+        return None
+      is_64 = (2 == ident[4])
+      endian = "<" if (1 == ident[5]) else ">"
+      if is_64:
+        header = struct.unpack(endian + "HHIQQQIHHHHHH", file.read(48))
+      else:
+        header = struct.unpack(endian + "HHIIIIIHHHHHH", file.read(36))
+      ph_offset, ph_size, ph_count = header[4], header[8], header[9]
+
+      segments = []
+      dynamic = None
+      for index in range(ph_count):
+        file.seek(ph_offset + index * ph_size)
+        if is_64:
+          p_type, p_flags, p_offset, p_vaddr, p_paddr, p_filesz = struct.unpack(endian + "IIQQQQ", file.read(40))
+        else:
+          p_type, p_offset, p_vaddr, p_paddr, p_filesz = struct.unpack(endian + "IIIII", file.read(20))
+        if (PT_LOAD == p_type):
+          segments.append([p_offset, p_vaddr, p_filesz])
+        elif (PT_DYNAMIC == p_type):
+          dynamic = [p_offset, p_filesz]
+
+      result = {"is_dynamic" : (dynamic is not None), "rpath" : None, "runpath" : None}
+      if dynamic is None:
+        return result
+
+      entry_format = endian + ("qQ" if is_64 else "iI")
+      entry_size = struct.calcsize(entry_format)
+      file.seek(dynamic[0])
+      data = file.read(dynamic[1])
+      strtab = -1
+      values = {}
+      for pos in range(0, len(data) - entry_size + 1, entry_size):
+        tag, value = struct.unpack(entry_format, data[pos:pos + entry_size])
+        if (DT_NULL == tag):
+          break
+        if (DT_STRTAB == tag):
+          strtab = value
+        elif tag in [DT_RPATH, DT_RUNPATH]:
+          values[tag] = value
+      if (0 == len(values)):
+        return result
+      strtab_offset = _vaddr_to_offset(segments, strtab)
+      if (strtab_offset < 0):
+        return None
+      if DT_RPATH in values:
+        result["rpath"] = _read_string(file, strtab_offset + values[DT_RPATH])
+      if DT_RUNPATH in values:
+        result["runpath"] = _read_string(file, strtab_offset + values[DT_RUNPATH])
+      return result
+  except (IOError, OSError, struct.error):
+    return None
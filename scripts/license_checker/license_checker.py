@@ -1,10 +1,19 @@
+import io
 import os
 import re
 import enum
 import json
 import codecs
+import time
+import hashlib
+import argparse
+import subprocess
+import concurrent.futures
 
-CONFIG_PATH = 'config.json'
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(SCRIPT_DIR, 'config.json')
+"""Number of characters read from the beginning of a file to find the license."""
+HEADER_SIZE = 8192
 
 class ErrorType(enum.Enum):
 	INVALID_LICENSE = 1
@@ -45,7 +54,21 @@ class Config(object):
 		self._ignoreListDir = ignoreListDir
 		self._ignoreListDirName = ignoreListDirName
 		self._ignoreListFile = ignoreListFile
+		"""Precompiled lookups, paths are normalized once instead of for every visited file."""
+		self._extensionSet = set(fileExtensions)
+		self._allowFileSet = set(map(os.path.normpath, allowListFile))
+		self._ignoreFileSet = set(map(os.path.normpath, ignoreListFile))
+		self._allowDirSet = set()
+		for path in self._allowFileSet:
+			path = os.path.dirname(path)
+			while path and not path in self._allowDirSet:
+				self._allowDirSet.add(path)
+				path = os.path.dirname(path)
+		ignoreDirs = ignoreListDirName + list(map(os.path.normpath, ignoreListDir))
+		self._ignoreDirPattern = re.compile('|'.join(map(re.escape, ignoreDirs))) if ignoreDirs else None
 		"""Read license template."""
+		if not os.path.isabs(licensePath):
+			licensePath = os.path.join(SCRIPT_DIR, licensePath)
 		with open(licensePath, 'r', encoding="utf8") as file:
 			lines = file.readlines()
 			if not lines:
@@ -54,6 +77,7 @@ class Config(object):
 			self._startMultiComm = non_empty_lines[0]
 			self._endMultiComm = non_empty_lines[-1]
 			self._license_lines = lines
+			self._licenseHash = hashlib.sha256(''.join(lines).encode('utf-8')).hexdigest()
 
 	def getDir(self) -> str:
 		return self._dir
@@ -73,11 +97,27 @@ class Config(object):
 		return self._ignoreListDirName
 	def getIgnoreListFile(self) -> list[str]:
 		return self._ignoreListFile
+	def getLicenseHash(self) -> str:
+		return self._licenseHash
+	def isCheckedExtension(self, path: str) -> bool:
+		return os.path.splitext(path)[1] in self._extensionSet
+	def isAllowedFile(self, path: str) -> bool:
+		return path in self._allowFileSet
+	def isAllowedDir(self, path: str) -> bool:
+		"""Checks if a folder contains allowed files (it is walked even if ignored)."""
+		return path in self._allowDirSet
+	def isIgnoredFile(self, path: str) -> bool:
+		return path in self._ignoreFileSet
+	def isIgnoredDir(self, path: str) -> bool:
+		"""Ignored folder paths and names are matched as a part of the path."""
+		return bool(self._ignoreDirPattern and self._ignoreDirPattern.search(path))
 
 with open(CONFIG_PATH, 'r') as j:
 	_json: dict = json.load(j)
-	BASE_PATH: str = _json.get('basePath') or '../../../'
+	BASE_PATH: str = os.path.join(SCRIPT_DIR, _json.get('basePath') or '../../../')
 	REPORT_FOLDER: str = _json.get('reportFolder') or 'build_tools/scripts/license_checker/reports'
+	CACHE_PATH: str = _json.get('cachePath') or f'{REPORT_FOLDER}/cache.json'
+	JOBS: int = _json.get('jobs') or os.cpu_count() or 1
 	if (_json.get('fix')):
 		try:
 			FIX: list[ErrorType] = list(map(lambda x: FIX_TYPES[x], _json.get('fix')))
@@ -188,16 +228,32 @@ class Checker(object):
 			return Report(pathToFile=pathToFile,
 				error=Error(errorType=ErrorType.INVALID_LICENSE),
 				message=f'Found {invalidLinesCount} wrong lines out of {len(license)}')
+	def readHeader(self, pathToFile: str) -> list[str]:
+		"""Reads the lines at the beginning of a file, the whole file only if the license does not end there."""
+		with open(pathToFile, 'r', encoding="utf-8-sig") as file:
+			data = file.read(HEADER_SIZE)
+			if len(data) < HEADER_SIZE:
+				return io.StringIO(data).readlines()
+			lines = io.StringIO(data).readlines()[:-1]
+			test = self.findLicense(lines=lines)
+			# the license (or the blank lines before it) may continue after the header
+			if len(test) == len([line for line in lines if line != '\n']):
+				file.seek(0)
+				return file.readlines()
+			return lines
+	def getReport(self, pathToFile: str) -> Report:
+		"""Checks a file for a valid license, returns None if the license is ok."""
+		test = self.findLicense(lines=self.readHeader(pathToFile))
+		if test:
+			return self._checkLicense(test=test, pathToFile=pathToFile)
+		return Report(pathToFile=pathToFile, error=Error(errorType=ErrorType.NO_LICENSE))
+	def addReport(self, report: Report) -> None:
+		self._reports.append(report)
 	def checkFile(self, pathToFile: str) -> None:
 		"""Checks a file for a valid license."""
-		with open(pathToFile, 'r', encoding="utf-8-sig") as file:
-			test = self.findLicense(lines=file.readlines())
-			if test:
-				result = self._checkLicense(test=test, pathToFile=pathToFile)
-				if result:
-					self._reports.append(result)
-			else:
-				self._reports.append(Report(pathToFile=pathToFile, error=Error(errorType=ErrorType.NO_LICENSE)))
+		result = self.getReport(pathToFile)
+		if result:
+			self._reports.append(result)
 		return
 
 class Walker(object):
@@ -210,39 +266,129 @@ class Walker(object):
 		return self._config
 	def _getFiles(self) -> list[str]:
 		result = []
-		for address, dirs, files in os.walk(self._config.getDir()):
+		config = self._config
+		for address, dirs, files in os.walk(config.getDir()):
+			"""Ignored folders are not walked, except the ones with allowed files."""
+			isIgnored = config.isIgnoredDir(address)
+			dirs[:] = [i for i in dirs if not config.isIgnoredDir(os.path.join(address, i)) or config.isAllowedDir(os.path.join(address, i))]
 			for i in files:
-				if (os.path.join(address, i) in list(map(lambda x: os.path.normpath(x), self._config.getAllowListFile()))):
-					filename, file_extension = os.path.splitext(i)
-					if file_extension in self._config.getFileExtensions():
-						result.append(os.path.join(address, i))
-			else:
-				for i in self._config.getIgnoreListDirName():
-					if(re.search(re.escape(i), address)):
-						break
-				else:
-					for i in self._config.getIgnoreListDir():
-						if(re.search(re.escape(os.path.normpath(i)), address)):
-							break
-					else:
-						for i in files:
-							if not (os.path.join(address, i) in list(map(lambda x: os.path.normpath(x), self._config.getIgnoreListFile()))):
-								filename, file_extension = os.path.splitext(i)
-								if file_extension in self._config.getFileExtensions():
-									result.append(os.path.join(address, i))
+				path = os.path.join(address, i)
+				if not config.isCheckedExtension(i):
+					continue
+				if config.isAllowedFile(path) or (not isIgnored and not config.isIgnoredFile(path)):
+					result.append(path)
 		return result
+	def filterFiles(self, paths: list[str]) -> list[str]:
+		"""Applies the config extensions and ignore rules to a list of paths."""
+		result = []
+		config = self._config
+		for path in map(os.path.normpath, paths):
+			if not config.isCheckedExtension(path):
+				continue
+			if config.isAllowedFile(path) or (not config.isIgnoredDir(os.path.dirname(path)) and not config.isIgnoredFile(path)):
+				result.append(path)
+		return result
+	def isGitCheckout(self) -> bool:
+		dir = self._config.getDir()
+		if not os.path.isdir(dir):
+			return False
+		result = subprocess.run(['git', '-C', dir, 'rev-parse', '--is-inside-work-tree'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8')
+		return result.returncode == 0 and result.stdout.strip() == 'true'
+	def getChangedFiles(self, rev: str) -> list[str]:
+		"""Changed/added files since the revision (and untracked files) from git of the config folder, raises on git errors."""
+		dir = self._config.getDir()
+		commands = [
+			['git', '-C', dir, 'diff', '--name-only', '--relative', '--diff-filter=ACMR', rev, '--'],
+			['git', '-C', dir, 'ls-files', '--others', '--exclude-standard']
+		]
+		paths = []
+		for command in commands:
+			result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8')
+			if result.returncode != 0:
+				raise Exception(f'{" ".join(command[3:5])}: {(result.stderr.strip().splitlines() or [""])[0]}')
+			paths += [os.path.join(dir, i) for i in result.stdout.splitlines() if i]
+		return self.filterFiles(sorted(set(paths)))
 	def checkFiles(self) -> list[Report]:
-		files = self._getFiles()
-		for file in files:
+		checkWalkers(walkers=[self], cache=loadCache())
+		return self._checker.getReports()
+
+"""Checking in worker processes, one checker per config."""
+_workerCheckers: list[Checker] = []
+
+def _initWorker(configs: list[Config]) -> None:
+	global _workerCheckers
+	_workerCheckers = [Checker(config=config) for config in configs]
+
+def _checkInWorker(task: tuple[int, str]) -> tuple:
+	index, pathToFile = task
+	try:
+		report = _workerCheckers[index].getReport(pathToFile)
+	except Exception as e:
+		return (None, '', str(e))
+	if report:
+		return (report.getError().getErrorType().name, report.getMessage(), None)
+	return (None, '', None)
+
+def loadCache() -> dict:
+	try:
+		with open(CACHE_PATH, 'r', encoding="utf8") as file:
+			return json.load(file)
+	except (OSError, ValueError):
+		return {}
+
+def saveCache(cache: dict) -> None:
+	folder = os.path.dirname(CACHE_PATH)
+	if folder and not os.path.exists(folder):
+		os.makedirs(folder)
+	with open(CACHE_PATH, 'w', encoding="utf8") as file:
+		json.dump(cache, file)
+
+def checkWalkers(walkers: list[Walker], cache: dict, files: list[list[str]] = None) -> dict:
+	"""
+	Checks files of all walkers in a process pool.
+	Results are cached by (path, mtime, size, license template hash), unchanged files are not read.
+	Returns the updated cache with the checked files only.
+	"""
+	configs = [walker.getConfig() for walker in walkers]
+	tasks = []
+	keys = []
+	newCache = {}
+	for index, walker in enumerate(walkers):
+		config = configs[index]
+		for file in (files[index] if files is not None else walker._getFiles()):
 			if (PRINT_CHECKING):
 				print(f'Checking {file}...')
-			# self._checker.checkFile(file)
 			try:
-				self._checker.checkFile(file)
-			except Exception as e:
-				print(file)	
-				print(e)			
-		return self._checker.getReports()
+				stat = os.stat(file)
+			except OSError as e:
+				print(file)
+				print(e)
+				continue
+			key = f'{config.getLicenseHash()}:{file}'
+			value = [stat.st_mtime_ns, stat.st_size]
+			cached = cache.get(key)
+			if cached and cached[0:2] == value:
+				newCache[key] = cached
+				if cached[2]:
+					walker.getChecker().addReport(Report(pathToFile=file, error=Error(errorType=ErrorType[cached[2]]), message=cached[3]))
+				continue
+			tasks.append((index, file))
+			keys.append((key, value))
+	if JOBS > 1 and len(tasks) > 64:
+		with concurrent.futures.ProcessPoolExecutor(max_workers=JOBS, initializer=_initWorker, initargs=(configs,)) as executor:
+			results = list(executor.map(_checkInWorker, tasks, chunksize=64))
+	else:
+		_initWorker(configs)
+		results = list(map(_checkInWorker, tasks))
+	for (index, file), (key, value), (errorType, message, exception) in zip(tasks, keys, results):
+		if exception is not None:
+			print(file)
+			print(exception)
+			continue
+		newCache[key] = value + [errorType, message]
+		if errorType:
+			walkers[index].getChecker().addReport(Report(pathToFile=file, error=Error(errorType=ErrorType[errorType]), message=message))
+	return newCache
 
 class Fixer(object):
 	def __init__(self, walker: Walker) -> int:
@@ -300,6 +446,31 @@ def fix(walkers):
 		count += fixer.fix()
 	print(f'Fixed {count} files.')
 
+def writeSummary(reports: list[Report], checked: int, elapsed: float, rev: str = None, skipped: list[str] = [], failed: list[str] = []) -> None:
+	"""Machine-readable summary: counts by error type, all reports and the config folders which were not checked."""
+	summary = {
+		'mode': 'changed-since' if rev else 'full',
+		'rev': rev,
+		'checked': checked,
+		'skipped': skipped,
+		'failed': failed,
+		'invalid': len(reports),
+		'time': round(elapsed, 3),
+		'errors': {i.name: 0 for i in ErrorType},
+		'reports': []
+	}
+	for i in reports:
+		summary['errors'][i.getError().getErrorType().name] += 1
+		summary['reports'].append({
+			'path': i.getPathToFile().replace('\\', '/'),
+			'error': i.getError().getErrorType().name,
+			'message': i.getMessage()
+		})
+	if not os.path.exists(REPORT_FOLDER):
+		os.makedirs(REPORT_FOLDER)
+	with open(f'{REPORT_FOLDER}/summary.json', 'w', encoding="utf8") as f:
+		json.dump(summary, f, indent=2)
+
 def writeReports(reports: list[Report]) -> None:
 	files: dict[str, list[Report]] = dict()
 	for i in ErrorType:
@@ -310,30 +481,68 @@ def writeReports(reports: list[Report]) -> None:
 		with open(f'{REPORT_FOLDER}/{i.name}.txt', 'w', encoding="utf8") as f:
 			f.writelines(map(lambda x: "".join([x.report(), '\n']), files.get(i.name)))
 
-for config in CONFIGS:
-	walkers.append(Walker(config=config))
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='License checker')
+	parser.add_argument('--changed-since', dest='changedSince', default=None,
+		help='check only files changed/added since the git revision (in every config folder), exit code 1 if invalid licenses are found')
+	args = parser.parse_args()
+	startTime = time.time()
 
-print('Checking files...')
+	for config in CONFIGS:
+		walkers.append(Walker(config=config))
 
-for walker in walkers:
-	reports = reports + walker.checkFiles()
+	files: list[list[str]] = []
+	skipped: list[str] = []
+	failed: list[str] = []
+	if args.changedSince:
+		print(f'Checking files changed since {args.changedSince}...')
+		for walker in walkers:
+			dir = walker.getConfig().getDir()
+			files.append([])
+			if not walker.isGitCheckout():
+				print(f'Skipping {dir}: not a git checkout')
+				skipped.append(dir)
+				continue
+			try:
+				files[-1] = walker.getChangedFiles(args.changedSince)
+			except Exception as e:
+				print(f'Error in {dir}: {e}')
+				failed.append(dir)
+	else:
+		print('Checking files...')
+		files = [walker._getFiles() for walker in walkers]
 
-if reports:
-	if not os.path.exists(REPORT_FOLDER):
-		os.mkdir(REPORT_FOLDER)
-	if PRINT_REPORTS:
-		print('\n'.join(map(lambda report: report.report(), reports)))
-	print(f'{len(reports)} invalid licenses were found.')
-	print(f'Saving reports in {REPORT_FOLDER}')
-	writeReports(reports=reports)
-	if FIX:
-		fix(walkers=walkers)
-	# else:
-		# choice = str(input(f'Fix it automatically? [Y/N] ')).lower()
-		# if choice == 'y':
-			# fix(walkers=walkers)
-else:
-	print('All licenses are ok.')
+	cache = loadCache()
+	checkedCache = checkWalkers(walkers=walkers, cache=cache, files=files)
+	if args.changedSince:
+		cache.update(checkedCache)
+		checkedCache = cache
+	saveCache(checkedCache)
+	for walker in walkers:
+		reports = reports + walker.getChecker().getReports()
+	writeSummary(reports=reports, checked=sum(map(len, files)), elapsed=time.time() - startTime, rev=args.changedSince, skipped=skipped, failed=failed)
+
+	if reports:
+		if not os.path.exists(REPORT_FOLDER):
+			os.mkdir(REPORT_FOLDER)
+		if PRINT_REPORTS:
+			print('\n'.join(map(lambda report: report.report(), reports)))
+		print(f'{len(reports)} invalid licenses were found.')
+		print(f'Saving reports in {REPORT_FOLDER}')
+		writeReports(reports=reports)
+		if FIX:
+			fix(walkers=walkers)
+		# else:
+			# choice = str(input(f'Fix it automatically? [Y/N] ')).lower()
+			# if choice == 'y':
+				# fix(walkers=walkers)
+	elif not failed:
+		print('All licenses are ok.')
 
-# os.system('pause')
+	# os.system('pause')
 
+	if failed:
+		print(f'Changed files are unknown in {len(failed)} folders.')
+		exit(2)
+	if args.changedSince and reports:
+		exit(1)
@@ -10,6 +10,11 @@ import base
 import config
 import android_ndk
 import multiprocessing
+import hashlib
+import json
+import sln
+import telemetry
+import compiler_cache
 
 def get_make_file_suffix(platform):
   suffix = platform
@@ -18,11 +23,71 @@ def get_make_file_suffix(platform):
   suffix += config.option("branding")
   return suffix
 
+def get_jobs_count():
+  if ("" != config.option("jobs")):
+    return max(1, int(config.option("jobs")))
+  return multiprocessing.cpu_count()
+
 def get_j_num():
   if ("0" != config.option("multiprocess")):
-    return ["-j" + str(multiprocessing.cpu_count())]
+    return ["-j" + str(get_jobs_count())]
   return []
 
+# incremental qmake -----------------------------------
+# the manifest stored next to the makefile describes all qmake inputs.
+# if it is not changed, the makefile (and object files) are reused
+def is_incremental():
+  # an explicit clean build always regenerates and cleans
+  return ("0" != config.option("qmake-incremental")) and ("1" != config.option("clean"))
+
+def get_manifest_file(makefile):
+  return makefile + ".manifest"
+
+def get_file_hash(path):
+  hash = hashlib.sha256()
+  with open(path, "rb") as file:
+    for chunk in iter(lambda: file.read(1024 * 1024), b""):
+      hash.update(chunk)
+  return hash.hexdigest()
+
+def get_manifest(platform, file_pro, qt_dir, build_params):
+  files = {}
+  for file in sorted(sln.get_project_info(file_pro)["files"]):
+    files[file.replace("\\", "/")] = get_file_hash(file)
+  inputs = {
+    "platform" : platform,
+    "files" : files,
+    "params" : build_params,
+    "qt_dir" : qt_dir,
+    "qmake_env_addon" : base.get_env("QT_QMAKE_ADDON"),
+    "compiler" : config.check_compiler(platform),
+    "use-clang" : config.option("use-clang"),
+    "sysroot" : config.option("sysroot"),
+    "arm64-toolchain-bin" : config.option("arm64-toolchain-bin"),
+    "compiler-cache" : compiler_cache.get_launcher()
+  }
+  content = json.dumps(inputs, sort_keys=True)
+  return {"hash" : hashlib.sha256(content.encode("utf-8")).hexdigest(), "inputs" : inputs}
+
+def is_manifest_actual(makefile, manifest):
+  manifest_file = get_manifest_file(makefile)
+  if not base.is_file(makefile) or not base.is_file(manifest_file):
+    return False
+  try:
+    old_manifest = json.loads(base.readFile(manifest_file))
+  except ValueError:
+    return False
+  return (old_manifest.get("hash", "") == manifest["hash"])
+
+def save_manifest(makefile, manifest):
+  base.writeFile(get_manifest_file(makefile), json.dumps(manifest, sort_keys=True, indent=2))
+  return
+
+def delete_manifest(makefile):
+  if base.is_file(get_manifest_file(makefile)):
+    base.delete_file(get_manifest_file(makefile))
+  return
+
 def check_support_platform(platform):
   qt_dir = base.qt_setup(platform)
   if not base.is_file(qt_dir + "/bin/qmake") and not base.is_file(qt_dir + "/bin/qmake.exe") and not base.is_file(qt_dir + "/bin/qmake.bat"):
@@ -30,6 +95,12 @@ def check_support_platform(platform):
   return True
 
 def make(platform, project, qmake_config_addon="", is_no_errors=False):
+  name = os.path.basename(project) + " [" + platform + "]"
+  if ("" != qmake_config_addon):
+    name += " " + qmake_config_addon
+  return telemetry.call("qmake", name, _make, platform, project, qmake_config_addon, is_no_errors)
+
+def _make(platform, project, qmake_config_addon="", is_no_errors=False):
   # check platform
   if not check_support_platform(platform):
     print("THIS PLATFORM IS NOT SUPPORTED")
@@ -57,11 +128,6 @@ def make(platform, project, qmake_config_addon="", is_no_errors=False):
   old_cur = os.getcwd()
   os.chdir(pro_dir)
 
-  if (base.is_file(stash_file)):
-    base.delete_file(stash_file)
-  if (base.is_file(makefile)):
-    base.delete_file(makefile)
-
   base.set_env("DEST_MAKEFILE_NAME", "./" + makefile_name)
 
   # setup android env
@@ -74,9 +140,6 @@ def make(platform, project, qmake_config_addon="", is_no_errors=False):
   if (-1 != platform.find("ios")):
     base.hack_xcode_ios()
 
-  if base.is_file(makefile):
-    base.delete_file(makefile)
-
   config_param = base.qt_config(platform)
   if ("" != qmake_config_addon):
     config_param += (" " + qmake_config_addon)
@@ -92,7 +155,6 @@ def make(platform, project, qmake_config_addon="", is_no_errors=False):
 
   qmake_app = qt_dir + "/bin/qmake"
 
-  # non windows platform
   if not base.is_windows():
     if base.is_file(qt_dir + "/onlyoffice_qt.conf"):
       build_params.append("-qtconf")
@@ -100,22 +162,41 @@ def make(platform, project, qmake_config_addon="", is_no_errors=False):
     if "1" == config.option("use-clang"):
       build_params.append("-spec")
       build_params.append("linux-clang-libc++")
-      
+    # must be the last ones (-after)
+    build_params += [param.replace("$", "\\$") for param in compiler_cache.qmake_params()]
+
+  # check inputs
+  manifest = get_manifest(platform, file_pro, qt_dir, build_params + [qmake_config_addon] + qmake_addon)
+  is_makefile_actual = is_incremental() and is_manifest_actual(makefile, manifest)
+  if is_makefile_actual:
+    print("[qmake] makefile is up to date: " + makefile)
+  else:
+    delete_manifest(makefile)
+    if (base.is_file(stash_file)):
+      base.delete_file(stash_file)
+    if (base.is_file(makefile)):
+      base.delete_file(makefile)
+
+  # non windows platform
+  if not base.is_windows():
     if "" != config.option("sysroot"):
       os.environ['QMAKE_CUSTOM_SYSROOT'] = config.option("sysroot")
       os.environ['PKG_CONFIG_PATH'] = config.get_custom_sysroot_lib() + "/pkgconfig"
-      
-    base.cmd_exe(qmake_app, build_params)
+
+    if not is_makefile_actual:
+      base.cmd_exe(qmake_app, build_params)
     
     if "" != config.option("sysroot"):
       base.set_sysroot_env()
 
-    base.correct_makefile_after_qmake(platform, makefile)
-    if ("1" == config.option("clean")):
-      base.cmd_and_return_cwd("make", clean_params, True)
-      base.cmd_and_return_cwd("make", distclean_params, True)
-      base.cmd(qmake_app, build_params)
+    if not is_makefile_actual:
       base.correct_makefile_after_qmake(platform, makefile)
+      if ("1" == config.option("clean")):
+        base.cmd_and_return_cwd("make", clean_params, True)
+        base.cmd_and_return_cwd("make", distclean_params, True)
+        base.cmd(qmake_app, build_params)
+        base.correct_makefile_after_qmake(platform, makefile)
+      save_manifest(makefile, manifest)
     base.cmd_and_return_cwd("make", ["-f", makefile] + get_j_num(), is_no_errors)
   else:
     config_params_array = base.qt_config_as_param(config_param)
@@ -141,15 +222,19 @@ def make(platform, project, qmake_config_addon="", is_no_errors=False):
     qmake_addon_string = ""
     if ("" != config.option("qmake_addon")):
       qmake_addon_string = " " + (" ").join(["\"" + addon + "\"" for addon in qmake_addon])
-    qmake_bat.append("call \"" + qmake_app + "\" -nocache " + qmake_env_addon + file_pro + config_params_string + qmake_addon_string)
-    if ("1" == config.option("clean")):
-      qmake_bat.append("call nmake " + " ".join(clean_params))
-      qmake_bat.append("call nmake " + " ".join(distclean_params))
-      qmake_bat.append("call \"" + qmake_app + "\" -nocache " + file_pro + config_params_string + qmake_addon_string)
+    if not is_makefile_actual:
+      qmake_addon_string += "".join([" \"" + param + "\"" for param in compiler_cache.qmake_params()])
+      qmake_bat.append("call \"" + qmake_app + "\" -nocache " + qmake_env_addon + file_pro + config_params_string + qmake_addon_string)
+      if ("1" == config.option("clean")):
+        qmake_bat.append("call nmake " + " ".join(clean_params))
+        qmake_bat.append("call nmake " + " ".join(distclean_params))
+        qmake_bat.append("call \"" + qmake_app + "\" -nocache " + file_pro + config_params_string + qmake_addon_string)
     if ("0" != config.option("multiprocess")):
       qmake_bat.append("set CL=/MP")
     qmake_bat.append("call nmake -f " + makefile)
     base.run_as_bat(qmake_bat, is_no_errors)
+    if not is_makefile_actual and base.is_file(makefile):
+      save_manifest(makefile, manifest)
 
   if (base.is_file(stash_file)):
     base.delete_file(stash_file)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import time
+import tempfile
+import traceback
+import multiprocessing
+import multiprocessing.connection
+import base
+import telemetry
+
+# task graph --------------------------------------------
+# tasks is an ordered list of records:
+# { "name" : "...", "func" : callable, "args" : [], "depends" : ["name", ...] }
+# every task runs in a forked child process, so os.chdir/os.environ/config
+# changes made by the task never leak into the parent or into other tasks
+
+def is_supported():
+  if ("windows" == base.host_platform()):
+    return False
+  return ("fork" in multiprocessing.get_all_start_methods())
+
+def _task_process(func, args, log_path, trace_parent):
+  telemetry.set_parent(trace_parent)
+  log_file = None
+  if ("" != log_path):
+    log_file = open(log_path, "w")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.dup2(log_file.fileno(), 1)
+    os.dup2(log_file.fileno(), 2)
+  code = 0
+  try:
+    func(*args)
+  except SystemExit as e:
+    if isinstance(e.code, int):
+      code = e.code
+    elif (e.code is not None):
+      sys.stderr.write(str(e.code) + "\n")
+      code = 1
+  except BaseException:
+    traceback.print_exc()
+    code = 1
+  sys.stdout.flush()
+  sys.stderr.flush()
+  if log_file:
+    log_file.close()
+  telemetry.save_process()
+  os._exit(code)
+
+def _print_log(path):
+  if not os.path.isfile(path):
+    return
+  with open(path, "r", errors="replace") as file:
+    for line in file:
+      sys.stdout.write(line)
+  sys.stdout.flush()
+  os.remove(path)
+
+def _skip(results, name):
+  results[name]["code"] = -1
+  results[name]["skipped"] = True
+  return
+
+def _check_graph(tasks):
+  names = set()
+  for task in tasks:
+    for dep in task["depends"]:
+      if not dep in names:
+        # dependencies must point backward, this keeps the graph acyclic
+        print("scheduler warning [unknown or forward dependency]: " + task["name"] + " -> " + dep)
+    names.add(task["name"])
+  return
+
+def run(tasks, max_parallel, is_capture_log=True, is_no_errors=False):
+  _check_graph(tasks)
+  results = {}
+  ordered = [task["name"] for task in tasks]
+  by_name = {}
+  for task in tasks:
+    by_name[task["name"]] = task
+    results[task["name"]] = {"code" : None, "time" : 0.0, "skipped" : False}
+
+  if (max_parallel < 1):
+    max_parallel = 1
+
+  log_dir = tempfile.mkdtemp(prefix="oo_scheduler_") if is_capture_log else ""
+  context = multiprocessing.get_context("fork")
+  pending = list(ordered)
+  running = {}
+  is_failed = False
+
+  while (0 != len(pending)) or (0 != len(running)):
+    # start ready tasks
+    if not is_failed:
+      for name in list(pending):
+        if (len(running) >= max_parallel):
+          break
+        depends = [dep for dep in by_name[name]["depends"] if dep in by_name]
+        if any(results[dep]["code"] is None for dep in depends):
+          continue
+        pending.remove(name)
+        if any(0 != results[dep]["code"] for dep in depends):
+          _skip(results, name)
+          print("[scheduler] skip: " + name + " (dependency failed)")
+          continue
+        log_path = (log_dir + "/" + str(ordered.index(name)) + ".log") if is_capture_log else ""
+        record = telemetry.begin("task", name, {"depends" : depends})
+        trace_parent = record["id"] if record else ""
+        process = context.Process(target=_task_process, args=(by_name[name]["func"], by_name[name]["args"], log_path, trace_parent))
+        sys.stdout.flush()
+        sys.stderr.flush()
+        process.start()
+        running[process.sentinel] = [name, process, log_path, time.time(), record]
+        print("[scheduler] start: " + name + " (running: " + str(len(running)) + ")")
+        sys.stdout.flush()
+    else:
+      for name in pending:
+        _skip(results, name)
+      pending = []
+
+    if (0 == len(running)):
+      if (0 != len(pending)):
+        # nothing can be started (unknown dependency names are ignored above)
+        for name in pending:
+          _skip(results, name)
+        pending = []
+      continue
+
+    for sentinel in multiprocessing.connection.wait(list(running.keys())):
+      name, process, log_path, start_time, record = running.pop(sentinel)
+      process.join()
+      telemetry.end(record, process.exitcode)
+      results[name]["code"] = process.exitcode
+      results[name]["time"] = time.time() - start_time
+      if is_capture_log:
+        _print_log(log_path)
+      print("[scheduler] finish: " + name + " (code: " + str(process.exitcode) + ", time: " + ("%.1f" % results[name]["time"]) + "s)")
+      sys.stdout.flush()
+      if (0 != process.exitcode) and not is_no_errors:
+        is_failed = True
+
+  if is_capture_log and os.path.isdir(log_dir):
+    try:
+      os.rmdir(log_dir)
+    except OSError:
+      pass
+
+  failed = [name for name in ordered if (0 != results[name]["code"]) and not results[name]["skipped"]]
+  if (0 != len(failed)) and not is_no_errors:
+    sys.exit("Error (scheduler): " + ", ".join(failed))
+  return results
+
+def print_summary(results, title="task"):
+  names = list(results.keys())
+  width = max([len(title)] + [len(name) for name in names])
+  print("------------------------------------------")
+  print(title.ljust(width) + "  status   time")
+  for name in names:
+    result = results[name]
+    status = "ok"
+    if result["skipped"]:
+      status = "skipped"
+    elif (0 != result["code"]):
+      status = "failed"
+    print(name.ljust(width) + "  " + status.ljust(7) + "  " + ("%.1f" % result["time"]) + "s")
+  print("------------------------------------------")
+  sys.stdout.flush()
+  return
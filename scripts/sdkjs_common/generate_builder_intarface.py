@@ -9,6 +9,10 @@ def readFile(path):
     filedata = file.read()
   return filedata
 
+# parsed records by (path, mtime): [[decoration, code, init], ...]
+# word/apiBuilder.js is used by all the editors and is parsed once
+parsed_files = {}
+
 def writeFile(path, content):
   if (os.path.isfile(path)):
     os.remove(path)
@@ -25,6 +29,8 @@ class EditorApi(object):
     self.type = "CDE"
     self.numfile = 0
     self.files = []
+    # symbol index: function/class name -> record slots which declare it
+    self.symbols = {}
     return
 
   def initFiles(self, type, files):
@@ -76,6 +82,13 @@ class EditorApi(object):
     return "{ return " + retValue + "; }"
 
   def check_record(self, recordData):
+    for decoration, code, init in self.parse_record(recordData):
+      self.append_record(decoration, code, init)
+    return
+
+  # returns the records of the js block (does not depend on the editor)
+  def parse_record(self, recordData):
+    items = []
     rec = recordData
     rec = rec.replace("\t", "")
     rec = rec.replace('\n    ', '\n')
@@ -95,8 +108,8 @@ class EditorApi(object):
     decoration = decoration.replace("@returns {?", "@returns {")
     decoration = decoration.replace("?}", "}")
     if -1 != decoration.find("@name ApiInterface"):
-      self.append_record(decoration, "var ApiInterface = function() {};\nvar Api = new ApiInterface();\n", True)
-      return
+      items.append([decoration, "var ApiInterface = function() {};\nvar Api = new ApiInterface();\n", True])
+      return items
     code = rec[indexEndDecoration + 2:]
     code = code.replace("=\n", "= ").strip("\t\n\r ")
     lines = code.split("\n")
@@ -115,7 +128,7 @@ class EditorApi(object):
       lineWithoutSpaces = line.replace(" ", "")
       if not is_found_function and 0 == line.find("function "):
         if -1 == decoration.find("@constructor"):
-          return
+          return items
         codeCorrect += (line + addon_for_func + "\n")
         is_found_function = True
       if not is_found_function and -1 != line.find(".prototype."):
@@ -126,13 +139,13 @@ class EditorApi(object):
       if -1 != line.find(".prototype.constructor"):
         codeCorrect += (line + "\n")
     codeCorrect = codeCorrect.replace("Api.prototype", "ApiInterface.prototype")
-    self.append_record(decoration, codeCorrect)
+    items.append([decoration, codeCorrect, False])
     className = codeCorrect[0:codeCorrect.find('.')]
     
     # если свойство определено сразу под методом (без декорации)
     if propName is not None and sMethodName is not None:
       prop_define = f'{className}.prototype.{propName[1:-1]} = {className}.prototype.{sMethodName.group(1)}();\n'
-      self.append_record(decoration, prop_define)
+      items.append([decoration, prop_define, False])
     #иначе
     elif propName is not None:
       className = re.search(r'.defineProperty\((.*).prototype', code).group(1).strip()
@@ -140,14 +153,14 @@ class EditorApi(object):
       if (returnValue != 'undefined'):
         returnValue = re.search(r'{ return (.*); }', returnValue).group(1).strip()
       prop_define = f'{className}.prototype.{propName[1:-1]} = {returnValue};\n'
-      self.append_record(decoration, prop_define)
-    return
+      items.append([decoration, prop_define, False])
+    return items
 
   def append_record(self, decoration, code, init=False):
     if init:
       if not self.init:
         self.init = True
-        self.records.append(decoration + "\n" + code + "\n\n")
+        self.add_record(decoration + "\n" + code + "\n\n")
       return
     # check on private
     if -1 != code.find(".prototype.private_"):
@@ -166,32 +179,57 @@ class EditorApi(object):
         if "@typeofeditors" not in line and "@see" not in line
     )
     
-    # optimizations for first file
-    if 0 == self.numfile:
-      self.records.append(decoration + "\n" + code + "\n")
-      return
-    # check override js classes
-    if 0 == code.find("function "):
+    # check override js classes (not needed for the first file)
+    if 0 != self.numfile and 0 == code.find("function "):
       index_end_name = code.find("(")
       function_name = code[9:index_end_name].strip(" ")
-      for rec in range(len(self.records)):
-        if -1 != self.records[rec].find("function " + function_name + "("):
-          self.records[rec] = ""
-        elif -1 != self.records[rec].find("function " + function_name + " ("):
-          self.records[rec] = ""
-        elif -1 != self.records[rec].find("\n" + function_name + ".prototype."):
-          self.records[rec] = ""
-
-    self.records.append(decoration + "\n" + code + "\n")
+      for rec in self.symbols.pop(function_name, []):
+        self.records[rec] = ""
+
+    self.add_record(decoration + "\n" + code + "\n")
     return
 
-  def generate(self):
-    for file in self.files:
-      file_content = readFile(f'{sdkjs_dir}/{file}')
-      arrRecords = file_content.split("/**")
+  # appends the record and indexes the names it can be overridden by:
+  # "function NAME(", "function NAME (" and "\nNAME.prototype."
+  def add_record(self, record):
+    slot = len(self.records)
+    self.records.append(record)
+    names = set()
+    index = record.find("function ")
+    while -1 != index:
+      index_end_name = record.find("(", index + 9)
+      if -1 == index_end_name:
+        break
+      name = record[index + 9:index_end_name]
+      names.add(name)
+      if name.endswith(" "):
+        names.add(name[:-1])
+      index = record.find("function ", index + 9)
+    index = record.find(".prototype.")
+    while -1 != index:
+      index_start_name = record.rfind("\n", 0, index)
+      if -1 != index_start_name:
+        names.add(record[index_start_name + 1:index])
+      index = record.find(".prototype.", index + 11)
+    for name in names:
+      self.symbols.setdefault(name, []).append(slot)
+    return
+
+  def parse_file(self, path):
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if key not in parsed_files:
+      items = []
+      arrRecords = readFile(path).split("/**")
       arrRecords = arrRecords[1:-1]
       for record in arrRecords:
-        self.check_record(record)
+        items += self.parse_record(record)
+      parsed_files[key] = items
+    return parsed_files[key]
+
+  def generate(self):
+    for file in self.files:
+      for decoration, code, init in self.parse_file(f'{sdkjs_dir}/{file}'):
+        self.append_record(decoration, code, init)
       self.numfile += 1
     correctContent = ''.join(self.records)
     correctContent += "\n"
@@ -0,0 +1,177 @@
+import re
+import functools
+
+# Shared doc model for the Markdown generators (office-api and plugins).
+# Enumerations/classes are indexed by name once per editor, all patterns are
+# compiled once and every type list is converted to Markdown only once.
+
+ARRAY_PATTERN = re.compile(r'Array\.<([^>]+)>')
+GENERIC_PATTERN = re.compile(r'^(.*?)\.<(.*)>$')
+LEFTOVER_GENERICS_PATTERN = re.compile(r'<([^<>]+)>')
+LINK_PATTERN = re.compile(r'{@link\s+([^}]+)}')
+NOTE_PATTERN = re.compile(r'<note>(.*?)</note>', flags=re.DOTALL)
+CODE_BLOCK_PATTERN = re.compile(r'(```.*?```)', flags=re.DOTALL)
+QUOTED_TEXT_PATTERN = re.compile(r"(['\"])(.*?)(?<!\\)\1")
+LINE_BREAKS_PATTERN = re.compile(r'[\r\n]+')
+JS_LINE_COMMENT_PATTERN = re.compile(r'^\s*//.*$', flags=re.MULTILINE)
+JS_BLOCK_COMMENT_PATTERN = re.compile(r'/\*.*?\*/', flags=re.DOTALL)
+
+PRIMITIVE_TYPES = {"string", "number", "boolean", "null", "undefined", "any", "object", "false", "true", "json", "function", "date", "{}"}
+
+def remove_js_comments(text):
+    text = JS_LINE_COMMENT_PATTERN.sub('', text)   # single-line
+    text = JS_BLOCK_COMMENT_PATTERN.sub('', text)  # multi-line
+    return text.strip()
+
+def remove_line_breaks(string):
+    return LINE_BREAKS_PATTERN.sub(' ', string)
+
+# Convert Array.<T> => T[] (including nested arrays).
+@functools.lru_cache(maxsize=None)
+def convert_jsdoc_array_to_ts(type_str: str) -> str:
+    """
+    Recursively replaces 'Array.<T>' with 'T[]',
+    handling nested arrays like 'Array.<Array.<string>>' => 'string[][]'.
+    """
+    while True:
+        match = ARRAY_PATTERN.search(type_str)
+        if not match:
+            break
+
+        inner_type = match.group(1).strip()
+        # Recursively convert inner parts
+        inner_type = convert_jsdoc_array_to_ts(inner_type)
+
+        # Replace the outer Array.<...> with ...[]
+        type_str = (
+            type_str[:match.start()]
+            + f"{inner_type}[]"
+            + type_str[match.end():]
+        )
+
+    return type_str
+
+def escape_text_outside_code_blocks(markdown: str) -> str:
+    """
+    Splits content by fenced code blocks, escapes MDX-unsafe characters
+    (<, >, {, }) only in the text outside those code blocks.
+    """
+    parts = CODE_BLOCK_PATTERN.split(markdown)
+
+    # Even indices (0, 2, 4, ...) are outside code blocks,
+    # odd indices (1, 3, 5, ...) are actual code blocks.
+    for i in range(0, len(parts), 2):
+        text = (parts[i]
+                .replace('<', '&lt;')
+                .replace('>', '&gt;')
+                .replace('{', '&#123;')
+                .replace('}', '&#125;'))
+        parts[i] = escape_brackets_in_quotes(text)
+
+    return "".join(parts)
+
+def escape_brackets_in_quotes(text: str) -> str:
+    return QUOTED_TEXT_PATTERN.sub(
+        lambda m: m.group(1)
+                  + m.group(2).replace('[', r'\[').replace(']', r'\]')
+                  + m.group(1),
+        text
+    )
+
+def get_base_type(ts_type: str) -> str:
+    """
+    Given a TypeScript-like type (e.g. "Drawing[][]"), return the
+    'base' portion by stripping trailing "[]". For "Drawing[][]",
+    returns "Drawing". For "Array.<Drawing>", you'd convert it first
+    to "Drawing[]" then return "Drawing".
+    """
+    while ts_type.endswith('[]'):
+        ts_type = ts_type[:-2]
+    return ts_type
+
+def is_primitive(type):
+    return (type.lower() in PRIMITIVE_TYPES or
+            (type.startswith('"') and type.endswith('"')) or
+            (type.startswith("'") and type.endswith("'")) or
+            type.replace('.', '', 1).isdigit() or
+            (type.startswith('-') and type[1:].replace('.', '', 1).isdigit()))
+
+class DocModel:
+    """
+    Type linking for one editor.
+    used_enumerations is the generator's set of enumerations to be written,
+    it is updated on every conversion (also for the cached ones).
+    """
+    def __init__(self, enumerations, classes, editor_name, used_enumerations):
+        self.enumerations = {}
+        for enum in enumerations:
+            self.enumerations.setdefault(enum['name'], enum)
+        self.classes = classes
+        self.editor_name = editor_name
+        self.used_enumerations = used_enumerations
+        self._markdown_cache = {}
+
+    def is_enumeration(self, name):
+        return name in self.enumerations
+
+    def _link_name(self, name, root, used):
+        if name in self.enumerations:
+            used.add(name)
+            return f"[{name}]({root}Enumeration/{name}.md)"
+        if name in self.classes:
+            return f"[{name}]({root}{name}/{name}.md)"
+        if is_primitive(name):
+            return name
+        if self.editor_name == "forms":
+            return f"[{name}]({root}../text-document-api/{name}/{name}.md)"
+        print(f"Unknown type encountered: {name}")
+        return name
+
+    def _link_type(self, ts_type, root, used):
+        ts_type = ts_type.strip()
+        # Count the number of array dimensions, e.g., "[][]" has 2 dimensions
+        array_dims = 0
+        while ts_type.endswith("[]"):
+            array_dims += 1
+            ts_type = ts_type[:-2].strip()
+
+        # Process generic types, e.g., Object.<string, editorType>
+        if ".<" in ts_type and ts_type.endswith(">"):
+            m = GENERIC_PATTERN.match(ts_type)
+            if m:
+                base_result = self._link_name(m.group(1).strip(), root, used)
+                # Split the generic parameters by commas and process each recursively
+                generic_args = [self._link_type(x, root, used) for x in m.group(2).strip().split(",")]
+                return base_result + ".&lt;" + ", ".join(generic_args) + "&gt;" + "[]" * array_dims
+
+        # Process union types: if the type is enclosed in parentheses
+        if ts_type.startswith("(") and ts_type.endswith(")"):
+            subtypes = [sub.strip() for sub in ts_type[1:-1].strip().split("|")]
+            if len(subtypes) == 1:
+                result = self._link_type(subtypes[0], root, used)
+            else:
+                result = "(" + " | ".join([self._link_type(subtype, root, used) for subtype in subtypes]) + ")"
+            return result + "[]" * array_dims
+
+        return self._link_name(ts_type, root, used) + "[]" * array_dims
+
+    def types_markdown(self, types, root):
+        """
+        1) Converts each type from JSDoc (e.g., Array.<T>) to T[].
+        2) Processes union types by splitting them using '|'.
+        3) Supports multidimensional arrays, e.g., (string|ApiRange|number)[].
+        4) If the base type matches the name of an enumeration or class, generates a link.
+        5) The final types are joined using " | ".
+        """
+        key = (tuple(types), root)
+        cached = self._markdown_cache.get(key)
+        if cached is None:
+            used = set()
+            linked = [self._link_type(convert_jsdoc_array_to_ts(t), root, used) for t in types]
+            markdown = r' | '.join(linked).replace("|", r"\|")
+            # Escape remaining angle brackets for generics
+            markdown = LEFTOVER_GENERICS_PATTERN.sub(lambda m: f"&lt;{m.group(1).strip()}&gt;", markdown)
+            cached = (markdown, used)
+            self._markdown_cache[key] = cached
+        self.used_enumerations.update(cached[1])
+        return cached[0]
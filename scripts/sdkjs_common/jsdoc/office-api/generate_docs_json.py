@@ -3,7 +3,8 @@ import subprocess
 import json
 import argparse
 import re
-import platform
+import shutil
+import functools
 
 script_path = os.path.abspath(__file__)
 root = os.path.abspath(os.path.join(os.path.dirname(script_path), '../../../../..'))
@@ -23,68 +24,90 @@ editors_maps = {
     "forms":    "CFE"
 }
 
+@functools.lru_cache(maxsize=None)
+def read_example(file_path):
+    # Examples are shared between editors, every file is read once
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'r', encoding='utf-8') as see_file:
+        return see_file.read()
+
+def start_jsdoc(config, editor_name, output_file):
+    # Editors are extracted by concurrent jsdoc processes, EDITOR is passed in the env
+    npx = shutil.which("npx") or "npx"
+    env = dict(os.environ, EDITOR=editors_maps[editor_name])
+    print(f"Generating {editor_name}.json: EDITOR={editors_maps[editor_name]} npx jsdoc -c {config} -X > {output_file}")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        return subprocess.Popen([npx, "jsdoc", "-c", config, "-X"], stdout=f, env=env)
+
+def append_examples(data, editor_name, md):
+    for doclet in data:
+        if 'see' in doclet:
+            if doclet['see'] is not None:
+                if editor_name == 'forms':
+                    doclet['see'][0] = doclet['see'][0].replace('{Editor}', 'Word')
+                else:
+                    doclet['see'][0] = doclet['see'][0].replace('{Editor}', editor_name.title())
+
+                example_content = read_example(f'{root}/' + doclet['see'][0])
+
+                if example_content is not None:
+                    # Extract the first line as a comment if it exists
+                    lines = example_content.split('\n')
+                    if lines[0].startswith('//'):
+                        comment = lines[0] + '\n'
+                        code_content = '\n'.join(lines[1:])
+                    else:
+                        comment = ''
+                        code_content = example_content
+                    
+                    if md == True:
+                        doclet['example'] = remove_js_comments(comment) + "```js\n" + code_content + "\n```"
+                    
+                    if md == False:
+                        document_type = editor_name
+                        if "forms" == document_type:
+                            document_type = "pdf"
+                        doclet['description'] = doclet['description'] + f'\n\n## Try it\n\n ```js document-builder={{"documentType": "{document_type}"}}\n{code_content}\n```'
+    return data
+
+def write_doclets(data, output_file):
+    # Same output as json.dump(data, indent=4), written doclet by doclet
+    with open(output_file, 'w', encoding='utf-8') as f:
+        if 0 == len(data):
+            f.write('[]')
+            return
+        f.write('[\n')
+        for index, doclet in enumerate(data):
+            text = json.dumps(doclet, ensure_ascii=False, indent=4)
+            f.write('    ' + text.replace('\n', '\n    '))
+            f.write(',\n' if index + 1 < len(data) else '\n')
+        f.write(']')
+
 def generate(output_dir, md=False):
     os.chdir(os.path.dirname(script_path))
 
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    # Generate JSON documentation
-    for config in configs:
-        editor_name = config.split('/')[-1].replace('.json', '')
-        output_file = os.path.join(output_dir, editor_name + ".json")
-        command_set_env = "export"
-        if (platform.system().lower() == "windows"):
-            command_set_env = "set"
-        command = f"{command_set_env} EDITOR={editors_maps[editor_name]} && npx jsdoc -c {config} -X > {output_file}"
-        print(f"Generating {editor_name}.json: {command}")
-        subprocess.run(command, shell=True)
-
-    # Append examples to JSON documentation
+    # Generate JSON documentation (all editors at the same time)
+    processes = []
     for config in configs:
         editor_name = config.split('/')[-1].replace('.json', '')
         output_file = os.path.join(output_dir, editor_name + ".json")
+        processes.append([editor_name, output_file, start_jsdoc(config, editor_name, output_file)])
+
+    # Append examples to JSON documentation, as soon as the editor is extracted
+    for editor_name, output_file, process in processes:
+        if 0 != process.wait():
+            print(f"Error: jsdoc failed for {editor_name} (exit code {process.returncode})")
         
         # Read the JSON file
         with open(output_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        # Modify JSON data
-        for doclet in data:
-            if 'see' in doclet:
-                if doclet['see'] is not None:
-                    if editor_name == 'forms':
-                        doclet['see'][0] = doclet['see'][0].replace('{Editor}', 'Word')
-                    else:
-                        doclet['see'][0] = doclet['see'][0].replace('{Editor}', editor_name.title())
-
-                    file_path = f'{root}/' + doclet['see'][0]
-
-                    if os.path.exists(file_path):
-                        with open(file_path, 'r', encoding='utf-8') as see_file:
-                            example_content = see_file.read()
-                        
-                        # Extract the first line as a comment if it exists
-                        lines = example_content.split('\n')
-                        if lines[0].startswith('//'):
-                            comment = lines[0] + '\n'
-                            code_content = '\n'.join(lines[1:])
-                        else:
-                            comment = ''
-                            code_content = example_content
-                        
-                        if md == True:
-                            doclet['example'] = remove_js_comments(comment) + "```js\n" + code_content + "\n```"
-                        
-                        if md == False:
-                            document_type = editor_name
-                            if "forms" == document_type:
-                                document_type = "pdf"
-                            doclet['description'] = doclet['description'] + f'\n\n## Try it\n\n ```js document-builder={{"documentType": "{document_type}"}}\n{code_content}\n```'
-        
-        # Write the modified JSON file back
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        # Modify JSON data and write the modified JSON file back
+        write_doclets(append_examples(data, editor_name, md), output_file)
 
     print("Documentation generation for builder completed.")
 
@@ -1,10 +1,16 @@
 import os
 import json
-import re
 import shutil
+import sys
+import hashlib
 import argparse
+import concurrent.futures
 import generate_docs_json
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import doc_model
+from doc_model import remove_js_comments, remove_line_breaks, convert_jsdoc_array_to_ts, escape_text_outside_code_blocks, escape_brackets_in_quotes, get_base_type
+
 # Configuration files
 editors = {
     "word": "text-document-api",
@@ -21,6 +27,8 @@ missing_examples = []
 used_enumerations = set()
 
 cur_editor_name = None
+cur_model = None
+worker_state = None
 
 def load_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -30,10 +38,42 @@ def write_markdown_file(file_path, content):
     with open(file_path, 'w', encoding='utf-8') as md_file:
         md_file.write(content)
 
-def remove_js_comments(text):
-    text = re.sub(r'^\s*//.*$', '', text, flags=re.MULTILINE)  # single-line
-    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)     # multi-line
-    return text.strip()
+def write_markdown_pages(pages, incremental):
+    """
+    Writes (path, content) pages. In the incremental mode a page is written
+    only if its content hash differs from the file on disk.
+    Returns the number of written pages.
+    """
+    written = 0
+    for file_path, content in pages:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if incremental and os.path.isfile(file_path):
+            with open(file_path, 'rb') as md_file:
+                old_hash = hashlib.sha256(md_file.read()).digest()
+            if old_hash == hashlib.sha256(content.replace('\n', os.linesep).encode('utf-8')).digest():
+                continue
+        with open(file_path, 'w', encoding='utf-8') as md_file:
+            md_file.write(content)
+        written += 1
+    return written
+
+def delete_orphaned_pages(editor_dir, pages):
+    """Removes files in the editor subfolders which are not generated anymore (and empty folders)."""
+    generated = set(os.path.normpath(file_path) for file_path, content in pages)
+    deleted = 0
+    for folder in os.listdir(editor_dir):
+        folder_path = os.path.join(editor_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for dir_path, dirs, files in os.walk(folder_path, topdown=False):
+            for file in files:
+                file_path = os.path.normpath(os.path.join(dir_path, file))
+                if file_path not in generated:
+                    os.remove(file_path)
+                    deleted += 1
+            if not os.listdir(dir_path):
+                os.rmdir(dir_path)
+    return deleted
 
 def process_link_tags(text, root=''):
     """
@@ -78,7 +118,7 @@ def process_link_tags(text, root=''):
             display_text = label if label else ref  # Keep the full notation, e.g., "Api#CreateSlide"
             return f"[{display_text}]({root}{class_name}/Methods/{method_name}.md)"
 
-    return re.sub(r'{@link\s+([^}]+)}', replace_link, text)
+    return doc_model.LINK_PATTERN.sub(replace_link, text)
 
 def correct_description(string, root='', isInTable=False):
     """
@@ -96,14 +136,14 @@ def correct_description(string, root='', isInTable=False):
         # Line breaks
         string = string.replace('\r', '\\\n')
         # Replace <b> tags with Markdown bold formatting
-        string = re.sub(r'<b>', '-**', string)
+        string = string.replace('<b>', '-**')
     else:
-        string = re.sub(r'<b>', '**', string)
+        string = string.replace('<b>', '**')
     
-    string = re.sub(r'</b>', '**', string)
+    string = string.replace('</b>', '**')
     
     # Replace <note> tags with an icon and text
-    string = re.sub(r'<note>(.*?)</note>', r'💡 \1', string, flags=re.DOTALL)
+    string = doc_model.NOTE_PATTERN.sub(r'💡 \1', string)
     
     # Process {@link ...} constructions
     string = process_link_tags(string, root)
@@ -121,188 +161,12 @@ def correct_default_value(value, enumerations, classes):
     
     return generate_data_types_markdown([value], enumerations, classes)
 
-def remove_line_breaks(string):
-    return re.sub(r'[\r\n]+', ' ', string)
-
-# Convert Array.<T> => T[] (including nested arrays).
-def convert_jsdoc_array_to_ts(type_str: str) -> str:
-    """
-    Recursively replaces 'Array.<T>' with 'T[]',
-    handling nested arrays like 'Array.<Array.<string>>' => 'string[][]'.
-    """
-    pattern = re.compile(r'Array\.<([^>]+)>')
-    
-    while True:
-        match = pattern.search(type_str)
-        if not match:
-            break
-        
-        inner_type = match.group(1).strip()
-        # Recursively convert inner parts
-        inner_type = convert_jsdoc_array_to_ts(inner_type)
-        
-        # Replace the outer Array.<...> with ...[]
-        type_str = (
-            type_str[:match.start()] 
-            + f"{inner_type}[]" 
-            + type_str[match.end():]
-        )
-    
-    return type_str
-
-def escape_text_outside_code_blocks(markdown: str) -> str:
-    """
-    Splits content by fenced code blocks, escapes MDX-unsafe characters
-    (<, >, {, }) only in the text outside those code blocks.
-    """
-    # A regex to capture fenced code blocks with ```
-    parts = re.split(r'(```.*?```)', markdown, flags=re.DOTALL)
-    
-    # Even indices (0, 2, 4, ...) are outside code blocks,
-    # odd indices (1, 3, 5, ...) are actual code blocks.
-    for i in range(0, len(parts), 2):
-        text = (parts[i]
-                .replace('<', '&lt;')
-                .replace('>', '&gt;')
-                .replace('{', '&#123;')
-                .replace('}', '&#125;'))
-        parts[i] = escape_brackets_in_quotes(text)
-    
-    return "".join(parts)
-
-def escape_brackets_in_quotes(text: str) -> str:
-    return re.sub(
-        r"(['\"])(.*?)(?<!\\)\1",
-        lambda m: m.group(1)
-                  + m.group(2).replace('[', r'\[').replace(']', r'\]')
-                  + m.group(1),
-        text
-    )
-
-def get_base_type(ts_type: str) -> str:
-    """
-    Given a TypeScript-like type (e.g. "Drawing[][]"), return the
-    'base' portion by stripping trailing "[]". For "Drawing[][]",
-    returns "Drawing". For "Array.<Drawing>", you'd convert it first
-    to "Drawing[]" then return "Drawing".
-    """
-    while ts_type.endswith('[]'):
-        ts_type = ts_type[:-2]
-    return ts_type
-
 def generate_data_types_markdown(types, enumerations, classes, root='../../'):
     """
-    1) Converts each type from JSDoc (e.g., Array.<T>) to T[].
-    2) Processes union types by splitting them using '|'.
-    3) Supports multidimensional arrays, e.g., (string|ApiRange|number)[].
-    4) If the base type matches the name of an enumeration or class, generates a link.
-    5) The final types are joined using " | ".
+    Converts JSDoc types to Markdown with links to known enumerations and classes,
+    see doc_model.DocModel.types_markdown (the model of the current editor is used).
     """
-    # Convert each type from JSDoc format to TypeScript format (e.g., T[])
-    converted = [convert_jsdoc_array_to_ts(t) for t in types]
-
-    # Set of primitive types
-    primitive_types = {"string", "number", "boolean", "null", "undefined", "any", "object", "false", "true", "json", "function", "date", "{}"}
-
-    def is_primitive(type):
-        if (type.lower() in primitive_types or
-            (type.startswith('"') and type.endswith('"')) or
-            (type.startswith("'") and type.endswith("'")) or
-            type.replace('.', '', 1).isdigit() or
-            (type.startswith('-') and type[1:].replace('.', '', 1).isdigit())):
-            return True
-        return False
-
-    def link_if_known(ts_type):
-        ts_type = ts_type.strip()
-        # Count the number of array dimensions, e.g., "[][]" has 2 dimensions
-        array_dims = 0
-        while ts_type.endswith("[]"):
-            array_dims += 1
-            ts_type = ts_type[:-2].strip()
-
-        # Process generic types, e.g., Object.<string, editorType>
-        if ".<" in ts_type and ts_type.endswith(">"):
-            import re
-            m = re.match(r'^(.*?)\.<(.*)>$', ts_type)
-            if m:
-                base_part = m.group(1).strip()
-                generic_args_str = m.group(2).strip()
-                # Process the base part of the type
-                found = False
-                for enum in enumerations:
-                    if enum['name'] == base_part:
-                        used_enumerations.add(base_part)
-                        base_result = f"[{base_part}]({root}Enumeration/{base_part}.md)"
-                        found = True
-                        break
-                if not found:
-                    if base_part in classes:
-                        base_result = f"[{base_part}]({root}{base_part}/{base_part}.md)"
-                    elif is_primitive(base_part):
-                        base_result = base_part
-                    elif cur_editor_name == "forms":
-                        base_result = f"[{base_part}]({root}../text-document-api/{base_part}/{base_part}.md)"
-                    else:
-                        print(f"Unknown type encountered: {base_part}")
-                        base_result = base_part
-                # Split the generic parameters by commas and process each recursively
-                generic_args = [link_if_known(x) for x in generic_args_str.split(",")]
-                result = base_result + ".&lt;" + ", ".join(generic_args) + "&gt;"
-                result += "[]" * array_dims
-                return result
-
-        # Process union types: if the type is enclosed in parentheses
-        if ts_type.startswith("(") and ts_type.endswith(")"):
-            inner = ts_type[1:-1].strip()
-            subtypes = [sub.strip() for sub in inner.split("|")]
-            if len(subtypes) == 1:
-                result = link_if_known(subtypes[0])
-            else:
-                processed = [link_if_known(subtype) for subtype in subtypes]
-                result = "(" + " | ".join(processed) + ")"
-            result += "[]" * array_dims
-            return result
-
-        # If not a generic or union type – process the base type
-        else:
-            base = ts_type
-            found = False
-            for enum in enumerations:
-                if enum['name'] == base:
-                    used_enumerations.add(base)
-                    result = f"[{base}]({root}Enumeration/{base}.md)"
-                    found = True
-                    break
-            if not found:
-                if base in classes:
-                    result = f"[{base}]({root}{base}/{base}.md)"
-                elif is_primitive(base):
-                    result = base
-                elif cur_editor_name == "forms":
-                    result = f"[{base}]({root}../text-document-api/{base}/{base}.md)"
-                else:
-                    print(f"Unknown type encountered: {base}")
-                    result = base
-            result += "[]" * array_dims
-            return result
-
-    # Apply link_if_known to each converted type
-    linked = [link_if_known(ts_t) for ts_t in converted]
-
-    # Join results using " | "
-    param_types_md = r' | '.join(linked)
-    param_types_md = param_types_md.replace("|", r"\|")
-
-    # Escape remaining angle brackets for generics
-    def replace_leftover_generics(match):
-        element = match.group(1).strip()
-        return f"&lt;{element}&gt;"
-
-    param_types_md = re.sub(r'<([^<>]+)>', replace_leftover_generics, param_types_md)
-
-    return param_types_md
-
+    return cur_model.types_markdown(types, root)
 
 def generate_class_markdown(class_name, methods, properties, enumerations, classes):
     content = f"# {class_name}\n\nRepresents the {class_name} class.\n\n"
@@ -433,7 +297,7 @@ def generate_enumeration_markdown(enumeration, enumerations, classes, example_ed
             ts_t = convert_jsdoc_array_to_ts(raw_t)
 
             # Attempt linking: we compare the raw type to enumerations/classes
-            if any(enum['name'] == raw_t for enum in enumerations):
+            if cur_model.is_enumeration(raw_t):
                 used_enumerations.add(raw_t)
                 content += f"- [{ts_t}](../Enumeration/{raw_t}.md)\n"
                 enum_empty = False
@@ -469,9 +333,8 @@ def generate_enumeration_markdown(enumeration, enumerations, classes, example_ed
 
     return escape_text_outside_code_blocks(content)
 
-def process_doclets(data, output_dir, editor_name):
-    global cur_editor_name
-    cur_editor_name = editor_name
+def process_doclets(data, output_dir, editor_name, jobs=1):
+    """Renders all pages of the editor, returns [(path, content), ...]."""
 
     classes = {}
     classes_props = {}
@@ -504,31 +367,30 @@ def process_doclets(data, output_dir, editor_name):
         elif doclet['kind'] == 'typedef':
             enumerations.append(doclet)
 
-    # Process classes
-    for class_name, methods in classes.items():
-        if (len(methods) == 0):
-            continue
-
-        class_dir = os.path.join(editor_dir, class_name)
-        methods_dir = os.path.join(class_dir, 'Methods')
-        os.makedirs(methods_dir, exist_ok=True)
-
-        # Write class file
-        class_content = generate_class_markdown(
-            class_name, 
-            methods, 
-            classes_props[class_name], 
-            enumerations, 
-            classes
-        )
-        write_markdown_file(os.path.join(class_dir, f"{class_name}.md"), class_content)
-
-        # Write method files
-        for method in methods:
-            method_file_path = os.path.join(methods_dir, f"{method['name']}.md")
-            method_content = generate_method_markdown(method, enumerations, classes, example_editor_name)
-            write_markdown_file(method_file_path, method_content)
+    state = {
+        'editor_name': editor_name,
+        'editor_dir': editor_dir,
+        'example_editor_name': example_editor_name,
+        'classes': classes,
+        'classes_props': classes_props,
+        'enumerations': enumerations
+    }
 
+    # Process classes, every class page with its method pages is rendered by a worker
+    class_names = [class_name for class_name, methods in classes.items() if len(methods) != 0]
+    if jobs > 1 and len(class_names) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(state,)) as executor:
+            results = list(executor.map(render_class_pages, class_names))
+    else:
+        init_worker(state)
+        results = list(map(render_class_pages, class_names))
+    init_worker(state)
+
+    pages = []
+    for class_name, (class_pages, class_used_enumerations) in zip(class_names, results):
+        used_enumerations.update(class_used_enumerations)
+        pages += class_pages
+        for method, (method_file_path, method_content) in zip(classes[class_name], class_pages[1:]):
             if not method.get('example', ''):
                 missing_examples.append(os.path.relpath(method_file_path, output_dir))
 
@@ -549,11 +411,44 @@ def process_doclets(data, output_dir, editor_name):
         if enum_content is None:
             continue
 
-        write_markdown_file(enum_file_path, enum_content)
+        pages.append((enum_file_path, enum_content))
         if not enum.get('example', ''):
             missing_examples.append(os.path.relpath(enum_file_path, output_dir))
 
-def generate(output_dir):
+    return pages
+
+def init_worker(state):
+    global worker_state
+    global cur_editor_name
+    global cur_model
+    worker_state = state
+    cur_editor_name = state['editor_name']
+    cur_model = doc_model.DocModel(state['enumerations'], state['classes'], cur_editor_name, used_enumerations)
+
+def render_class_pages(class_name):
+    """Renders the class page and its method pages, returns ([(path, content), ...], used enumerations)."""
+    used_enumerations.clear()
+    classes = worker_state['classes']
+    enumerations = worker_state['enumerations']
+    methods = classes[class_name]
+    class_dir = os.path.join(worker_state['editor_dir'], class_name)
+
+    class_content = generate_class_markdown(
+        class_name, 
+        methods, 
+        worker_state['classes_props'][class_name], 
+        enumerations, 
+        classes
+    )
+    pages = [(os.path.join(class_dir, f"{class_name}.md"), class_content)]
+
+    for method in methods:
+        method_file_path = os.path.join(class_dir, 'Methods', f"{method['name']}.md")
+        pages.append((method_file_path, generate_method_markdown(method, enumerations, classes, worker_state['example_editor_name'])))
+
+    return pages, set(used_enumerations)
+
+def generate(output_dir, jobs=1, incremental=False):
     os.chdir(os.path.dirname(script_path))
     
     print('Generating Markdown documentation...')
@@ -563,14 +458,19 @@ def generate(output_dir):
         input_file = os.path.join(output_dir + '/tmp_json', editor_name + ".json")
 
         editor_folder_path = os.path.join(output_dir, folder_name)
-        for folder_name in os.listdir(editor_folder_path):
-            folder_path_to_del = os.path.join(editor_folder_path, folder_name)
-            if os.path.isdir(folder_path_to_del):
-                shutil.rmtree(folder_path_to_del, ignore_errors=True)
+        if not incremental:
+            for folder_name in os.listdir(editor_folder_path):
+                folder_path_to_del = os.path.join(editor_folder_path, folder_name)
+                if os.path.isdir(folder_path_to_del):
+                    shutil.rmtree(folder_path_to_del, ignore_errors=True)
 
         data = load_json(input_file)
         used_enumerations.clear()
-        process_doclets(data, output_dir, editor_name)
+        pages = process_doclets(data, output_dir, editor_name, jobs)
+        written = write_markdown_pages(pages, incremental)
+        if incremental:
+            deleted = delete_orphaned_pages(editor_folder_path, pages)
+            print(f'{editor_name}: {len(pages)} pages, {written} written, {len(pages) - written} unchanged, {deleted} deleted')
     
     shutil.rmtree(output_dir + 'tmp_json')
     print('Done')
@@ -584,8 +484,19 @@ if __name__ == "__main__":
         nargs='?',  # Indicates the argument is optional
         default=f"{root}/api.onlyoffice.com/site/docs/office-api/usage-api/"  # Default value
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes rendering the pages"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Write only changed pages and delete orphaned ones instead of regenerating the whole tree"
+    )
     args = parser.parse_args()
-    generate(args.destination)
+    generate(args.destination, args.jobs, args.incremental)
     print("START_MISSING_EXAMPLES")
     print(",".join(missing_examples))
     print("END_MISSING_EXAMPLES")
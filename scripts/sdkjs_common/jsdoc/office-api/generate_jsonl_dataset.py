@@ -1,8 +1,12 @@
 import os
 import json
 import re
+import gzip
 import shutil
+import hashlib
 import argparse
+import functools
+import concurrent.futures
 import generate_docs_json
 from datetime import datetime
 
@@ -30,7 +34,9 @@ def load_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+@functools.lru_cache(maxsize=None)
 def read_file_content(file_path):
+    # Examples are shared between doclets, every file is read once
     try:
         with open(file_path, encoding='utf-8') as f:
             return f.read()
@@ -146,12 +152,13 @@ def create_entry(system_message, user_message, assistant_message, model):
         "upvoted": True
     }
 
-    if model is not "":
+    if model != "":
         entry["model"] = model
 
     return entry 
 
-def process_doclets(doclets, output_entries, editor_name, model):
+def process_doclets(doclets, editor_name, model):
+    """Yields dataset entries of the editor doclets."""
     system_message = f'You are an expert in API for library from OnlyOffice. The library provides functions for editing {editors_names[editor_name]} documents. Your functional capabilities: 1) Explanation of Onlyoffice JavaScript API classes and their methods and parameters. 2) Assistance in writing Onlyoffice JavaScript API examples upon user request. 3) Reviewing user examples, assisting in finding and fixing their mistakes.'
     
     for doclet in doclets:
@@ -194,13 +201,61 @@ def process_doclets(doclets, output_entries, editor_name, model):
             assistant_message = block['code']
 
             # default entry
-            output_entries.append(create_entry(system_message, default_user_message, assistant_message, model))
+            yield create_entry(system_message, default_user_message, assistant_message, model)
 
             # If the file content contains comments, create a separate entry for each one
             for comment in block['comments']:
-                output_entries.append(create_entry(system_message, comment, assistant_message, model))
-            
-def generate(output_dir, model):
+                yield create_entry(system_message, comment, assistant_message, model)
+
+def process_editor(json_dir, editor_name, model):
+    """
+    Streams the entries of one editor to <json_dir>/<editor>.jsonl (runs in a worker process).
+    Returns the path and the missing examples.
+    """
+    del missing_examples[:]
+    doclets = load_json(os.path.join(json_dir, editor_name + ".json"))
+    output_file = os.path.join(json_dir, editor_name + ".jsonl")
+    with open(output_file, "w", encoding="utf-8") as out_file:
+        for entry in process_doclets(doclets, editor_name, model):
+            out_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return output_file, list(missing_examples)
+
+class ShardWriter:
+    """Writes lines to dataset.jsonl[.gz] or to dataset-NNNNN.jsonl[.gz] files of shard_size lines."""
+    def __init__(self, output_dir, shard_size=0, compress=False):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.compress = compress
+        self.files = []
+        self.file = None
+        self.count = 0
+
+    def open_next(self):
+        name = "dataset" if self.shard_size == 0 else f"dataset-{len(self.files):05d}"
+        path = f'{self.output_dir}/{name}.jsonl' + (".gz" if self.compress else "")
+        self.file = gzip.open(path, "wt", encoding="utf-8") if self.compress else open(path, "w", encoding="utf-8")
+        self.files.append(path)
+        self.count = 0
+
+    def write(self, line):
+        if self.file is None or (self.shard_size != 0 and self.count == self.shard_size):
+            self.close()
+            self.open_next()
+        self.file.write(line)
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        return self.files
+
+def entry_key(line):
+    """Hash of the (user, assistant) pair of the entry."""
+    messages = json.loads(line)["messages"]
+    return hashlib.sha256(json.dumps([messages[1]["content"], messages[2]["content"]], ensure_ascii=False).encode("utf-8")).digest()
+
+def generate(output_dir, model, shard_size=0, compress=False, jobs=1):
     os.chdir(os.path.dirname(script_path))
     
     print('Generating documentation JSONL dataset...')
@@ -208,21 +263,40 @@ def generate(output_dir, model):
     shutil.rmtree(output_dir, ignore_errors=True)
     os.makedirs(output_dir)
 
-    generate_docs_json.generate(f'{output_dir}/tmp_json')
-    
-    output_entries = []
-    output_filename = "dataset.jsonl"
+    json_dir = f'{output_dir}/tmp_json'
+    generate_docs_json.generate(json_dir)
 
-    for editor_name in editors:
-        input_file = os.path.join(f'{output_dir}/tmp_json', editor_name + ".json")
-        doclets = load_json(input_file)
-        process_doclets(doclets, output_entries, editor_name, model)
-    
-    with open(f'{output_dir}/{output_filename}', "w", encoding="utf-8") as out_file:
-        for entry in output_entries:
-            out_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    # Editors are processed in parallel, the results are merged in the editors order
+    if jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(editors))) as executor:
+            results = list(executor.map(process_editor, [json_dir] * len(editors), editors, [model] * len(editors)))
+    else:
+        results = [process_editor(json_dir, editor_name, model) for editor_name in editors]
+
+    writer = ShardWriter(output_dir, shard_size, compress)
+    written_keys = set()
+    count = 0
+    duplicates = 0
+    for editor_file, editor_missing_examples in results:
+        for path in editor_missing_examples:
+            if path not in missing_examples:
+                missing_examples.append(path)
+        with open(editor_file, "r", encoding="utf-8") as in_file:
+            for line in in_file:
+                key = entry_key(line)
+                if key in written_keys:
+                    duplicates += 1
+                    continue
+                written_keys.add(key)
+                writer.write(line)
+                count += 1
+    files = writer.close()
+    if not files:
+        writer.open_next()
+        files = writer.close()
 
-    shutil.rmtree(f'{output_dir}/tmp_json')
+    shutil.rmtree(json_dir)
+    print(f'Entries: {count}, duplicates skipped: {duplicates}, files: {len(files)}')
     print('Done')
 
 if __name__ == "__main__":
@@ -241,9 +315,26 @@ if __name__ == "__main__":
         nargs='?',  # Indicates the argument is optional
         default=""  # Default value
     )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=0,
+        help="Number of entries per output file (dataset-NNNNN.jsonl), 0 - single dataset.jsonl"
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Compress the output files (.jsonl.gz)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=len(editors),
+        help="Number of editors processed in parallel"
+    )
     args = parser.parse_args()
 
-    generate(args.destination, args.model)
+    generate(args.destination, args.model, args.shard_size, args.gzip, args.jobs)
     print("START_MISSING_EXAMPLES")
     print(",".join(missing_examples))
     print("END_MISSING_EXAMPLES")
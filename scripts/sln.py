@@ -5,6 +5,7 @@ sys.path.append('scripts')
 import config
 import json
 import os
+import re
 
 is_log = False
 
@@ -180,6 +181,139 @@ def get_projects(pro_json_path, platform):
     print(result)
   return result
 
+# project dependencies ----------------------------------
+# dependencies are derived from qmake files: TARGET, ADD_DEPENDENCY(...),
+# LIBS += -l<name> and DEPENDPATH, following include(...) of .pri files.
+# sln.json order is a hint: a project may depend only on projects listed before it
+pro_var_pattern = re.compile(r"\$\$\{?([A-Za-z_][A-Za-z0-9_]*)\}?")
+pro_assign_pattern = re.compile(r"(?:^|[\s:{])([A-Za-z_][A-Za-z0-9_]*)\s*(\+=|\*=|-=|=)\s*(.*)$")
+pro_include_pattern = re.compile(r"(?:^|[\s:{])include\s*\(\s*([^)]+?)\s*\)")
+pro_dependency_pattern = re.compile(r"ADD_DEPENDENCY\s*\(([^)]*)\)")
+
+def _pro_resolve(value, variables):
+  return pro_var_pattern.sub(lambda m: variables.get(m.group(1), m.group(0)), value)
+
+def _pro_read_lines(path):
+  try:
+    with open(path, "r", errors="ignore") as file:
+      content = file.read()
+  except (IOError, OSError):
+    return None
+  content = content.replace("\\\r\n", " ").replace("\\\n", " ")
+  lines = []
+  for line in content.splitlines():
+    pos = line.find("#")
+    if (-1 != pos):
+      line = line[:pos]
+    line = line.strip()
+    if ("" != line):
+      lines.append(line)
+  return lines
+
+def _pro_parse(path, variables, info, visited, is_root):
+  path = os.path.normpath(path)
+  if path in visited:
+    return True
+  visited.add(path)
+  lines = _pro_read_lines(path)
+  if lines is None:
+    return False
+
+  variables["PWD"] = os.path.dirname(path).replace("\\", "/")
+  for line in lines:
+    for match in pro_dependency_pattern.finditer(line):
+      for name in _pro_resolve(match.group(1), variables).split(","):
+        name = name.strip()
+        if ("" != name) and (-1 == name.find("$$")):
+          info["depends"].add(name)
+
+    for match in pro_include_pattern.finditer(line):
+      include_file = _pro_resolve(match.group(1).strip("\"'"), variables)
+      if (-1 != include_file.find("$$")):
+        continue
+      if not os.path.isabs(include_file):
+        include_file = variables["PWD"] + "/" + include_file
+      if os.path.isfile(include_file):
+        _pro_parse(include_file, variables, info, visited, False)
+        variables["PWD"] = os.path.dirname(path).replace("\\", "/")
+
+    match = pro_assign_pattern.search(line)
+    if not match:
+      continue
+    name = match.group(1)
+    operation = match.group(2)
+    value = _pro_resolve(match.group(3).strip(), variables)
+    if ("TARGET" == name):
+      if is_root and ("" == info["target"]) and (-1 == value.find("$$")):
+        info["target"] = value.strip("\"'")
+    elif ("LIBS" == name):
+      for item in value.split():
+        if (0 == item.find("-l")) and (-1 == item.find("$$")):
+          info["depends"].add(item[2:])
+    elif ("DEPENDPATH" == name):
+      for item in value.split():
+        if (-1 == item.find("$$")):
+          if not os.path.isabs(item):
+            item = variables["PWD"] + "/" + item
+          info["depend_paths"].add(os.path.normpath(item))
+    if ("=" == operation):
+      variables[name] = value
+    elif ("+=" == operation) or ("*=" == operation):
+      variables[name] = (variables[name] + " " + value) if name in variables else value
+  return True
+
+def get_project_info(pro_file):
+  info = {"target" : "", "depends" : set(), "depend_paths" : set(), "is_parsed" : False, "files" : []}
+  pro_file = os.path.abspath(pro_file)
+  variables = {}
+  visited = set()
+  info["is_parsed"] = _pro_parse(pro_file, variables, info, visited, True)
+  info["files"] = [file for file in visited if os.path.isfile(file)]
+  if ("" == info["target"]):
+    info["target"] = os.path.splitext(os.path.basename(pro_file))[0]
+  return info
+
+def get_projects_dependencies(projects):
+  result = {}
+  targets = {}
+  dirs = []
+  last_barrier = ""
+  last_in_dir = {}
+  for pro in projects:
+    info = get_project_info(pro)
+    pro_dir = os.path.normpath(os.path.dirname(os.path.abspath(pro)))
+    depends = []
+
+    if last_barrier:
+      depends.append(last_barrier)
+    # projects in the same folder share .qmake.stash and helper scripts
+    if pro_dir in last_in_dir:
+      depends.append(last_in_dir[pro_dir])
+
+    if not info["is_parsed"]:
+      # unknown project: build it after everything listed before it
+      depends += [p for p in projects[0:projects.index(pro)]]
+      last_barrier = pro
+    else:
+      for name in info["depends"]:
+        if (name in targets) and (name != info["target"]):
+          depends.append(targets[name])
+      for path in info["depend_paths"]:
+        for dir_item in dirs:
+          if (path == dir_item[0]) or (0 == path.find(dir_item[0] + os.sep)):
+            depends.append(dir_item[1])
+
+    result[pro] = [p for i, p in enumerate(depends) if (p != pro) and (p not in depends[0:i])]
+    if not info["target"] in targets:
+      targets[info["target"]] = pro
+    dirs.append([pro_dir, pro])
+    last_in_dir[pro_dir] = pro
+
+  if is_log:
+    for pro in projects:
+      print(pro + " <- " + ", ".join(result[pro]))
+  return result
+
 # test example
 if __name__ == '__main__':
   # test
@@ -187,3 +321,4 @@ if __name__ == '__main__':
 
   is_log = True
   projects = get_projects("./../sln.json", "win_64")
+  get_projects_dependencies(projects)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import time
+import json
+import glob
+import atexit
+
+try:
+  import resource
+except ImportError:
+  resource = None
+
+# build trace -------------------------------------------
+# spans are saved as chrome trace events (chrome://tracing, ui.perfetto.dev).
+# forked scheduler tasks save their own events into <trace>.part.<pid>,
+# the main process merges them and prints the critical path summary
+
+is_enabled = False
+trace_path = ""
+main_pid = 0
+events = []
+stack = []
+counter = 0
+root_parent = ""
+
+def init(path):
+  global is_enabled, trace_path, main_pid
+  if ("" == path):
+    return
+  is_enabled = True
+  trace_path = os.path.abspath(path)
+  main_pid = os.getpid()
+  for part in glob.glob(trace_path + ".part.*"):
+    os.remove(part)
+  atexit.register(finish)
+  return
+
+def _rusage():
+  if resource is None:
+    return [0.0, 0.0]
+  self_usage = resource.getrusage(resource.RUSAGE_SELF)
+  children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+  return [self_usage.ru_utime + self_usage.ru_stime, children_usage.ru_utime + children_usage.ru_stime]
+
+def begin(category, name, args=None, parent=None):
+  global counter
+  if not is_enabled:
+    return None
+  counter += 1
+  if parent is None:
+    parent = stack[-1]["id"] if (0 != len(stack)) else root_parent
+  record = {
+    "id" : str(os.getpid()) + ":" + str(counter),
+    "parent" : parent,
+    "cat" : category,
+    "name" : name,
+    "start" : time.time(),
+    "usage" : _rusage(),
+    "args" : dict(args) if args else {}
+  }
+  return record
+
+def push(record):
+  if record is not None:
+    stack.append(record)
+  return record
+
+def end(record, code=0):
+  if record is None:
+    return
+  if record in stack:
+    stack.remove(record)
+  usage = _rusage()
+  record["end"] = time.time()
+  record["args"]["code"] = code
+  record["args"]["cpu_self_s"] = round(usage[0] - record["usage"][0], 3)
+  record["args"]["cpu_children_s"] = round(usage[1] - record["usage"][1], 3)
+  del record["usage"]
+  events.append(record)
+  return
+
+# waits for the command process. RUSAGE_CHILDREN keeps the maximum over all
+# reaped children, so the peak rss of the command is taken from wait4
+def wait(process, record):
+  if (record is None) or not hasattr(os, "wait4"):
+    return process.wait()
+  pid, status, usage = os.wait4(process.pid, 0)
+  if hasattr(os, "waitstatus_to_exitcode"):
+    process.returncode = os.waitstatus_to_exitcode(status)
+  else:
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+  record["args"]["peak_rss_kb"] = usage.ru_maxrss if ("darwin" != sys.platform) else (usage.ru_maxrss // 1024)
+  return process.returncode
+
+def call(category, name, func, *args):
+  if not is_enabled:
+    return func(*args)
+  record = push(begin(category, name))
+  code = 0
+  try:
+    return func(*args)
+  except SystemExit as e:
+    code = e.code if isinstance(e.code, int) else 1
+    raise
+  except BaseException:
+    code = 1
+    raise
+  finally:
+    end(record, code)
+
+# scheduler support
+def set_parent(parent):
+  global root_parent, events, stack
+  root_parent = parent
+  events = []
+  stack = []
+  return
+
+def save_process():
+  if not is_enabled or (os.getpid() == main_pid):
+    return
+  with open(trace_path + ".part." + str(os.getpid()), "w") as file:
+    json.dump(events, file)
+  return
+
+def _load_all():
+  result = list(events)
+  for part in sorted(glob.glob(trace_path + ".part.*")):
+    try:
+      with open(part, "r") as file:
+        result += json.load(file)
+    except (IOError, ValueError):
+      pass
+    os.remove(part)
+  return result
+
+def _to_trace_events(records):
+  result = []
+  for record in records:
+    pid, num = record["id"].split(":")
+    args = dict(record["args"])
+    args["id"] = record["id"]
+    args["parent"] = record["parent"]
+    result.append({
+      "name" : record["name"],
+      "cat" : record["cat"],
+      "ph" : "X",
+      "ts" : int(record["start"] * 1000000),
+      "dur" : int((record["end"] - record["start"]) * 1000000),
+      "pid" : int(pid),
+      "tid" : int(pid),
+      "args" : args
+    })
+  return result
+
+# aggregate spans (stages, modules, tasks) get the max peak rss of their commands
+def _aggregate_peak_rss(records):
+  ids = set([record["id"] for record in records])
+  children_map = {}
+  for record in records:
+    children_map.setdefault(record["parent"], []).append(record)
+
+  def peak(record):
+    value = record["args"].get("peak_rss_kb", 0)
+    for child in children_map.get(record["id"], []):
+      value = max(value, peak(child))
+    if (0 != value):
+      record["args"]["peak_rss_kb"] = value
+    return value
+
+  for record in records:
+    if not (record["parent"] in ids):
+      peak(record)
+  return
+
+# critical path -----------------------------------------
+def _duration(record):
+  return record["end"] - record["start"]
+
+def _critical_path(record, children_map):
+  children = children_map.get(record["id"], [])
+  if (0 == len(children)):
+    return [record]
+  tasks = [child for child in children if ("task" == child["cat"])]
+  if (0 != len(tasks)):
+    # parallel tasks: walk back from the last finished task through the latest finished dependency
+    by_name = {}
+    for task in tasks:
+      by_name[task["name"]] = task
+    chain = []
+    current = max(tasks, key=lambda item: item["end"])
+    while current is not None:
+      chain.insert(0, current)
+      depends = [by_name[name] for name in current["args"].get("depends", []) if name in by_name]
+      current = max(depends, key=lambda item: item["end"]) if (0 != len(depends)) else None
+    result = [record]
+    for task in chain:
+      result += _critical_path(task, children_map)
+    return result
+  # sequential children: the longest one dominates
+  return [record] + _critical_path(max(children, key=_duration), children_map)
+
+def print_summary(records):
+  children_map = {}
+  ids = set([record["id"] for record in records])
+  for record in records:
+    parent = record["parent"] if (record["parent"] in ids) else ""
+    children_map.setdefault(parent, []).append(record)
+  for parent in children_map:
+    children_map[parent].sort(key=lambda item: item["start"])
+
+  stages = children_map.get("", [])
+  if (0 == len(stages)):
+    return
+  total = max([item["end"] for item in stages]) - min([item["start"] for item in stages])
+
+  print("------------------------------------------")
+  print("build time: " + ("%.1f" % total) + "s")
+  for stage in stages:
+    percent = (100.0 * _duration(stage) / total) if (0 != total) else 0
+    print("  " + stage["name"].ljust(32) + ("%9.1f" % _duration(stage)) + "s " + ("%5.1f" % percent) + "%")
+
+  by_id = {}
+  for record in records:
+    by_id[record["id"]] = record
+  print("critical path:")
+  for stage in stages:
+    path = _critical_path(stage, children_map)
+    for item in path:
+      depth = 0
+      parent = item["parent"]
+      while (parent in by_id) and (depth < 16):
+        depth += 1
+        parent = by_id[parent]["parent"]
+      print("  " + ("  " * depth) + "[" + item["cat"] + "] " + item["name"][0:80] + " " + ("%.1f" % _duration(item)) + "s")
+
+  slowest = sorted([record for record in records if ("cmd" == record["cat"])], key=_duration, reverse=True)[0:10]
+  if (0 != len(slowest)):
+    print("slowest commands:")
+    for item in slowest:
+      print("  " + ("%9.1f" % _duration(item)) + "s  " + item["name"][0:100])
+  print("------------------------------------------")
+  sys.stdout.flush()
+  return
+
+def finish():
+  global is_enabled
+  if not is_enabled or (os.getpid() != main_pid):
+    return
+  # close opened spans (build is stopped by an error)
+  for record in reversed(list(stack)):
+    end(record, 1)
+  records = _load_all()
+  _aggregate_peak_rss(records)
+  with open(trace_path, "w") as file:
+    json.dump({"traceEvents" : _to_trace_events(records), "displayTimeUnit" : "ms"}, file)
+  print("build trace: " + trace_path)
+  print_summary(records)
+  is_enabled = False
+  return
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+
+import sys
+sys.path.append('../../scripts')
+import base
+import os
+import csv
+import json
+import time
+import argparse
+import subprocess
+import convert_common
+
+# x2t conversion benchmark ------------------------------
+# every corpus file with a source extension from the matrix is converted to the
+# target formats (sequentially, so results are comparable). modes:
+#   warm - the resolved AllFonts.js is used
+#   cold - an empty font dir is passed, x2t has to collect the font info itself
+# per conversion: wall time, peak rss (linux/mac), output size. results are saved
+# as json/csv and compared with a baseline json (median time per format pair and mode)
+
+def parse_matrix(value):
+  result = []
+  for item in value.split(","):
+    src, dst = item.strip().split(":")
+    convert_common.getFormatByExt(dst)
+    result.append([src.lower(), dst.lower()])
+  return result
+
+def run_x2t(directory_x2t, xml_convert, temp_dir):
+  if base.is_dir(temp_dir):
+    base.delete_dir(temp_dir)
+  base.create_dir(temp_dir)
+  base.save_as_script(temp_dir + "/to.xml", [xml_convert])
+  start_time = time.time()
+  process = subprocess.Popen([os.path.abspath(directory_x2t + "/x2t"), temp_dir + "/to.xml"], cwd=directory_x2t, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+  peak_rss_kb = -1
+  if hasattr(os, "wait4"):
+    pid, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+    peak_rss_kb = usage.ru_maxrss if ("darwin" != sys.platform) else (usage.ru_maxrss // 1024)
+  else:
+    process.wait()
+  elapsed = time.time() - start_time
+  base.delete_dir(temp_dir)
+  return [process.returncode, elapsed, peak_rss_kb]
+
+def median(values):
+  values = sorted(values)
+  if (0 == len(values)):
+    return 0.0
+  middle = len(values) // 2
+  return values[middle] if (1 == len(values) % 2) else (values[middle - 1] + values[middle]) / 2.0
+
+def percentile(values, part):
+  values = sorted(values)
+  if (0 == len(values)):
+    return 0.0
+  return values[min(len(values) - 1, int(part * len(values)))]
+
+def summarize(results):
+  groups = {}
+  for item in results:
+    if (0 != item["code"]):
+      continue
+    key = item["source"] + "->" + item["target"] + " " + item["mode"]
+    groups.setdefault(key, []).append(item)
+  summary = {}
+  for key in sorted(groups.keys()):
+    items = groups[key]
+    times = [item["time"] for item in items]
+    total_time = sum(times)
+    total_size = sum([item["input_size"] for item in items])
+    summary[key] = {
+      "count" : len(items),
+      "median" : round(median(times), 4),
+      "p90" : round(percentile(times, 0.9), 4),
+      "mean" : round(total_time / len(items), 4),
+      "files_per_s" : round(len(items) / total_time, 3) if (0 != total_time) else 0,
+      "mb_per_s" : round(total_size / (1024.0 * 1024.0) / total_time, 3) if (0 != total_time) else 0,
+      "peak_rss_kb" : max([item["peak_rss_kb"] for item in items])
+    }
+  return summary
+
+def compare(summary, baseline, threshold):
+  regressions = []
+  print("------------------------------------------")
+  print("format".ljust(28) + "  baseline    current     delta")
+  for key in sorted(summary.keys()):
+    if not key in baseline:
+      continue
+    old = baseline[key]["median"]
+    new = summary[key]["median"]
+    delta = ((new - old) / old * 100.0) if (0 != old) else 0.0
+    mark = ""
+    if (delta > threshold):
+      mark = "  REGRESSION"
+      regressions.append(key)
+    print(key.ljust(28) + ("%9.3fs" % old) + ("%9.3fs" % new) + ("%+9.1f%%" % delta) + mark)
+  print("------------------------------------------")
+  return regressions
+
+parser = argparse.ArgumentParser(description="x2t conversion benchmark")
+parser.add_argument("builder", help="path to the builder (x2t) directory")
+parser.add_argument("corpus", help="path to the input files directory (subfolders are included)")
+parser.add_argument("--matrix", default="docx:pdf,xlsx:pdf,pptx:pdf", help="source:target pairs, e.g. docx:pdf,docx:odt")
+parser.add_argument("--modes", default="warm", help="font cache modes: warm,cold")
+parser.add_argument("--runs", type=int, default=1, help="runs per conversion (the median time is used)")
+parser.add_argument("--output", default="benchmark", help="results path without extension (.json and .csv are written)")
+parser.add_argument("--baseline", default="", help="json results of a previous run to compare with")
+parser.add_argument("--threshold", type=float, default=10.0, help="median time increase (percent) reported as a regression")
+args = parser.parse_args()
+
+base.configure_common_apps()
+directory_x2t = args.builder.replace("\\", "/")
+matrix = parse_matrix(args.matrix)
+modes = [mode.strip() for mode in args.modes.split(",")]
+
+directory_fonts = convert_common.getFontsDirectory(directory_x2t)
+work_dir = os.getcwd().replace("\\", "/") + "/benchmark_temp"
+if base.is_dir(work_dir):
+  base.delete_dir(work_dir)
+base.create_dir(work_dir + "/fonts_cold")
+base.create_dir(work_dir + "/output")
+
+files = []
+for root, dirs, names in os.walk(args.corpus):
+  dirs.sort()
+  for name in sorted(names):
+    files.append(os.path.join(root, name).replace("\\", "/"))
+
+results = []
+for file in files:
+  ext = os.path.splitext(file)[1][1:].lower()
+  for source, target in matrix:
+    if (source != ext):
+      continue
+    for mode in modes:
+      fonts = directory_fonts if ("warm" == mode) else (work_dir + "/fonts_cold")
+      output_file = work_dir + "/output/result." + target
+      runs = []
+      for index in range(max(1, args.runs)):
+        if base.is_file(output_file):
+          base.delete_file(output_file)
+        if ("cold" == mode):
+          base.delete_dir(work_dir + "/fonts_cold")
+          base.create_dir(work_dir + "/fonts_cold")
+        xml_convert = convert_common.getConvertXml(file, output_file, "", fonts, work_dir + "/temp")
+        runs.append(run_x2t(directory_x2t, xml_convert, work_dir + "/temp"))
+      codes = [run[0] for run in runs]
+      item = {
+        "file" : os.path.relpath(file, args.corpus).replace("\\", "/"),
+        "source" : source,
+        "target" : target,
+        "mode" : mode,
+        "code" : max(codes, key=abs),
+        "time" : round(median([run[1] for run in runs]), 4),
+        "peak_rss_kb" : max([run[2] for run in runs]),
+        "input_size" : os.path.getsize(file),
+        "output_size" : os.path.getsize(output_file) if base.is_file(output_file) else 0
+      }
+      results.append(item)
+      print(item["file"] + " " + source + "->" + target + " " + mode + ": " + ("%.3f" % item["time"]) + "s, " + str(item["peak_rss_kb"]) + " KB, code " + str(item["code"]))
+      sys.stdout.flush()
+
+base.delete_dir(work_dir)
+
+summary = summarize(results)
+with open(args.output + ".json", "w") as file:
+  json.dump({"x2t" : os.path.abspath(directory_x2t), "time" : time.strftime("%Y-%m-%d %H:%M:%S"), "summary" : summary, "results" : results}, file, indent=2)
+with open(args.output + ".csv", "w", newline="") as file:
+  writer = csv.writer(file)
+  fields = ["file", "source", "target", "mode", "code", "time", "peak_rss_kb", "input_size", "output_size"]
+  writer.writerow(fields)
+  for item in results:
+    writer.writerow([item[field] for field in fields])
+
+print("------------------------------------------")
+for key in summary:
+  value = summary[key]
+  print(key.ljust(28) + " files: " + str(value["count"]) + ", median: " + ("%.3f" % value["median"]) + "s, p90: " + ("%.3f" % value["p90"]) + "s, " + str(value["files_per_s"]) + " files/s, " + str(value["mb_per_s"]) + " MB/s, peak rss: " + str(value["peak_rss_kb"]) + " KB")
+failed = [item for item in results if (0 != item["code"])]
+print("failed: " + str(len(failed)))
+
+if ("" != args.baseline):
+  with open(args.baseline, "r") as file:
+    baseline = json.load(file)["summary"]
+  if (0 != len(compare(summary, baseline, args.threshold))):
+    exit(1)
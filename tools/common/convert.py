@@ -22,8 +22,4 @@ convert_params = ""
 if 4 == len(params):
   convert_params = params[3]
 
-directory_fonts = directory_x2t + "/sdkjs/common"
-if not base.is_file(directory_fonts + "/AllFonts.js"):
-  base.cmd_in_dir(directory_x2t, "docbuilder", [], True)
-
 convert_common.convertFile(directory_x2t, file_input, file_output, convert_params)
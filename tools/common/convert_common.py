@@ -5,6 +5,10 @@ sys.path.append('../../scripts')
 import base
 import os
 import glob
+import time
+import threading
+import subprocess
+import font_cache
 from xml.sax.saxutils import escape
 
 AVS_OFFICESTUDIO_FILE_DOCUMENT                      = 0x0040
@@ -123,29 +127,11 @@ def getFormatByFile(file_path):
   ext = file_path.split(".")[-1]
   return getFormatByExt(ext)
 
-def convertFile(directory_x2t, file_input, file_output, convert_params):
-  cur_path = os.getcwd()
-
-  # fonts directory -----------------------------------
-  directory_fonts = directory_x2t + "/sdkjs/common"
-  directory_fonts_local = ""
-  if "windows" == base.host_platform():
-    directory_fonts_local = os.getenv("LOCALAPPDATA") + "/ONLYOFFICE/docbuilder"
-  else:
-    directory_fonts_local = os.path.expanduser('~') + "/.local/share/ONLYOFFICE/docbuilder"
-
-  if not base.is_file(directory_fonts + "/AllFonts.js") and not base.is_file(directory_fonts_local + "/AllFonts.js"):
-    base.cmd_in_dir(directory_x2t, "docbuilder", [], True)
-    
-  if base.is_file(directory_fonts_local + "/AllFonts.js"):
-    directory_fonts = directory_fonts_local
-  # ---------------------------------------------------  
-
-  temp_dir = os.getcwd().replace("\\", "/") + "/temp"
-  if base.is_dir(temp_dir):
-    base.delete_dir(temp_dir)
-  base.create_dir(temp_dir)
+# AllFonts.js is generated once per font set in the shared font cache (see font_cache.py)
+def getFontsDirectory(directory_x2t):
+  return font_cache.get_fonts_directory(directory_x2t)
 
+def getConvertXml(file_input, file_output, convert_params, directory_fonts, temp_dir):
   xml_convert = u"<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
   xml_convert += u"<TaskQueueDataConvert>"
   xml_convert += (u"<m_sFileFrom>" + escape(file_input) + u"</m_sFileFrom>")
@@ -158,8 +144,105 @@ def convertFile(directory_x2t, file_input, file_output, convert_params):
   xml_convert += convert_params
   xml_convert += (u"<m_sTempDir>" + temp_dir + u"</m_sTempDir>")
   xml_convert += u"</TaskQueueDataConvert>"
+  return xml_convert
+
+def convertFile(directory_x2t, file_input, file_output, convert_params):
+  cur_path = os.getcwd()
+
+  # fonts directory -----------------------------------
+  directory_fonts = getFontsDirectory(directory_x2t)
+  # ---------------------------------------------------  
+
+  temp_dir = os.getcwd().replace("\\", "/") + "/temp"
+  if base.is_dir(temp_dir):
+    base.delete_dir(temp_dir)
+  base.create_dir(temp_dir)
+
+  xml_convert = getConvertXml(file_input, file_output, convert_params, directory_fonts, temp_dir)
   base.save_as_script(temp_dir + "/to.xml", [xml_convert])
   base.cmd_in_dir(directory_x2t, "x2t", [temp_dir + "/to.xml"], True)
   base.delete_dir(temp_dir)
 
   os.chdir(cur_path)
+
+# batch conversion --------------------------------------
+# every worker thread has its own temp dir (temp_root/<worker>) and task xml,
+# x2t is started with cwd instead of os.chdir, so the workers do not interfere
+def runConvert(directory_x2t, xml_convert, temp_dir):
+  if base.is_dir(temp_dir):
+    base.delete_dir(temp_dir)
+  base.create_dir(temp_dir)
+  base.save_as_script(temp_dir + "/to.xml", [xml_convert])
+  try:
+    code = subprocess.call([os.path.abspath(directory_x2t + "/x2t"), temp_dir + "/to.xml"], cwd=directory_x2t, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+  except OSError:
+    code = 127
+  base.delete_dir(temp_dir)
+  return code
+
+def isUpToDate(file_input, file_output):
+  return os.path.isfile(file_output) and (os.path.getmtime(file_output) >= os.path.getmtime(file_input))
+
+# tasks: [[file_input, file_output], ...]
+def convertFiles(directory_x2t, tasks, convert_params, jobs, temp_root):
+  directory_fonts = getFontsDirectory(directory_x2t)
+  start_time = time.time()
+  stat = {"converted" : 0, "skipped" : 0, "failed" : [], "input_size" : 0, "output_size" : 0}
+  lock = threading.Lock()
+  queue = list(reversed(tasks))
+  total = len(tasks)
+
+  def worker(index):
+    temp_dir = temp_root + "/" + str(index)
+    while True:
+      with lock:
+        if (0 == len(queue)):
+          return
+        file_input, file_output = queue.pop()
+        number = total - len(queue)
+      if isUpToDate(file_input, file_output):
+        with lock:
+          stat["skipped"] += 1
+        continue
+      try:
+        output_dir = os.path.dirname(file_output)
+        if ("" != output_dir) and not base.is_dir(output_dir):
+          os.makedirs(output_dir, exist_ok=True)
+        xml_convert = getConvertXml(file_input, file_output, convert_params, directory_fonts, temp_dir)
+        code = runConvert(directory_x2t, xml_convert, temp_dir)
+      except (ValueError, IOError, OSError) as e:
+        print("convert error: " + file_input + " (" + str(e) + ")")
+        code = -1
+      with lock:
+        stat["input_size"] += os.path.getsize(file_input)
+        if (0 == code) and os.path.exists(file_output):
+          stat["converted"] += 1
+          stat["output_size"] += os.path.getsize(file_output) if os.path.isfile(file_output) else 0
+          status = "ok"
+        else:
+          stat["failed"].append(file_input)
+          status = "failed (" + str(code) + ")"
+        print("process [" + str(number) + " of " + str(total) + "]: " + file_input + " - " + status)
+        sys.stdout.flush()
+
+  base.create_dir(temp_root)
+  threads = [threading.Thread(target=worker, args=(index,)) for index in range(max(1, jobs))]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  base.delete_dir(temp_root)
+
+  printSummary(stat, total, time.time() - start_time)
+  return stat
+
+def printSummary(stat, total, elapsed):
+  elapsed = max(elapsed, 0.001)
+  processed = stat["converted"] + len(stat["failed"])
+  print("------------------------------------------")
+  print("files: " + str(total) + ", converted: " + str(stat["converted"]) + ", skipped (up to date): " + str(stat["skipped"]) + ", failed: " + str(len(stat["failed"])))
+  print("time: " + ("%.1f" % elapsed) + "s, " + ("%.2f" % (processed / elapsed)) + " files/s, " + ("%.2f" % (stat["input_size"] / (1024.0 * 1024.0) / elapsed)) + " MB/s (input)")
+  for file in stat["failed"]:
+    print("failed: " + file)
+  print("------------------------------------------")
+  return
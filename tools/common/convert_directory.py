@@ -6,11 +6,37 @@ import base
 import os
 import glob
 import convert_common
+import convert_service
 
 params = sys.argv[1:]
 
+# --jobs N: batch mode (subfolders, up to date outputs are skipped, N x2t processes)
+jobs = 0
+if ("--jobs" in params):
+  index = params.index("--jobs")
+  if (index + 1 < len(params)):
+    jobs = max(1, int(params[index + 1]))
+  params = params[:index] + params[index + 2:]
+
+# --batch N: batch mode through docbuilder processes, N files per process (see convert_service.py)
+# --max-rss MB: recycle a docbuilder process when its memory exceeds the limit
+batch = 0
+max_rss = 0
+for name in ["--batch", "--max-rss"]:
+  if (name in params):
+    index = params.index(name)
+    if (index + 1 < len(params)):
+      value = max(0, int(params[index + 1]))
+      if ("--batch" == name):
+        batch = value
+      else:
+        max_rss = value
+    params = params[:index] + params[index + 2:]
+if (0 != batch) and (0 == jobs):
+  jobs = 1
+
 if (4 > len(params)):
-  print("use: convert_directory.py path_to_builder_directory path_to_input_files_directory path_to_output_files_directory format_ext [convert_params]")
+  print("use: convert_directory.py [--jobs N [--batch N] [--max-rss MB]] path_to_builder_directory path_to_input_files_directory path_to_output_files_directory format_ext [convert_params]")
   exit(0)
 
 cur_path = os.getcwd()
@@ -24,13 +50,27 @@ convert_params = ""
 if (5 == len(params)):
   convert_params = params[4]
 
+if (0 != jobs):
+  tasks = []
+  for root, dirs, files in os.walk(u"" + directory_input):
+    dirs.sort()
+    for file in sorted(files):
+      input_file = os.path.join(root, file).replace("\\", "/")
+      relative_dir = os.path.relpath(root, directory_input)
+      output_file = os.path.join(directory_output, relative_dir, os.path.splitext(file)[0]) + u"." + format_ext
+      tasks.append([input_file, os.path.normpath(output_file).replace("\\", "/")])
+  temp_root = os.getcwd().replace("\\", "/") + "/temp"
+  if (0 != batch):
+    stat = convert_service.convertFiles(directory_x2t, tasks, convert_params, jobs, temp_root, batch, max_rss)
+  else:
+    stat = convert_common.convertFiles(directory_x2t, tasks, convert_params, jobs, temp_root)
+  exit(1 if (0 != len(stat["failed"])) else 0)
+
 input_files = []
 for file in glob.glob(os.path.join(u"" + directory_input, u'*')):
   input_files.append(file.replace("\\", "/"))
 
-directory_fonts = directory_x2t + "/sdkjs/common"
-if not base.is_file(directory_fonts + "/AllFonts.js"):
-  base.cmd_in_dir(directory_x2t, "docbuilder", [], True)
+convert_common.getFontsDirectory(directory_x2t)
 
 output_len = len(input_files)
 output_cur = 1
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+
+import sys
+sys.path.append('../../scripts')
+import base
+import os
+import json
+import time
+import threading
+import subprocess
+import convert_common
+
+# conversion service ------------------------------------
+# x2t converts one file per process, so small documents are dominated by the
+# process start (format libs, icu, js snapshot). the service keeps up to <jobs>
+# docbuilder processes, every process converts a batch of files from one script
+# (builder.OpenFile/SaveFile/CloseFile). a process is recycled after <batch> tasks
+# or when its rss exceeds <max_rss> MB (linux). files which were not converted by
+# docbuilder (crash, memory kill, unsupported format) are converted by one-shot x2t,
+# the rest of the batch is requeued. if docbuilder is missing, can not be started or
+# converts nothing in MAX_EMPTY_BATCHES batches in a row, all tasks go to x2t.
+
+MAX_EMPTY_BATCHES = 3
+
+def get_rss_mb(pid):
+  try:
+    with open("/proc/" + str(pid) + "/status", "r") as file:
+      for line in file:
+        if line.startswith("VmRSS:"):
+          return int(line.split()[1]) // 1024
+  except (IOError, OSError, ValueError):
+    pass
+  return 0
+
+def get_docbuilder(directory_x2t):
+  path = directory_x2t + "/docbuilder" + (".exe" if ("windows" == base.host_platform()) else "")
+  return os.path.abspath(path) if base.is_file(path) else ""
+
+def get_save_params(convert_params):
+  params = u"<m_sJsonParams>{&quot;spreadsheetLayout&quot;:{&quot;fitToWidth&quot;:1,&quot;fitToHeight&quot;:1}}</m_sJsonParams>"
+  params += u"<m_nDoctParams>1</m_nDoctParams>"
+  return params + convert_params
+
+def get_script(tasks, convert_params):
+  save_params = json.dumps(get_save_params(convert_params))
+  lines = []
+  for file_input, file_output in tasks:
+    format_ext = os.path.splitext(file_output)[1][1:].lower()
+    lines.append(u"builder.OpenFile(" + json.dumps(os.path.abspath(file_input)) + u", \"\");")
+    lines.append(u"builder.SaveFile(" + json.dumps(format_ext) + u", " + json.dumps(os.path.abspath(file_output)) + u", " + save_params + u");")
+    lines.append(u"builder.CloseFile();")
+  return lines
+
+# returns [exit code, killed by the memory limit]
+def run_docbuilder(docbuilder, directory_x2t, script_path, max_rss):
+  try:
+    process = subprocess.Popen([docbuilder, script_path], cwd=directory_x2t, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+  except OSError:
+    return [127, False]
+  while True:
+    try:
+      return [process.wait(timeout=0.2), False]
+    except subprocess.TimeoutExpired:
+      pass
+    if (0 != max_rss) and (get_rss_mb(process.pid) > max_rss):
+      process.kill()
+      process.wait()
+      return [process.returncode, True]
+
+# tasks: [[file_input, file_output], ...]
+def convertFiles(directory_x2t, tasks, convert_params, jobs, temp_root, batch=50, max_rss=0):
+  docbuilder = get_docbuilder(directory_x2t)
+  if ("" == docbuilder) or (0 == batch):
+    return convert_common.convertFiles(directory_x2t, tasks, convert_params, jobs, temp_root)
+
+  directory_fonts = convert_common.getFontsDirectory(directory_x2t)
+  start_time = time.time()
+  stat = {"converted" : 0, "skipped" : 0, "failed" : [], "input_size" : 0, "output_size" : 0, "processes" : 0, "fallback" : 0}
+  state = {"service" : True, "number" : 0, "empty_batches" : 0}
+  lock = threading.Lock()
+  queue = list(reversed(tasks))
+  total = len(tasks)
+
+  def report(file_input, file_output, code):
+    with lock:
+      state["number"] += 1
+      stat["input_size"] += os.path.getsize(file_input)
+      if (0 == code) and os.path.exists(file_output):
+        stat["converted"] += 1
+        stat["output_size"] += os.path.getsize(file_output) if os.path.isfile(file_output) else 0
+        status = "ok"
+      else:
+        stat["failed"].append(file_input)
+        status = "failed (" + str(code) + ")"
+      print("process [" + str(state["number"]) + " of " + str(total) + "]: " + file_input + " - " + status)
+      sys.stdout.flush()
+    return
+
+  def convert_one_shot(file_input, file_output, temp_dir):
+    try:
+      xml_convert = convert_common.getConvertXml(file_input, file_output, convert_params, directory_fonts, temp_dir)
+      code = convert_common.runConvert(directory_x2t, xml_convert, temp_dir)
+    except (ValueError, IOError, OSError) as e:
+      print("convert error: " + file_input + " (" + str(e) + ")")
+      code = -1
+    with lock:
+      stat["fallback"] += 1
+    report(file_input, file_output, code)
+    return
+
+  def is_converted(file_output):
+    return os.path.isfile(file_output) and (0 != os.path.getsize(file_output))
+
+  def worker(index):
+    temp_dir = temp_root + "/" + str(index)
+    while True:
+      items = []
+      with lock:
+        while (0 != len(queue)) and (len(items) < batch):
+          file_input, file_output = queue.pop()
+          if convert_common.isUpToDate(file_input, file_output):
+            stat["skipped"] += 1
+            state["number"] += 1
+            continue
+          items.append([file_input, file_output])
+        use_service = state["service"]
+      if (0 == len(items)):
+        return
+
+      for file_input, file_output in items:
+        output_dir = os.path.dirname(file_output)
+        if ("" != output_dir) and not base.is_dir(output_dir):
+          os.makedirs(output_dir, exist_ok=True)
+        if use_service and os.path.isfile(file_output):
+          os.remove(file_output)
+
+      if not use_service:
+        for file_input, file_output in items:
+          convert_one_shot(file_input, file_output, temp_dir)
+        continue
+
+      base.create_dir(temp_dir)
+      script_path = temp_dir + "/batch.docbuilder"
+      base.save_as_script(script_path, get_script(items, convert_params))
+      code, killed = run_docbuilder(docbuilder, directory_x2t, script_path, max_rss)
+      base.delete_file(script_path)
+      with lock:
+        stat["processes"] += 1
+
+      # files are converted in the script order. after an abnormal exit the last
+      # written output can be incomplete and the next file is the broken one
+      converted = [is_converted(file_output) for file_input, file_output in items]
+      first_missing = converted.index(False) if (False in converted) else len(items)
+      retry = []
+      requeue = []
+      if (0 == code) and not killed:
+        for item, is_ok in zip(items, converted):
+          if is_ok:
+            report(item[0], item[1], 0)
+          else:
+            retry.append(item)
+      else:
+        if killed:
+          print("docbuilder rss limit (" + str(max_rss) + " MB) exceeded, recycle the process")
+        suspect = max(0, first_missing - 1)
+        for item in items[0:suspect]:
+          report(item[0], item[1], 0)
+        retry = items[suspect:first_missing + 1]
+        requeue = items[first_missing + 1:]
+
+      with lock:
+        if (True in converted) or killed:
+          state["empty_batches"] = 0
+        else:
+          state["empty_batches"] += 1
+        if state["service"] and (127 == code):
+          print("docbuilder can not be started, use one-shot x2t")
+          state["service"] = False
+        elif state["service"] and (state["empty_batches"] >= MAX_EMPTY_BATCHES):
+          print("docbuilder does not convert files, use one-shot x2t")
+          state["service"] = False
+      if (0 != len(requeue)):
+        with lock:
+          queue.extend(reversed(requeue))
+      for file_input, file_output in retry:
+        convert_one_shot(file_input, file_output, temp_dir)
+
+  base.create_dir(temp_root)
+  threads = [threading.Thread(target=worker, args=(index,)) for index in range(max(1, jobs))]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  base.delete_dir(temp_root)
+
+  convert_common.printSummary(stat, total, time.time() - start_time)
+  print("docbuilder processes: " + str(stat["processes"]) + ", one-shot x2t conversions: " + str(stat["fallback"]))
+  return stat
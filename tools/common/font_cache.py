@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+import sys
+sys.path.append('../../scripts')
+import base
+import os
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+
+try:
+  import fcntl
+except ImportError:
+  fcntl = None
+
+try:
+  import msvcrt
+except ImportError:
+  msvcrt = None
+
+# shared font cache -------------------------------------
+# AllFonts.js + font_selection.bin are generated once per font set fingerprint
+# (font files listing + builder binaries) into <cache dir>/<fingerprint>/.
+# generation is done under a file lock, so parallel converters wait for the
+# first one instead of scanning fonts again.
+# cache dir: OO_FONT_CACHE_DIR or the user cache folder
+
+FONT_EXTENSIONS = [".ttf", ".ttc", ".otf", ".pfb", ".pfa", ".woff", ".woff2", ".fon", ".pcf", ".gz"]
+
+resolved = {}
+
+def get_cache_dir():
+  if ("" != os.environ.get("OO_FONT_CACHE_DIR", "")):
+    return os.path.abspath(os.environ["OO_FONT_CACHE_DIR"])
+  if ("windows" == base.host_platform()):
+    return os.getenv("LOCALAPPDATA") + "/ONLYOFFICE/font_cache"
+  if ("mac" == base.host_platform()):
+    return os.path.expanduser("~") + "/Library/Caches/ONLYOFFICE/font_cache"
+  return os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~") + "/.cache") + "/onlyoffice/font_cache"
+
+def get_system_font_dirs():
+  home = os.path.expanduser("~")
+  if ("windows" == base.host_platform()):
+    return [os.getenv("WINDIR", "C:/Windows") + "/Fonts", os.getenv("LOCALAPPDATA", "") + "/Microsoft/Windows/Fonts"]
+  if ("mac" == base.host_platform()):
+    return ["/System/Library/Fonts", "/Library/Fonts", home + "/Library/Fonts"]
+  return ["/usr/share/fonts", "/usr/local/share/fonts", "/usr/share/X11/fonts", home + "/.fonts", home + "/.local/share/fonts"]
+
+def get_font_dirs(directory_x2t):
+  dirs = get_system_font_dirs()
+  if base.is_dir(directory_x2t + "/fonts"):
+    dirs.append(directory_x2t + "/fonts")
+  return [path for path in dirs if os.path.isdir(path)]
+
+def get_fingerprint(directory_x2t):
+  items = []
+  for directory in get_font_dirs(directory_x2t):
+    for root, dirs, files in os.walk(directory):
+      for file in files:
+        if not os.path.splitext(file)[1].lower() in FONT_EXTENSIONS:
+          continue
+        path = os.path.join(root, file)
+        try:
+          stat = os.stat(path)
+        except OSError:
+          continue
+        items.append([path.replace("\\", "/"), stat.st_size, int(stat.st_mtime)])
+  # the font info format depends on the builder version
+  for name in ["allfontsgen", "allfontsgen.exe", "docbuilder", "docbuilder.exe"]:
+    path = directory_x2t + "/" + name
+    if base.is_file(path):
+      items.append([name, os.path.getsize(path), int(os.path.getmtime(path))])
+  items.sort()
+  return hashlib.sha256(json.dumps(items).encode("utf-8")).hexdigest()[0:32]
+
+def is_valid(directory):
+  return base.is_file(directory + "/AllFonts.js") and base.is_file(directory + "/font_selection.bin")
+
+# process-wide lock on <path>, works on posix and windows
+class FileLock(object):
+  def __init__(self, path):
+    self.path = path
+    self.file = None
+
+  def __enter__(self):
+    self.file = open(self.path, "a+")
+    if fcntl is not None:
+      fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+      while True:
+        try:
+          self.file.seek(0)
+          msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+          break
+        except OSError:
+          time.sleep(0.1)
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if fcntl is not None:
+      fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+      self.file.seek(0)
+      msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+    self.file.close()
+    return False
+
+def get_local_fonts_dirs(directory_x2t):
+  if ("windows" == base.host_platform()):
+    local_dir = os.getenv("LOCALAPPDATA") + "/ONLYOFFICE/docbuilder"
+  else:
+    local_dir = os.path.expanduser('~') + "/.local/share/ONLYOFFICE/docbuilder"
+  return [local_dir, directory_x2t + "/sdkjs/common"]
+
+def generate(directory_x2t, output_dir):
+  allfontsgen = directory_x2t + "/allfontsgen" + (".exe" if ("windows" == base.host_platform()) else "")
+  if base.is_file(allfontsgen):
+    args = [os.path.abspath(allfontsgen), "--use-system=1", "--allfonts=" + output_dir + "/AllFonts.js", "--selection=" + output_dir + "/font_selection.bin"]
+    if base.is_dir(directory_x2t + "/fonts"):
+      args.append("--input=" + os.path.abspath(directory_x2t + "/fonts"))
+    subprocess.call(args, cwd=directory_x2t)
+    if is_valid(output_dir):
+      return True
+  # docbuilder generates the font info into its own folders
+  subprocess.call([os.path.abspath(directory_x2t + "/docbuilder")], cwd=directory_x2t)
+  for directory in get_local_fonts_dirs(directory_x2t):
+    if is_valid(directory):
+      for name in ["AllFonts.js", "font_selection.bin"]:
+        shutil.copy2(directory + "/" + name, output_dir + "/" + name)
+      return True
+  return False
+
+# returns the folder with AllFonts.js & font_selection.bin for the builder
+def get_fonts_directory(directory_x2t):
+  directory_x2t = os.path.abspath(directory_x2t).replace("\\", "/")
+  if directory_x2t in resolved:
+    return resolved[directory_x2t]
+
+  cache_dir = get_cache_dir()
+  base.create_dir(cache_dir)
+  fingerprint = get_fingerprint(directory_x2t)
+  entry_dir = cache_dir + "/" + fingerprint
+  if not is_valid(entry_dir):
+    with FileLock(entry_dir + ".lock"):
+      # another process could generate it while we were waiting
+      if not is_valid(entry_dir):
+        print("font cache: generating " + entry_dir)
+        tmp_dir = entry_dir + "." + str(os.getpid()) + ".tmp"
+        if base.is_dir(tmp_dir):
+          base.delete_dir(tmp_dir)
+        base.create_dir(tmp_dir)
+        if generate(directory_x2t, tmp_dir):
+          if base.is_dir(entry_dir):
+            base.delete_dir(entry_dir)
+          os.rename(tmp_dir, entry_dir)
+        else:
+          base.delete_dir(tmp_dir)
+
+  if not is_valid(entry_dir):
+    # fallback: font info near the builder
+    print("font cache warning: AllFonts.js is not generated for " + directory_x2t)
+    entry_dir = directory_x2t + "/sdkjs/common"
+    for directory in get_local_fonts_dirs(directory_x2t):
+      if base.is_file(directory + "/AllFonts.js"):
+        entry_dir = directory
+        break
+  resolved[directory_x2t] = entry_dir
+  return entry_dir
@@ -6,11 +6,33 @@ sys.path.append('../../scripts')
 import base
 import os
 import glob
-
+import time
+import threading
+import convert_common
+from xml.sax.saxutils import escape
+
+try:
+  import queue
+except ImportError:
+  import Queue as queue
+
+# pipeline: convert (N x2t workers, own temp dirs) -> extract -> place
+# stages are connected by bounded queues, every (file, size) pair is one task
 params = sys.argv[1:]
 
+jobs = 1
+sizes = []
+while (0 != len(params)) and params[0] in ["--jobs", "--size"]:
+  if (2 > len(params)):
+    break
+  if ("--jobs" == params[0]):
+    jobs = max(1, int(params[1]))
+  else:
+    sizes.append(params[1].lower().split("x"))
+  params = params[2:]
+
 if (5 != len(params)):
-  print("use: thumbnails.py path_to_builder_directory path_to_input_files_directory path_to_output_files_directory width height")
+  print("use: thumbnails.py [--jobs N] [--size WxH ...] path_to_builder_directory path_to_input_files_directory path_to_output_files_directory width height")
   exit(0)
 
 cur_path = os.getcwd()
@@ -19,13 +41,15 @@ base.configure_common_apps()
 directory_x2t = params[0].replace("\\", "/")
 directory_input = params[1].replace("\\", "/")
 directory_output = params[2].replace("\\", "/")
-th_width = params[3]
-th_height = params[4]
+sizes.insert(0, [params[3], params[4]])
 
-output_dir = directory_output + "/[" + str(th_width) + "x" + str(th_height) + "]"
-if base.is_dir(output_dir):
-  base.delete_dir(output_dir)
-base.create_dir(output_dir)
+output_dirs = []
+for th_width, th_height in sizes:
+  output_dir = directory_output + "/[" + str(th_width) + "x" + str(th_height) + "]"
+  if base.is_dir(output_dir):
+    base.delete_dir(output_dir)
+  base.create_dir(output_dir)
+  output_dirs.append(output_dir)
 
 input_files = []
 for file in glob.glob(os.path.join(u"" + directory_input, u'*')):
@@ -36,20 +60,10 @@ temp_dir = os.getcwd().replace("\\", "/") + "/temp"
 if base.is_dir(temp_dir):
   base.delete_dir(temp_dir)
 base.create_dir(temp_dir)
+base.create_dir(temp_dir + "/zip")
 
 # fonts directory -----------------------------------
-directory_fonts = directory_x2t + "/sdkjs/common"
-directory_fonts_local = ""
-if "windows" == base.host_platform():
-  directory_fonts_local = os.getenv("LOCALAPPDATA") + "/ONLYOFFICE/docbuilder"
-else:
-  directory_fonts_local = os.path.expanduser('~') + "/.local/share/ONLYOFFICE/docbuilder"
-
-if not base.is_file(directory_fonts + "/AllFonts.js") and not base.is_file(directory_fonts_local + "/AllFonts.js"):
-  base.cmd_in_dir(directory_x2t, "docbuilder", [], True)
-
-if base.is_file(directory_fonts_local + "/AllFonts.js"):
-  directory_fonts = directory_fonts_local
+directory_fonts = convert_common.getFontsDirectory(directory_x2t)
 # ---------------------------------------------------
 
 
@@ -79,16 +93,11 @@ json_params += "'documentLayout':{'drawPlaceHolders':true,'drawFormHighlight':tr
 json_params += "}"
 json_params = json_params.replace("'", "&quot;")
 
-output_len = len(input_files)
-output_cur = 1
-for input_file in input_files:
-  print("process [" + str(output_cur) + " of " + str(output_len) + "]: " + str(input_file.encode("utf-8")))
-  output_file_tmp = os.path.join(output_dir, "temp")
-  output_file = os.path.join(output_dir, os.path.splitext(os.path.basename(input_file))[0].strip())
+def get_convert_xml(input_file, output_file_zip, th_width, th_height, worker_temp_dir):
   xml_convert = u"<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
   xml_convert += u"<TaskQueueDataConvert>"
-  xml_convert += (u"<m_sFileFrom>" + input_file + u"</m_sFileFrom>")
-  xml_convert += (u"<m_sFileTo>" + output_file_tmp + u".zip</m_sFileTo>")
+  xml_convert += (u"<m_sFileFrom>" + escape(input_file) + u"</m_sFileFrom>")
+  xml_convert += (u"<m_sFileTo>" + escape(output_file_zip) + u"</m_sFileTo>")
   xml_convert += u"<m_nFormatTo>1029</m_nFormatTo>"
   xml_convert += (u"<m_sAllFontsPath>" + directory_fonts + u"/AllFonts.js</m_sAllFontsPath>")
   xml_convert += (u"<m_sFontDir>" + directory_fonts + u"</m_sFontDir>")
@@ -102,16 +111,113 @@ for input_file in input_files:
     xml_convert += (u"<height>" + str(th_height) + u"</height>")
   xml_convert += u"</m_oThumbnail>"
   xml_convert += u"<m_nDoctParams>1</m_nDoctParams>"
-  xml_convert += (u"<m_sTempDir>" + temp_dir + u"</m_sTempDir>")
+  xml_convert += (u"<m_sTempDir>" + worker_temp_dir + u"</m_sTempDir>")
   xml_convert += u"</TaskQueueDataConvert>"
-  base.save_as_script(temp_dir + "/to.xml", [xml_convert])
-  base.cmd_in_dir(directory_x2t, "x2t", [temp_dir + "/to.xml"], True)
-  base.delete_dir(temp_dir)
-  base.create_dir(temp_dir)
-  base.extract_unicode(output_file_tmp + u".zip", output_file_tmp)
-  base.move_dir(str(output_file_tmp), str(output_file))
-  base.delete_file(output_file_tmp + u".zip")
-  output_cur += 1
+  return xml_convert
+
+queue_convert = queue.Queue(maxsize=2 * jobs)
+queue_extract = queue.Queue(maxsize=2 * jobs)
+queue_place = queue.Queue(maxsize=2 * jobs)
+print_lock = threading.Lock()
+stat = {"done" : 0, "failed" : []}
+output_len = len(input_files) * len(sizes)
+
+def report(task, status):
+  with print_lock:
+    stat["done"] += 1
+    if ("ok" != status):
+      stat["failed"].append(task["input"] + " [" + os.path.basename(task["output_dir"]) + "]")
+    print("process [" + str(stat["done"]) + " of " + str(output_len) + "]: " + str(task["input"].encode("utf-8")) + " " + os.path.basename(task["output_dir"]) + " - " + status)
+    sys.stdout.flush()
+  return
+
+def stage_convert(index):
+  worker_temp_dir = temp_dir + "/" + str(index)
+  while True:
+    task = queue_convert.get()
+    if task is None:
+      return
+    # a failed task is reported, the stage keeps consuming until the sentinel
+    # (a dead stage would block the upstream put of the bounded queues)
+    try:
+      xml_convert = get_convert_xml(task["input"], task["zip"], task["width"], task["height"], worker_temp_dir)
+      code = convert_common.runConvert(directory_x2t, xml_convert, worker_temp_dir)
+    except Exception as e:
+      report(task, "failed (" + str(e) + ")")
+      continue
+    if (0 != code) or not base.is_file(task["zip"]):
+      report(task, "failed (" + str(code) + ")")
+      continue
+    queue_extract.put(task)
+
+def stage_extract():
+  while True:
+    task = queue_extract.get()
+    if task is None:
+      return
+    # extracted next to the final folder, so placing is a rename
+    task["staging"] = task["output"] + ".tmp"
+    try:
+      if base.is_dir(task["staging"]):
+        base.delete_dir(task["staging"])
+      base.extract_unicode(task["zip"], task["staging"], True)
+      base.delete_file(task["zip"])
+    except Exception as e:
+      report(task, "failed (extract: " + str(e) + ")")
+      continue
+    queue_place.put(task)
+
+def stage_place():
+  while True:
+    task = queue_place.get()
+    if task is None:
+      return
+    try:
+      if not base.is_dir(task["staging"]):
+        report(task, "failed (extract)")
+        continue
+      if base.is_dir(task["output"]):
+        base.delete_dir(task["output"])
+      os.rename(task["staging"], task["output"])
+    except Exception as e:
+      report(task, "failed (" + str(e) + ")")
+      continue
+    report(task, "ok")
+
+start_time = time.time()
+workers = [threading.Thread(target=stage_convert, args=(index,)) for index in range(jobs)]
+extractor = threading.Thread(target=stage_extract)
+placer = threading.Thread(target=stage_place)
+for thread in workers + [extractor, placer]:
+  thread.start()
+
+task_index = 0
+for input_file in input_files:
+  for size_index in range(len(sizes)):
+    task_index += 1
+    queue_convert.put({
+      "input" : input_file,
+      "output_dir" : output_dirs[size_index],
+      "output" : os.path.join(output_dirs[size_index], os.path.splitext(os.path.basename(input_file))[0].strip()),
+      "zip" : temp_dir + "/zip/" + str(task_index) + ".zip",
+      "width" : sizes[size_index][0],
+      "height" : sizes[size_index][1]
+    })
+
+for thread in workers:
+  queue_convert.put(None)
+for thread in workers:
+  thread.join()
+queue_extract.put(None)
+extractor.join()
+queue_place.put(None)
+placer.join()
+
+print("------------------------------------------")
+print("thumbnails: " + str(output_len - len(stat["failed"])) + " of " + str(output_len) + ", time: " + ("%.1f" % (time.time() - start_time)) + "s")
+for item in stat["failed"]:
+  print("failed: " + item)
+print("------------------------------------------")
 
 base.delete_dir(temp_dir)
-os.chdir(cur_path)
\ No newline at end of file
+os.chdir(cur_path)